@@ -1,9 +1,11 @@
 import logging
 import os
 import uuid
+from contextlib import asynccontextmanager
 
 import httpx
-from fastapi import Depends, FastAPI, HTTPException, Security
+import kr8s
+from fastapi import Depends, FastAPI, Header, HTTPException, Security
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
@@ -18,17 +20,47 @@ from backend_infra.services.config_builder import (
     TelegramChannelConfig,
     WhatsAppChannelConfig,
 )
+from backend_infra.services.idempotency import IdempotentRunner, request_id
+from backend_infra.services.readiness import ReadinessNotifier
+from backend_infra.services.warm_pool import WarmPool
 
 logger = logging.getLogger("yourclaw.infra")
 
-app = FastAPI(title="YourClaw Control Plane")
-security = HTTPBearer()
-
 API_KEY = os.environ.get("API_KEY", "")
+# Backend endpoint for pushed readiness changes (unset = don't push)
+READINESS_WEBHOOK_URL = os.environ.get("READINESS_WEBHOOK_URL", "")
+# Pre-started unassigned claws handed out on /provision (0 = no pool)
+WARM_POOL_SIZE = int(os.environ.get("WARM_POOL_SIZE", "0"))
+WARM_POOL_REFILL_INTERVAL = float(os.environ.get("WARM_POOL_REFILL_INTERVAL", "30"))
 GATEWAY_PORT = 18789
 NAMESPACE = "default"
 
 claw = ClawClient()
+provisions = IdempotentRunner()
+pool = WarmPool(claw, WARM_POOL_SIZE, WARM_POOL_REFILL_INTERVAL) if WARM_POOL_SIZE > 0 else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    notifier = (
+        ReadinessNotifier(READINESS_WEBHOOK_URL, API_KEY, on_pod_ready=claw.observe_pod_ready)
+        if READINESS_WEBHOOK_URL else None
+    )
+    if notifier:
+        await notifier.start()
+    if pool:
+        await pool.start()
+    try:
+        yield
+    finally:
+        if pool:
+            await pool.close()
+        if notifier:
+            await notifier.close()
+
+
+app = FastAPI(title="YourClaw Control Plane", lifespan=lifespan)
+security = HTTPBearer()
 
 
 def verify_key(creds: HTTPAuthorizationCredentials = Security(security)) -> None:
@@ -39,9 +71,7 @@ def verify_key(creds: HTTPAuthorizationCredentials = Security(security)) -> None
 # --- Request Models ---
 
 
-class ProvisionRequest(BaseModel):
-    user_id: str
-    claw_id: str
+class ClawConfigRequest(BaseModel):
     anthropic_key: str = ""
     openai_key: str = ""
     ai_gateway_key: str = ""
@@ -52,6 +82,11 @@ class ProvisionRequest(BaseModel):
     whatsapp_allow_from: list[str] = []
 
 
+class ProvisionRequest(ClawConfigRequest):
+    user_id: str
+    claw_id: str
+
+
 class DeprovisionRequest(BaseModel):
     user_id: str
     claw_id: str
@@ -61,6 +96,15 @@ class DeprovisionUserRequest(BaseModel):
     user_id: str
 
 
+class ClawRef(BaseModel):
+    user_id: str
+    claw_id: str
+
+
+class ClawStatusRequest(BaseModel):
+    claws: list[ClawRef]
+
+
 # --- Routes ---
 
 
@@ -70,7 +114,19 @@ def health():
 
 
 @app.post("/provision", dependencies=[Depends(verify_key)])
-async def provision(req: ProvisionRequest):
+async def provision(req: ProvisionRequest, idempotency_key: str | None = Header(None)):
+    """Provision a claw.
+
+    With an Idempotency-Key header, retries of the same request share one
+    rollout and get the first successful result back.
+    """
+    if not idempotency_key:
+        return await _provision(req, None)
+    rid = request_id(idempotency_key, req.model_dump_json().encode())
+    return await provisions.run(rid, lambda: _provision(req, rid))
+
+
+def _openclaw_config(req: ClawConfigRequest) -> OpenclawConfig:
     channels = None
     if req.telegram_bot_token or req.whatsapp_allow_from:
         channels = ChannelsConfig(
@@ -83,7 +139,7 @@ async def provision(req: ProvisionRequest):
             ) if req.whatsapp_allow_from else None,
         )
 
-    config = OpenclawConfig(
+    return OpenclawConfig(
         gateway=GatewayConfig(token=str(uuid.uuid4())),
         model=ModelConfig(primary=req.model),
         provider_keys=ProviderKeys(
@@ -94,7 +150,11 @@ async def provision(req: ProvisionRequest):
         channels=channels,
         system_instructions=req.system_instructions,
     )
-    result = await claw.provision_claw(req.user_id, req.claw_id, config)
+
+
+async def _provision(req: ProvisionRequest, rid: str | None) -> dict:
+    config = _openclaw_config(req)
+    result = await claw.provision_claw(req.user_id, req.claw_id, config, request_id=rid, pool=pool)
     return {
         "user_id": result.user_id,
         "claw_id": result.claw_id,
@@ -104,6 +164,20 @@ async def provision(req: ProvisionRequest):
     }
 
 
+@app.get("/provision/stats", dependencies=[Depends(verify_key)])
+async def provision_stats():
+    """Percentiles and histograms of provision steps and pod phases (this replica)."""
+    return claw.latency.summary()
+
+
+@app.get("/pool", dependencies=[Depends(verify_key)])
+async def pool_stats():
+    """Warm pool size and claim counters."""
+    if pool is None:
+        return {"size": 0}
+    return pool.stats()
+
+
 @app.get("/claws", dependencies=[Depends(verify_key)])
 async def list_claws():
     claws = await claw.list_claws()
@@ -120,6 +194,22 @@ async def list_claws():
     ]
 
 
+@app.post("/claws/status", dependencies=[Depends(verify_key)])
+async def claw_statuses(req: ClawStatusRequest):
+    statuses = await claw.get_claw_statuses([(c.user_id, c.claw_id) for c in req.claws])
+    return [
+        {
+            "user_id": s.user_id,
+            "claw_id": s.claw_id,
+            "ready": s.ready,
+            "pod_phase": s.pod_phase,
+            "node_name": s.node_name,
+            "pod_ip": s.pod_ip,
+        }
+        for s in statuses
+    ]
+
+
 @app.get("/claws/{user_id}/{claw_id}", dependencies=[Depends(verify_key)])
 async def claw_info(user_id: str, claw_id: str):
     status = await claw.get_claw_status(user_id, claw_id)
@@ -133,6 +223,26 @@ async def claw_info(user_id: str, claw_id: str):
     }
 
 
+@app.patch("/claws/{user_id}/{claw_id}/config", dependencies=[Depends(verify_key)])
+async def update_claw_config(user_id: str, claw_id: str, req: ClawConfigRequest):
+    """Reconfigure a claw in place: one pod restart instead of a re-provision."""
+    try:
+        restarted = await claw.update_claw_config(user_id, claw_id, _openclaw_config(req))
+    except kr8s.NotFoundError:
+        raise HTTPException(status_code=404, detail="Claw not found")
+    # A replayed /provision must not roll back to the old config
+    provisions.forget(lambda r: r["user_id"] == user_id and r["claw_id"] == claw_id)
+    return {"user_id": user_id, "claw_id": claw_id, "restarted": restarted}
+
+
+@app.get("/claws/{user_id}/{claw_id}/timeline", dependencies=[Depends(verify_key)])
+async def claw_timeline(user_id: str, claw_id: str):
+    timeline = await claw.get_claw_timeline(user_id, claw_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="Claw not found")
+    return timeline
+
+
 @app.get("/claws/{user_id}/{claw_id}/logs", dependencies=[Depends(verify_key)])
 async def get_claw_logs(user_id: str, claw_id: str, tail: int = 100):
     logs = await claw.get_claw_logs(user_id, claw_id, tail=tail)
@@ -185,10 +295,12 @@ async def whatsapp_login(user_id: str, claw_id: str):
 @app.post("/deprovision", dependencies=[Depends(verify_key)])
 async def deprovision(req: DeprovisionRequest):
     await claw.deprovision_claw(req.user_id, req.claw_id)
+    provisions.forget(lambda r: r["user_id"] == req.user_id and r["claw_id"] == req.claw_id)
     return {"status": "deprovisioned", "user_id": req.user_id, "claw_id": req.claw_id}
 
 
 @app.post("/deprovision-user", dependencies=[Depends(verify_key)])
 async def deprovision_user(req: DeprovisionUserRequest):
     await claw.deprovision_user(req.user_id)
+    provisions.forget(lambda r: r["user_id"] == req.user_id)
     return {"status": "deprovisioned", "user_id": req.user_id}
@@ -5,6 +5,9 @@ Orchestrates kr8s to manage per-claw resources:
 
 Naming:
     All resources:  claw-{user_id}-{claw_id}
+    Claimed from the warm pool (see warm_pool.py): ConfigMap, Secret, PVC
+    and Deployment keep their claw-pool-{pool_id} names (names and the
+    Deployment selector are immutable); look them up by labels.
 
 Labels (on every resource):
     app: yourclaw
@@ -16,8 +19,13 @@ Cleanup:
     By user:  kubectl delete all,cm,secret,pvc,ciliumnetworkpolicy -l user-id=Y
 """
 
+import hashlib
+import json
 import logging
+import time
+import uuid
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import kr8s
 from kr8s.asyncio.objects import (
@@ -28,7 +36,11 @@ from kr8s.asyncio.objects import (
     new_class,
 )
 
-from .config_builder import OpenclawConfig, build_env_vars, build_openclaw_json_str
+from .config_builder import GatewayConfig, OpenclawConfig, build_env_vars, build_openclaw_json_str
+from .timeline import LatencyStats, Timeline, milestone_durations, pod_milestones
+
+if TYPE_CHECKING:
+    from .warm_pool import WarmPool
 
 logger = logging.getLogger("yourclaw.claw")
 
@@ -42,6 +54,17 @@ NAMESPACE = "default"
 STORAGE_CLASS = "hcloud-volumes"
 WORKSPACE_SIZE = "10Gi"
 
+# Deployment annotation: id of the last /provision request fully applied
+REQUEST_ANNOTATION = "yourclaw.dev/provision-request"
+# Deployment annotation: control-plane timeline of the last provision (JSON)
+TIMELINE_ANNOTATION = "yourclaw.dev/provision-timeline"
+# Unassigned warm-pool instances carry component=claw-pool instead of claw,
+# so status, listing and readiness ignore them until claimed
+POOL_COMPONENT = "claw-pool"
+# Pod template annotation: hash of the ConfigMap + Secret contents. Changing
+# it is what rolls the pod when only the config changed.
+CONFIG_HASH_ANNOTATION = "yourclaw.dev/config-hash"
+
 # All resource types managed per claw (order: workloads first, storage last)
 CLAW_RESOURCES = (
     Deployment, Service, CiliumNetworkPolicy,
@@ -61,6 +84,14 @@ class ProvisionResult:
     gateway_port: int       # always 18789
 
 
+@dataclass
+class PoolInstance:
+    name: str               # claw-pool-{pool_id}
+    ready: bool
+    node_name: str | None   # where its pod runs, if ready
+    created_at: str
+
+
 @dataclass
 class ClawStatus:
     user_id: str
@@ -87,6 +118,126 @@ def _labels(user_id: str, claw_id: str) -> dict[str, str]:
     }
 
 
+def _pool_labels(pool_id: str) -> dict[str, str]:
+    return {
+        "app": "yourclaw",
+        "component": POOL_COMPONENT,
+        "pool-id": pool_id,
+    }
+
+
+def pod_ready(pod) -> bool:
+    """A pod is ready when it is Running and all its containers are ready."""
+    return pod.status.get("phase") == "Running" and all(
+        cs.get("ready", False)
+        for cs in (pod.status.get("containerStatuses") or [])
+    )
+
+
+def _config_files(config: OpenclawConfig) -> tuple[dict, list[dict], list[dict]]:
+    """ConfigMap data plus the matching volume items and container mounts."""
+    cm_data = {"openclaw.json": build_openclaw_json_str(config)}
+    configmap_items = [{"key": "openclaw.json", "path": "openclaw.json"}]
+    volume_mounts = [{
+        "name": "config",
+        "mountPath": "/home/node/.openclaw/openclaw.json",
+        "subPath": "openclaw.json",
+        "readOnly": True,
+    }]
+
+    if config.system_instructions:
+        cm_data["SOUL.md"] = config.system_instructions
+        configmap_items.append({"key": "SOUL.md", "path": "SOUL.md"})
+        volume_mounts.append({
+            "name": "config",
+            "mountPath": "/home/node/.openclaw/workspace/SOUL.md",
+            "subPath": "SOUL.md",
+            "readOnly": True,
+        })
+
+    return cm_data, configmap_items, volume_mounts
+
+
+def _config_hash(cm_data: dict, env: dict) -> str:
+    """Fingerprint of everything the pod reads from its ConfigMap and Secret."""
+    blob = json.dumps({"config": cm_data, "env": env}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def _deployment_manifest(
+    name: str,
+    selector: dict[str, str],
+    labels: dict[str, str],
+    configmap_items: list[dict],
+    volume_mounts: list[dict],
+    config_hash: str,
+    prefer_node: str | None = None,
+) -> dict:
+    """Claw Deployment. `selector` is {"claw-id": ...}, or {"pool-id": ...} for
+    warm-pool instances (it can't change after creation)."""
+    pod_spec: dict = {
+        "securityContext": {"fsGroup": 1000},
+        "containers": [{
+            "name": "openclaw",
+            "image": GATEWAY_IMAGE,
+            "ports": [{"containerPort": GATEWAY_PORT}],
+            "envFrom": [{"secretRef": {"name": name}}],
+            "volumeMounts": volume_mounts + [{
+                "name": "workspace",
+                "mountPath": "/home/node/.openclaw/workspace",
+            }],
+            "resources": {
+                "requests": {"cpu": "250m", "memory": "512Mi"},
+                "limits": {"cpu": "1", "memory": "2Gi"},
+            },
+        }],
+        "volumes": [
+            {
+                "name": "config",
+                "configMap": {
+                    "name": name,
+                    "items": configmap_items,
+                },
+            },
+            {
+                "name": "workspace",
+                "persistentVolumeClaim": {"claimName": name},
+            },
+        ],
+        "imagePullSecrets": [
+            {"name": s} for s in IMAGE_PULL_SECRETS
+        ],
+    }
+    if prefer_node:
+        # Restart where the image is cached and the volume already attached
+        pod_spec["affinity"] = {"nodeAffinity": {"preferredDuringSchedulingIgnoredDuringExecution": [{
+            "weight": 100,
+            "preference": {"matchExpressions": [
+                {"key": "kubernetes.io/hostname", "operator": "In", "values": [prefer_node]},
+            ]},
+        }]}}
+
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+        "spec": {
+            "replicas": 1,
+            # The workspace PVC is ReadWriteOnce: a surge pod on another node
+            # could never mount it, so stop the old pod before starting the new
+            "strategy": {"type": "Recreate"},
+            "selector": {"matchLabels": selector},
+            "template": {
+                "metadata": {
+                    "labels": {**labels, **selector},
+                    "annotations": {CONFIG_HASH_ANNOTATION: config_hash},
+                },
+                "spec": pod_spec,
+            },
+        },
+    }
+
+
 async def _create_or_replace(ResourceClass, manifest: dict) -> None:
     """Create a k8s resource, or replace it if it already exists."""
     resource = await ResourceClass(manifest)
@@ -108,21 +259,63 @@ async def _delete_if_exists(ResourceClass, name: str) -> None:
         pass
 
 
+async def _find_deployment(user_id: str, claw_id: str):
+    """The claw's Deployment, under its own name or a claimed pool name."""
+    try:
+        return await Deployment.get(_name(user_id, claw_id), namespace=NAMESPACE)
+    except kr8s.NotFoundError:
+        pass
+    found = await Deployment.list(
+        namespace=NAMESPACE, label_selector={"user-id": user_id, "claw-id": claw_id},
+    )
+    return found[0] if found else None
+
+
+async def _ensure_pvc(name: str, labels: dict[str, str]) -> None:
+    """Create the workspace PVC, or relabel the existing one."""
+    pvc = await PersistentVolumeClaim({
+        "apiVersion": "v1",
+        "kind": "PersistentVolumeClaim",
+        "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+        "spec": {
+            "accessModes": ["ReadWriteOnce"],
+            "storageClassName": STORAGE_CLASS,
+            "resources": {"requests": {"storage": WORKSPACE_SIZE}},
+        },
+    })
+    try:
+        await pvc.create()
+    except kr8s.ServerError as e:
+        if not (e.response and e.response.status_code == 409):
+            raise
+        # PVC spec is immutable once created; labels aren't (pool claims)
+        await pvc.patch({"metadata": {"labels": labels}})
+
+
 # --- Client ---
 
 
 class ClawClient:
     """Provisions and manages OpenClaw instances via kr8s."""
 
+    def __init__(self) -> None:
+        # Provision step and pod phase durations, see timeline.py
+        self.latency = LatencyStats()
+
     async def provision_claw(
         self,
         user_id: str,
         claw_id: str,
         config: OpenclawConfig,
+        request_id: str | None = None,
+        pool: "WarmPool | None" = None,
     ) -> ProvisionResult:
         """Provision a full OpenClaw instance.
 
-        Idempotent — replaces existing resources if they exist.
+        Idempotent — replaces existing resources if they exist. With a
+        request_id, a request already fully applied to this claw (recorded
+        on its Deployment) returns without touching anything. A new claw
+        is taken from `pool` when it has a warm instance.
 
         Creates:
             1. ConfigMap  (openclaw.json + SOUL.md)
@@ -132,174 +325,138 @@ class ClawClient:
             5. Service    (ClusterIP :18789)
             6. CiliumNetworkPolicy (user isolation)
         """
-        name = _name(user_id, claw_id)
+        service_name = _name(user_id, claw_id)
         labels = _labels(user_id, claw_id)
+        service_dns = f"{service_name}.{NAMESPACE}.svc.cluster.local"
+        result = ProvisionResult(
+            user_id=user_id,
+            claw_id=claw_id,
+            service_name=service_name,
+            service_dns=service_dns,
+            gateway_port=GATEWAY_PORT,
+        )
 
-        # --- 1. ConfigMap: openclaw.json + optional SOUL.md ---
-        cm_data = {"openclaw.json": build_openclaw_json_str(config)}
+        timeline = Timeline()
+        with timeline.span("lookup"):
+            deploy = await _find_deployment(user_id, claw_id)
+        if deploy and request_id:
+            if deploy.metadata.get("annotations", {}).get(REQUEST_ANNOTATION) == request_id:
+                logger.info(f"Claw {deploy.name} already provisioned for request {request_id}")
+                return result
+
+        prefer_node = None
+        if deploy is None and pool is not None:
+            with timeline.span("pool_claim"):
+                claimed = await pool.claim(user_id, claw_id)
+            if claimed:
+                deploy, prefer_node = claimed
+
+        # Warm-pool instances keep their own name and selector
+        name = deploy.name if deploy else service_name
+        selector = deploy.raw["spec"]["selector"]["matchLabels"] if deploy else {"claw-id": claw_id}
 
-        configmap_items = [{"key": "openclaw.json", "path": "openclaw.json"}]
-        volume_mounts = [{
-            "name": "config",
-            "mountPath": "/home/node/.openclaw/openclaw.json",
-            "subPath": "openclaw.json",
-            "readOnly": True,
-        }]
-
-        if config.system_instructions:
-            cm_data["SOUL.md"] = config.system_instructions
-            configmap_items.append({"key": "SOUL.md", "path": "SOUL.md"})
-            volume_mounts.append({
-                "name": "config",
-                "mountPath": "/home/node/.openclaw/workspace/SOUL.md",
-                "subPath": "SOUL.md",
-                "readOnly": True,
+        # --- 1. ConfigMap: openclaw.json + optional SOUL.md ---
+        cm_data, configmap_items, volume_mounts = _config_files(config)
+        env = build_env_vars(config)
+
+        with timeline.span("configmap"):
+            await _create_or_replace(ConfigMap, {
+                "apiVersion": "v1",
+                "kind": "ConfigMap",
+                "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+                "data": cm_data,
             })
 
-        await _create_or_replace(ConfigMap, {
-            "apiVersion": "v1",
-            "kind": "ConfigMap",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "data": cm_data,
-        })
-
         # --- 2. Secret: API keys as env vars ---
-        await _create_or_replace(Secret, {
-            "apiVersion": "v1",
-            "kind": "Secret",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "stringData": build_env_vars(config),
-        })
+        with timeline.span("secret"):
+            await _create_or_replace(Secret, {
+                "apiVersion": "v1",
+                "kind": "Secret",
+                "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+                "stringData": env,
+            })
 
         # --- 3. PVC: 10Gi Hetzner Volume ---
-        # PVCs are immutable once created — skip on conflict
-        pvc = await PersistentVolumeClaim({
-            "apiVersion": "v1",
-            "kind": "PersistentVolumeClaim",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "spec": {
-                "accessModes": ["ReadWriteOnce"],
-                "storageClassName": STORAGE_CLASS,
-                "resources": {"requests": {"storage": WORKSPACE_SIZE}},
-            },
-        })
-        try:
-            await pvc.create()
-        except kr8s.ServerError as e:
-            if not (e.response and e.response.status_code == 409):
-                raise
+        with timeline.span("pvc"):
+            await _ensure_pvc(name, labels)
 
         # --- 4. Deployment ---
-        await _create_or_replace(Deployment, {
-            "apiVersion": "apps/v1",
-            "kind": "Deployment",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "spec": {
-                "replicas": 1,
-                "selector": {"matchLabels": {"claw-id": claw_id}},
-                "template": {
-                    "metadata": {"labels": labels},
-                    "spec": {
-                        "securityContext": {"fsGroup": 1000},
-                        "containers": [{
-                            "name": "openclaw",
-                            "image": GATEWAY_IMAGE,
-                            "ports": [{"containerPort": GATEWAY_PORT}],
-                            "envFrom": [{"secretRef": {"name": name}}],
-                            "volumeMounts": volume_mounts + [{
-                                "name": "workspace",
-                                "mountPath": "/home/node/.openclaw/workspace",
-                            }],
-                            "resources": {
-                                "requests": {"cpu": "250m", "memory": "512Mi"},
-                                "limits": {"cpu": "1", "memory": "2Gi"},
-                            },
-                        }],
-                        "volumes": [
-                            {
-                                "name": "config",
-                                "configMap": {
-                                    "name": name,
-                                    "items": configmap_items,
-                                },
-                            },
-                            {
-                                "name": "workspace",
-                                "persistentVolumeClaim": {"claimName": name},
-                            },
-                        ],
-                        "imagePullSecrets": [
-                            {"name": s} for s in IMAGE_PULL_SECRETS
-                        ],
-                    },
-                },
-            },
-        })
+        with timeline.span("deployment"):
+            await _create_or_replace(Deployment, _deployment_manifest(
+                name, selector, labels, configmap_items, volume_mounts, _config_hash(cm_data, env), prefer_node,
+            ))
 
         # --- 5. Service ---
-        await _create_or_replace(Service, {
-            "apiVersion": "v1",
-            "kind": "Service",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "spec": {
-                "selector": {"claw-id": claw_id},
-                "ports": [{"port": GATEWAY_PORT, "targetPort": GATEWAY_PORT}],
-            },
-        })
+        with timeline.span("service"):
+            await _create_or_replace(Service, {
+                "apiVersion": "v1",
+                "kind": "Service",
+                "metadata": {"name": service_name, "namespace": NAMESPACE, "labels": labels},
+                "spec": {
+                    "selector": {"claw-id": claw_id},
+                    "ports": [{"port": GATEWAY_PORT, "targetPort": GATEWAY_PORT}],
+                },
+            })
 
         # --- 6. CiliumNetworkPolicy ---
-        await _create_or_replace(CiliumNetworkPolicy, {
-            "apiVersion": "cilium.io/v2",
-            "kind": "CiliumNetworkPolicy",
-            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
-            "spec": {
-                "endpointSelector": {"matchLabels": {"user-id": user_id}},
-                "ingress": [
-                    # Same user's other claws
-                    {"fromEndpoints": [
-                        {"matchLabels": {"user-id": user_id}},
-                    ]},
-                    # Backend-infra control plane
-                    {"fromEndpoints": [
-                        {"matchLabels": {"app": "yourclaw-api"}},
-                    ]},
-                ],
-                "egress": [
-                    # Same user's other claws
-                    {"toEndpoints": [
-                        {"matchLabels": {"user-id": user_id}},
-                    ]},
-                    # DNS resolution
-                    {
-                        "toEndpoints": [{"matchLabels": {
-                            "k8s:io.kubernetes.pod.namespace": "kube-system",
-                        }}],
-                        "toPorts": [{"ports": [
-                            {"port": "53", "protocol": "UDP"},
-                        ]}],
-                    },
-                    # External traffic (LLM APIs, web search)
-                    {"toEntities": ["world"]},
-                ],
-            },
-        })
+        with timeline.span("network_policy"):
+            await _create_or_replace(CiliumNetworkPolicy, {
+                "apiVersion": "cilium.io/v2",
+                "kind": "CiliumNetworkPolicy",
+                "metadata": {"name": service_name, "namespace": NAMESPACE, "labels": labels},
+                "spec": {
+                    "endpointSelector": {"matchLabels": {"user-id": user_id}},
+                    "ingress": [
+                        # Same user's other claws
+                        {"fromEndpoints": [
+                            {"matchLabels": {"user-id": user_id}},
+                        ]},
+                        # Backend-infra control plane
+                        {"fromEndpoints": [
+                            {"matchLabels": {"app": "yourclaw-api"}},
+                        ]},
+                    ],
+                    "egress": [
+                        # Same user's other claws
+                        {"toEndpoints": [
+                            {"matchLabels": {"user-id": user_id}},
+                        ]},
+                        # DNS resolution
+                        {
+                            "toEndpoints": [{"matchLabels": {
+                                "k8s:io.kubernetes.pod.namespace": "kube-system",
+                            }}],
+                            "toPorts": [{"ports": [
+                                {"port": "53", "protocol": "UDP"},
+                            ]}],
+                        },
+                        # External traffic (LLM APIs, web search)
+                        {"toEntities": ["world"]},
+                    ],
+                },
+            })
 
-        service_dns = f"{name}.{NAMESPACE}.svc.cluster.local"
-        logger.info(f"Provisioned claw {name} at {service_dns}:{GATEWAY_PORT}")
+        # Record the timeline and mark the request applied only once every
+        # resource is in place (metadata only: doesn't roll the pods)
+        annotations = {TIMELINE_ANNOTATION: json.dumps(timeline.to_dict())}
+        if request_id:
+            annotations[REQUEST_ANNOTATION] = request_id
+        deploy = await Deployment.get(name, namespace=NAMESPACE)
+        await deploy.annotate(annotations)
 
-        return ProvisionResult(
-            user_id=user_id,
-            claw_id=claw_id,
-            service_name=name,
-            service_dns=service_dns,
-            gateway_port=GATEWAY_PORT,
-        )
+        for step in timeline.steps:
+            self.latency.observe(step["name"], step["ms"])
+        self.latency.observe("control_plane_total", round((time.time() - timeline.started_at) * 1000, 1))
+
+        logger.info(f"Provisioned claw {name} at {service_dns}:{GATEWAY_PORT}")
+        return result
 
     async def deprovision_claw(self, user_id: str, claw_id: str) -> None:
-        """Tear down all resources for a single claw."""
-        name = _name(user_id, claw_id)
+        """Tear down all resources for a single claw via label selector."""
+        selector = {"user-id": user_id, "claw-id": claw_id}
         for Resource in CLAW_RESOURCES:
-            await _delete_if_exists(Resource, name)
+            for r in await Resource.list(namespace=NAMESPACE, label_selector=selector):
+                await r.delete()
         logger.info(f"Deprovisioned claw {claw_id} for user {user_id}")
 
     async def deprovision_user(self, user_id: str) -> None:
@@ -312,11 +469,7 @@ class ClawClient:
 
     async def get_claw_status(self, user_id: str, claw_id: str) -> ClawStatus:
         """Check if a specific claw is running."""
-        name = _name(user_id, claw_id)
-
-        try:
-            await Deployment.get(name, namespace=NAMESPACE)
-        except kr8s.NotFoundError:
+        if await _find_deployment(user_id, claw_id) is None:
             return ClawStatus(user_id, claw_id, False, None, None, None)
 
         pods = await kr8s.asyncio.get(
@@ -327,10 +480,7 @@ class ClawClient:
 
         pod = pods[0]
         phase = pod.status.get("phase")
-        ready = phase == "Running" and all(
-            cs.get("ready", False)
-            for cs in (pod.status.get("containerStatuses") or [])
-        )
+        ready = pod_ready(pod)
 
         return ClawStatus(
             user_id=user_id,
@@ -341,40 +491,107 @@ class ClawClient:
             pod_ip=pod.status.get("podIP"),
         )
 
+    async def _claw_pods(self) -> dict[tuple[str, str], list]:
+        """All claw pods in one list call, grouped by (user_id, claw_id)."""
+        pods = await kr8s.asyncio.get(
+            "pods", namespace=NAMESPACE,
+            label_selector={"app": "yourclaw", "component": "claw"},
+        )
+        grouped: dict[tuple[str, str], list] = {}
+        for pod in pods:
+            labels = pod.metadata.get("labels", {})
+            key = (labels.get("user-id", ""), labels.get("claw-id", ""))
+            grouped.setdefault(key, []).append(pod)
+        return grouped
+
+    async def get_claw_statuses(self, claws: list[tuple[str, str]]) -> list[ClawStatus]:
+        """Status of many claws from a single pod list.
+
+        A claw with several pods (rolling restart) reports its ready pod if
+        it has one. Claws without pods are reported not ready.
+        """
+        grouped = await self._claw_pods()
+        results = []
+        for user_id, claw_id in claws:
+            pods = grouped.get((user_id, claw_id))
+            if not pods:
+                results.append(ClawStatus(user_id, claw_id, False, None, None, None))
+                continue
+            pod = next((p for p in pods if pod_ready(p)), pods[0])
+            results.append(ClawStatus(
+                user_id=user_id,
+                claw_id=claw_id,
+                ready=pod_ready(pod),
+                pod_phase=pod.status.get("phase"),
+                node_name=pod.spec.get("nodeName"),
+                pod_ip=pod.status.get("podIP"),
+            ))
+        return results
+
     async def list_claws(self) -> list[ClawStatus]:
         """List all running claw instances."""
         deployments = await Deployment.list(
             namespace=NAMESPACE,
             label_selector={"app": "yourclaw", "component": "claw"},
         )
-        results = []
+        claws = []
         for deploy in deployments:
             labels = deploy.metadata.get("labels", {})
-            user_id = labels.get("user-id", "")
-            claw_id = labels.get("claw-id", "")
+            claws.append((labels.get("user-id", ""), labels.get("claw-id", "")))
+        return await self.get_claw_statuses(claws)
+
+    async def get_claw_timeline(self, user_id: str, claw_id: str) -> dict | None:
+        """Where the last provision's time went, or None if the claw doesn't exist.
+
+        Control-plane steps come from the Deployment's timeline annotation;
+        pod scheduling, image pull, container start and readiness from the
+        current pod and its events. Offsets are ms from the provision start.
+        """
+        deploy = await _find_deployment(user_id, claw_id)
+        if deploy is None:
+            return None
+        raw = deploy.metadata.get("annotations", {}).get(TIMELINE_ANNOTATION)
+        timeline = Timeline.from_dict(json.loads(raw)) if raw else None
 
-            pods = await kr8s.asyncio.get(
-                "pods", namespace=NAMESPACE, label_selector={"claw-id": claw_id},
+        milestones: list[dict] = []
+        pods = await kr8s.asyncio.get(
+            "pods", namespace=NAMESPACE, label_selector={"user-id": user_id, "claw-id": claw_id},
+        )
+        if pods:
+            pod = max(pods, key=lambda p: p.metadata.get("creationTimestamp", ""))
+            events = await kr8s.asyncio.get(
+                "events", namespace=NAMESPACE,
+                field_selector={"involvedObject.kind": "Pod", "involvedObject.name": pod.name},
             )
-            if pods:
-                pod = pods[0]
-                phase = pod.status.get("phase")
-                ready = phase == "Running" and all(
-                    cs.get("ready", False)
-                    for cs in (pod.status.get("containerStatuses") or [])
-                )
-                results.append(ClawStatus(
-                    user_id=user_id,
-                    claw_id=claw_id,
-                    ready=ready,
-                    pod_phase=phase,
-                    node_name=pod.spec.get("nodeName"),
-                    pod_ip=pod.status.get("podIP"),
-                ))
-            else:
-                results.append(ClawStatus(user_id, claw_id, False, None, None, None))
+            milestones = pod_milestones(pod, events)
 
-        return results
+        if timeline:
+            start = timeline.started_at
+        elif milestones:
+            start = milestones[0]["at"]
+        else:
+            return {"user_id": user_id, "claw_id": claw_id, "started_at": None, "steps": [], "total_ms": None}
+
+        steps = [
+            {"name": st["name"], "source": "control_plane", "at_ms": round((st["start"] - start) * 1000, 1), "ms": st["ms"]}
+            for st in (timeline.steps if timeline else [])
+        ] + [
+            {"name": m["name"], "source": "kubernetes", "at_ms": round((m["at"] - start) * 1000, 1)}
+            for m in milestones
+        ]
+        ready_at = next((m["at"] for m in milestones if m["name"] == "pod_ready"), None)
+        return {
+            "user_id": user_id,
+            "claw_id": claw_id,
+            "started_at": start,
+            "steps": sorted(steps, key=lambda st: st["at_ms"]),
+            "total_ms": round((ready_at - start) * 1000, 1) if ready_at else None,
+        }
+
+    def observe_pod_ready(self, pod) -> None:
+        """Feed a pod that just became ready into the phase percentiles."""
+        for name, ms in milestone_durations(pod_milestones(pod)).items():
+            self.latency.observe(name, ms)
 
     async def get_claw_logs(self, user_id: str, claw_id: str, tail: int = 100) -> str:
         """Get logs from a claw's pod."""
@@ -392,22 +609,165 @@ class ClawClient:
         user_id: str,
         claw_id: str,
         config: OpenclawConfig,
-    ) -> None:
-        """Update ConfigMap + Secret. Pod restarts to pick up changes."""
-        name = _name(user_id, claw_id)
+    ) -> bool:
+        """Reconfigure an existing claw in place.
+
+        Rewrites the ConfigMap and Secret and, if their contents changed,
+        rolls the pod through the config-hash annotation. The PVC, Service
+        and network policy are left alone. The gateway token is kept.
 
-        # Update ConfigMap
-        cm_data = {"openclaw.json": build_openclaw_json_str(config)}
-        if config.system_instructions:
-            cm_data["SOUL.md"] = config.system_instructions
+        Returns:
+            True if the pod is being restarted, False if nothing changed
+
+        Raises:
+            kr8s.NotFoundError: the claw doesn't exist (provision it instead)
+        """
+        deploy = await _find_deployment(user_id, claw_id)
+        if deploy is None:
+            raise kr8s.NotFoundError(f"Claw {claw_id} of user {user_id} not found")
+        name = deploy.name
 
         cm = await ConfigMap.get(name, namespace=NAMESPACE)
+        try:
+            current = json.loads(cm.raw.get("data", {}).get("openclaw.json", "{}"))
+            config.gateway.token = current["gateway"]["auth"]["token"]
+        except (ValueError, KeyError):
+            pass  # unreadable config: keep the new token
+
+        cm_data, configmap_items, volume_mounts = _config_files(config)
+        env = build_env_vars(config)
+        config_hash = _config_hash(cm_data, env)
+
+        template = deploy.raw["spec"]["template"]["metadata"]
+        if (template.get("annotations") or {}).get(CONFIG_HASH_ANNOTATION) == config_hash:
+            logger.info(f"Config for claw {name} unchanged")
+            return False
+
         cm.raw["data"] = cm_data
         await cm.replace()
 
-        # Update Secret (API keys may have changed)
+        # Drop the old data so removed keys don't linger next to stringData
         secret = await Secret.get(name, namespace=NAMESPACE)
-        secret.raw["stringData"] = build_env_vars(config)
+        secret.raw.pop("data", None)
+        secret.raw["stringData"] = env
         await secret.replace()
 
-        logger.info(f"Updated config for claw {claw_id} user {user_id}")
+        # New hash on the pod template -> one pod restart with the new config.
+        # Patched, not rebuilt: the Deployment keeps its request and timeline
+        # annotations and a warm-pool instance its node affinity.
+        ops = [{
+            "op": "add",
+            "path": "/spec/template/metadata/annotations/" + CONFIG_HASH_ANNOTATION.replace("/", "~1"),
+            "value": config_hash,
+        }]
+        pod_spec = deploy.raw["spec"]["template"]["spec"]
+        for v, volume in enumerate(pod_spec["volumes"]):
+            if volume["name"] != "config" or volume["configMap"].get("items") == configmap_items:
+                continue
+            # The set of config files changed (SOUL.md added or dropped)
+            ops.append({"op": "replace", "path": f"/spec/template/spec/volumes/{v}/configMap/items",
+                        "value": configmap_items})
+            for c, container in enumerate(pod_spec["containers"]):
+                if container["name"] == "openclaw":
+                    other_mounts = [m for m in container.get("volumeMounts", []) if m["name"] != "config"]
+                    ops.append({"op": "replace", "path": f"/spec/template/spec/containers/{c}/volumeMounts",
+                                "value": volume_mounts + other_mounts})
+        await deploy.patch(ops, type="json")
+
+        logger.info(f"Updated config for claw {name}, restarting pod")
+        return True
+
+    # --- Warm pool instances (sizing and claim policy in warm_pool.py) ---
+
+    async def create_pool_instance(self) -> str:
+        """Start an unassigned claw: placeholder config, no keys, no Service."""
+        pool_id = uuid.uuid4().hex[:10]
+        name = f"claw-pool-{pool_id}"
+        labels = _pool_labels(pool_id)
+        config = OpenclawConfig(gateway=GatewayConfig(token=str(uuid.uuid4())))
+        cm_data, configmap_items, volume_mounts = _config_files(config)
+        env = build_env_vars(config)
+
+        await _create_or_replace(ConfigMap, {
+            "apiVersion": "v1",
+            "kind": "ConfigMap",
+            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+            "data": cm_data,
+        })
+        await _create_or_replace(Secret, {
+            "apiVersion": "v1",
+            "kind": "Secret",
+            "metadata": {"name": name, "namespace": NAMESPACE, "labels": labels},
+            "stringData": env,
+        })
+        await _ensure_pvc(name, labels)
+        await _create_or_replace(Deployment, _deployment_manifest(
+            name, {"pool-id": pool_id}, labels, configmap_items, volume_mounts, _config_hash(cm_data, env),
+        ))
+        logger.info(f"Started warm pool instance {name}")
+        return name
+
+    async def pool_instances(self) -> list[PoolInstance]:
+        """Unclaimed warm pool instances, from one Deployment and one pod list."""
+        selector = {"app": "yourclaw", "component": POOL_COMPONENT}
+        deployments = await Deployment.list(namespace=NAMESPACE, label_selector=selector)
+        pods = await kr8s.asyncio.get("pods", namespace=NAMESPACE, label_selector=selector)
+        ready_on = {
+            pod.metadata.get("labels", {}).get("pool-id"): pod.spec.get("nodeName")
+            for pod in pods if pod_ready(pod)
+        }
+        instances = []
+        for deploy in deployments:
+            pool_id = deploy.metadata.get("labels", {}).get("pool-id")
+            instances.append(PoolInstance(
+                name=deploy.name,
+                ready=pool_id in ready_on,
+                node_name=ready_on.get(pool_id),
+                created_at=deploy.metadata.get("creationTimestamp", ""),
+            ))
+        return instances
+
+    async def _take_pool_instance(self, name: str, labels: dict[str, str]):
+        """Relabel an unclaimed pool Deployment, unless another replica got there first.
+
+        The patch carries the resourceVersion it read, so of two concurrent
+        takers only one succeeds.
+        """
+        for _ in range(3):
+            try:
+                deploy = await Deployment.get(name, namespace=NAMESPACE)
+            except kr8s.NotFoundError:
+                return None
+            if deploy.metadata.get("labels", {}).get("component") != POOL_COMPONENT:
+                return None
+            try:
+                await deploy.patch({"metadata": {
+                    "resourceVersion": deploy.metadata["resourceVersion"],
+                    "labels": labels,
+                }})
+                return deploy
+            except kr8s.ServerError as e:
+                if not (e.response and e.response.status_code == 409):
+                    raise
+        return None
+
+    async def claim_pool_instance(self, name: str, user_id: str, claw_id: str):
+        """Assign a pool instance to a claw. provision_claw then personalises it.
+
+        Returns:
+            The claimed Deployment, or None if it was taken meanwhile
+        """
+        deploy = await self._take_pool_instance(name, _labels(user_id, claw_id))
+        if deploy:
+            logger.info(f"Claimed warm pool instance {name} for claw {claw_id} user {user_id}")
+        return deploy
+
+    async def retire_pool_instance(self, name: str) -> bool:
+        """Delete an unclaimed pool instance (pool shrink). False if it was claimed."""
+        pool_id = name.removeprefix("claw-pool-")
+        if not await self._take_pool_instance(name, {**_pool_labels(pool_id), "component": "claw-pool-retired"}):
+            return False
+        for Resource in (Deployment, ConfigMap, Secret, PersistentVolumeClaim):
+            await _delete_if_exists(Resource, name)
+        logger.info(f"Retired warm pool instance {name}")
+        return True
@@ -0,0 +1,85 @@
+"""Idempotency-Key handling for /provision.
+
+A request is identified by its Idempotency-Key header plus a fingerprint of
+its body. While one is running, identical requests wait for it instead of
+starting a second rollout; once it succeeds its result is kept for `ttl`
+seconds and replayed. Failures are not cached, so a retry runs again.
+
+The same key with a different body (e.g. keys changed between retries) is
+a new request: it runs and replaces the cached result.
+
+Per replica and in memory; ClawClient also records the request id on the
+Deployment, so a replay landing on another replica skips the rollout too.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger("yourclaw.idempotency")
+
+
+def request_id(key: str, body: bytes) -> str:
+    """Stable id for (key, body), short enough for a k8s annotation value."""
+    return hashlib.sha256(key.encode() + b"\0" + body).hexdigest()[:32]
+
+
+class IdempotentRunner:
+    """Deduplicates in-flight calls and caches successful results by request id."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.replays = 0
+        self.joined = 0
+
+    def _cached(self, rid: str) -> tuple[bool, object]:
+        entry = self._results.get(rid)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._results[rid]
+            return False, None
+        return True, result
+
+    def _store(self, rid: str, result: object) -> None:
+        self._results[rid] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(rid)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def forget(self, predicate: Callable[[object], bool]) -> None:
+        """Drop cached results matching `predicate`, e.g. after a deprovision."""
+        for rid in [rid for rid, (_, result) in self._results.items() if predicate(result)]:
+            del self._results[rid]
+
+    async def run(self, rid: str, fn: Callable[[], Awaitable[object]]) -> object:
+        hit, result = self._cached(rid)
+        if hit:
+            self.replays += 1
+            logger.info(f"Idempotent replay of {rid}")
+            return result
+
+        task = self._inflight.get(rid)
+        if task is not None:
+            self.joined += 1
+            logger.info(f"Joining in-flight request {rid}")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[rid] = task
+
+            def done(t: asyncio.Task) -> None:
+                self._inflight.pop(rid, None)
+                if not t.cancelled() and t.exception() is None:
+                    self._store(rid, t.result())
+
+            task.add_done_callback(done)
+
+        # Shielded: a caller disconnecting must not cancel the rollout others wait on
+        return await asyncio.shield(task)
@@ -0,0 +1,162 @@
+"""Push claw readiness changes to the backend instead of being polled.
+
+Watches claw pods (label app=yourclaw, component=claw) and, whenever a
+claw flips between ready and not ready, POSTs the change to
+READINESS_WEBHOOK_URL:
+
+    POST <url>
+    Authorization: Bearer <API_KEY>
+    {"events": [{"user_id": "...", "claw_id": "...", "ready": true, "pod_phase": "Running"}]}
+
+A claw is ready when any of its pods is ready; only claw-level flips are
+reported, not every pod event. Claw Deployments use the Recreate strategy
+(the workspace volume is ReadWriteOnce), so a config change or restart
+stops the old pod before starting the new one and reports not ready, then
+ready. Changes are coalesced per claw
+while a delivery is in flight or failing (latest state wins) and retried
+with backoff until the backend accepts them.
+
+Each watch (re)connect starts with a full pod list, so changes missed while
+disconnected are still reported. Every control-plane replica runs its own
+watcher; the backend handler is idempotent, so duplicate reports are
+harmless.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import httpx
+import kr8s
+
+from .claw_client import NAMESPACE, pod_ready
+
+logger = logging.getLogger("yourclaw.readiness")
+
+CLAW_SELECTOR = {"app": "yourclaw", "component": "claw"}
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+
+class ReadinessNotifier:
+    """Watches claw pods and pushes readiness changes to a webhook."""
+
+    def __init__(self, webhook_url: str, api_key: str, on_pod_ready: Callable | None = None) -> None:
+        self.webhook_url = webhook_url
+        self.api_key = api_key
+        # Called with each pod seen going from not ready to ready
+        self.on_pod_ready = on_pod_ready
+        # (user_id, claw_id) -> {pod name: ready}
+        self._pods: dict[tuple[str, str], dict[str, bool]] = {}
+        # (user_id, claw_id) -> last readiness queued for delivery
+        self._reported: dict[tuple[str, str], bool] = {}
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._watch_forever()),
+            asyncio.create_task(self._deliver_forever()),
+        ]
+        logger.info(f"Pushing claw readiness to {self.webhook_url}")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- Tracking ---
+
+    def _update_claw(self, key: tuple[str, str], phase: str | None) -> None:
+        """Queue a report if the claw's overall readiness changed."""
+        pods = self._pods.get(key, {})
+        ready = any(pods.values())
+        changed = self._reported.get(key) != ready
+        if pods:
+            self._reported[key] = ready
+        else:
+            # Gone: nothing left to track once this is reported
+            self._pods.pop(key, None)
+            self._reported.pop(key, None)
+        if not changed:
+            return
+        user_id, claw_id = key
+        self._pending[key] = {"user_id": user_id, "claw_id": claw_id, "ready": ready, "pod_phase": phase}
+        self._wakeup.set()
+
+    def _observe(self, event: str, pod) -> None:
+        labels = pod.metadata.get("labels", {})
+        key = (labels.get("user-id", ""), labels.get("claw-id", ""))
+        if not all(key):
+            return
+        pods = self._pods.setdefault(key, {})
+        if event == "DELETED":
+            pods.pop(pod.name, None)
+            phase = None
+        else:
+            ready = pod_ready(pod)
+            if ready and pods.get(pod.name) is False and self.on_pod_ready:
+                try:
+                    self.on_pod_ready(pod)
+                except Exception as e:
+                    logger.warning(f"on_pod_ready failed for {pod.name}: {e}")
+            pods[pod.name] = ready
+            phase = pod.status.get("phase")
+        self._update_claw(key, phase)
+
+    async def _resync(self) -> None:
+        """Rebuild pod state from a full list; report claws that changed or vanished."""
+        pods = await kr8s.asyncio.get("pods", namespace=NAMESPACE, label_selector=CLAW_SELECTOR)
+        previous = self._pods
+        self._pods = {}
+        for pod in pods:
+            self._observe("ADDED", pod)
+        for key in previous.keys() - self._pods.keys():
+            self._update_claw(key, None)
+
+    async def _watch_forever(self) -> None:
+        delay = RETRY_BASE_DELAY
+        while True:
+            try:
+                await self._resync()
+                async for event, pod in kr8s.asyncio.watch(
+                    "pods", namespace=NAMESPACE, label_selector=CLAW_SELECTOR,
+                ):
+                    self._observe(event, pod)
+                    delay = RETRY_BASE_DELAY
+                # The API server ends watches periodically; reconnect right away
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pod watch failed, reconnecting in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+
+    # --- Delivery ---
+
+    async def _deliver_forever(self) -> None:
+        delay = RETRY_BASE_DELAY
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                batch, self._pending = self._pending, {}
+                if not batch:
+                    continue
+                try:
+                    resp = await client.post(
+                        self.webhook_url,
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        json={"events": list(batch.values())},
+                    )
+                    resp.raise_for_status()
+                    delay = RETRY_BASE_DELAY
+                except Exception as e:
+                    logger.warning(f"Readiness webhook failed ({len(batch)} event(s)), retrying in {delay:.0f}s: {e}")
+                    # Newer reports queued meanwhile win over the failed ones
+                    self._pending = {**batch, **self._pending}
+                    self._wakeup.set()
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RETRY_MAX_DELAY)
@@ -0,0 +1,142 @@
+"""Provisioning timelines and latency percentiles.
+
+Timeline records the control-plane steps of one provision (each resource
+ClawClient.provision_claw creates). It is stored as JSON on the claw's
+Deployment, so any replica can serve it later, and merged with what
+Kubernetes knows about the pod (events and condition timestamps) by
+pod_milestones().
+
+LatencyStats keeps the recent durations per step and reports percentiles
+and a bucketed histogram. Per replica and in memory.
+
+Times are epoch seconds so they line up with the backend's own timeline
+of the same provision (provisioning_jobs.timeline).
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Histogram bucket upper bounds, milliseconds
+BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000)
+
+
+def _epoch(timestamp: str | None) -> float | None:
+    """Kubernetes RFC 3339 timestamp -> epoch seconds."""
+    if not timestamp:
+        return None
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+class Timeline:
+    """Named, timed steps of one operation."""
+
+    def __init__(self, started_at: float | None = None, steps: list[dict] | None = None) -> None:
+        self.started_at = started_at or time.time()
+        self.steps: list[dict] = steps or []
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.steps.append({"name": name, "start": round(start, 3), "ms": round((time.time() - start) * 1000, 1)})
+
+    def to_dict(self) -> dict:
+        return {"started_at": round(self.started_at, 3), "steps": self.steps}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Timeline":
+        return cls(data.get("started_at"), data.get("steps"))
+
+
+def pod_milestones(pod, events: list | None = None) -> list[dict]:
+    """When the pod was created, scheduled, pulled its image, started and became ready.
+
+    Condition and container timestamps come from the pod itself; image
+    pull times only from its events (kept ~1h by the API server). Times
+    are epoch seconds, to the second.
+    """
+    points: dict[str, float | None] = {"pod_created": _epoch(pod.metadata.get("creationTimestamp"))}
+
+    for event in events or []:
+        reason = event.raw.get("reason")
+        at = _epoch(event.raw.get("eventTime") or event.raw.get("firstTimestamp"))
+        name = {
+            "Pulling": "image_pulling",
+            "Pulled": "image_pulled",
+            "Created": "container_created",
+        }.get(reason)
+        if name and at and name not in points:
+            points[name] = at
+
+    conditions = {c.get("type"): c for c in pod.status.get("conditions") or []}
+    for ctype, name in (("PodScheduled", "pod_scheduled"), ("Ready", "pod_ready")):
+        c = conditions.get(ctype)
+        if c and c.get("status") == "True":
+            points[name] = _epoch(c.get("lastTransitionTime"))
+
+    for cs in pod.status.get("containerStatuses") or []:
+        started = (cs.get("state") or {}).get("running", {}).get("startedAt")
+        if started:
+            points["container_started"] = _epoch(started)
+
+    return sorted(
+        ({"name": name, "at": at} for name, at in points.items() if at),
+        key=lambda p: p["at"],
+    )
+
+
+def milestone_durations(milestones: list[dict]) -> dict[str, float]:
+    """Phase durations (ms) between pod milestones, for LatencyStats."""
+    at = {m["name"]: m["at"] for m in milestones}
+    phases = (
+        ("pod_schedule", "pod_created", "pod_scheduled"),
+        ("pod_start", "pod_scheduled", "container_started"),  # includes the image pull
+        ("pod_readiness", "container_started", "pod_ready"),
+        ("pod_total", "pod_created", "pod_ready"),
+    )
+    return {
+        name: round((at[end] - at[start]) * 1000, 1)
+        for name, start, end in phases
+        if start in at and end in at
+    }
+
+
+class LatencyStats:
+    """Recent durations per name; percentiles and histogram on demand."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+
+    def observe(self, name: str, ms: float) -> None:
+        self._samples.setdefault(name, deque(maxlen=self.window)).append(ms)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def summary(self) -> dict:
+        result = {}
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+
+            def pct(q: float) -> float:
+                return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+            histogram = {f"le_{bound}": 0 for bound in BUCKETS_MS}
+            histogram["inf"] = 0
+            for ms in ordered:
+                bound = next((b for b in BUCKETS_MS if ms <= b), None)
+                histogram[f"le_{bound}" if bound else "inf"] += 1
+
+            result[name] = {
+                "count": self._counts[name],
+                "p50": pct(0.5),
+                "p90": pct(0.9),
+                "p99": pct(0.99),
+                "max": ordered[-1],
+                "histogram_ms": histogram,
+            }
+        return result
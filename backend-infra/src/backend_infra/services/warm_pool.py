@@ -0,0 +1,108 @@
+"""Warm pool of pre-started, unassigned claws.
+
+Provisioning a claw from scratch waits for a new hcloud volume to be
+created and attached, the image pull and OpenClaw's first boot. The pool
+keeps `size` instances (component=claw-pool) running with a placeholder
+config, their PVCs already bound.
+
+ClawClient.provision_claw claims one for a new claw: the Deployment is
+relabelled to the user (optimistically, so two control-plane replicas
+can't take the same one), then gets the user's ConfigMap/Secret, Service
+and network policy. The config change restarts the pod once, preferably on
+the node it was already running on, where the image is cached and the
+volume attached.
+
+A background loop tops the pool up after claims and trims it if several
+replicas overshot. Pool pods hold no keys and have no Service.
+"""
+
+import asyncio
+import logging
+import random
+
+from .claw_client import ClawClient
+
+logger = logging.getLogger("yourclaw.pool")
+
+
+class WarmPool:
+    """Keeps `size` unassigned claws warm and hands them out on provision."""
+
+    def __init__(self, claw: ClawClient, size: int, refill_interval: float = 30.0) -> None:
+        self.claw = claw
+        self.size = size
+        self.refill_interval = refill_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._counts = {"ready": 0, "starting": 0}
+        self._stats = {"claims": 0, "warm_claims": 0, "misses": 0, "created": 0, "retired": 0}
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._refill_forever())
+        logger.info(f"Keeping {self.size} warm claw(s)")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def claim(self, user_id: str, claw_id: str):
+        """Claim a pool instance for a new claw, ready ones first.
+
+        Returns:
+            (Deployment, node it runs on) or None if the pool is empty.
+            Never raises: without a warm instance the claw is provisioned
+            from scratch.
+        """
+        try:
+            instances = await self.claw.pool_instances()
+            for inst in sorted(instances, key=lambda i: (not i.ready, i.created_at)):
+                deploy = await self.claw.claim_pool_instance(inst.name, user_id, claw_id)
+                if deploy:
+                    self._stats["claims"] += 1
+                    if inst.ready:
+                        self._stats["warm_claims"] += 1
+                    self._wakeup.set()
+                    return deploy, inst.node_name
+        except Exception as e:
+            logger.warning(f"Warm pool claim failed, provisioning from scratch: {e}")
+        self._stats["misses"] += 1
+        return None
+
+    async def refill_once(self) -> None:
+        """Create or retire instances to bring the pool back to `size`."""
+        instances = await self.claw.pool_instances()
+        ready = sum(1 for i in instances if i.ready)
+        self._counts = {"ready": ready, "starting": len(instances) - ready}
+
+        missing = self.size - len(instances)
+        for _ in range(missing):
+            await self.claw.create_pool_instance()
+            self._stats["created"] += 1
+            self._counts["starting"] += 1
+
+        # Overshoot (replicas refilling at once): drop the least warm first
+        extra = sorted(instances, key=lambda i: (i.ready, i.created_at))[:max(0, -missing)]
+        for inst in extra:
+            if await self.claw.retire_pool_instance(inst.name):
+                self._stats["retired"] += 1
+                self._counts["ready" if inst.ready else "starting"] -= 1
+
+    async def _refill_forever(self) -> None:
+        while True:
+            try:
+                await self.refill_once()
+            except Exception as e:
+                logger.error(f"Warm pool refill failed: {e}")
+            # Jittered so the control-plane replicas don't refill in lockstep
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.refill_interval * random.uniform(0.8, 1.2),
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def stats(self) -> dict:
+        return {"size": self.size, **self._counts, **self._stats}
@@ -0,0 +1,36 @@
+"""Shared fakes for unit tests (no cluster needed).
+
+Run from backend-infra/:
+
+    uv run --extra dev pytest
+"""
+
+from dataclasses import dataclass, field
+
+import pytest
+
+
+@dataclass
+class FakePod:
+    """The parts of a kr8s Pod the services read."""
+
+    name: str
+    user_id: str
+    claw_id: str
+    ready: bool = False
+    metadata: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.metadata = {"name": self.name, "labels": {"user-id": self.user_id, "claw-id": self.claw_id}}
+
+    @property
+    def status(self) -> dict:
+        return {
+            "phase": "Running" if self.ready else "Pending",
+            "containerStatuses": [{"ready": self.ready}],
+        }
+
+
+@pytest.fixture
+def pod():
+    return FakePod
@@ -0,0 +1,113 @@
+"""ClawClient.update_claw_config against in-memory kr8s objects."""
+
+import json
+
+import pytest
+
+from backend_infra.services import claw_client
+from backend_infra.services.claw_client import (
+    CONFIG_HASH_ANNOTATION,
+    REQUEST_ANNOTATION,
+    TIMELINE_ANNOTATION,
+    ClawClient,
+    _config_files,
+    _deployment_manifest,
+)
+from backend_infra.services.config_builder import GatewayConfig, ModelConfig, OpenclawConfig
+
+
+class FakeResource:
+    """A kr8s object reduced to raw, replace() and JSON patches."""
+
+    def __init__(self, raw: dict) -> None:
+        self.raw = raw
+        self.replaced = 0
+
+    @property
+    def name(self) -> str:
+        return self.raw["metadata"]["name"]
+
+    @property
+    def metadata(self) -> dict:
+        return self.raw["metadata"]
+
+    async def replace(self) -> None:
+        self.replaced += 1
+
+    async def patch(self, ops: list[dict], type: str | None = None) -> None:
+        assert type == "json"
+        for op in ops:
+            *parents, last = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].split("/")[1:]]
+            target = self.raw
+            for part in parents:
+                target = target[int(part)] if isinstance(target, list) else target[part]
+            if isinstance(target, list):
+                target[int(last)] = op["value"]
+            else:
+                target[last] = op["value"]
+
+
+def _config(model: str, **kwargs) -> OpenclawConfig:
+    return OpenclawConfig(gateway=GatewayConfig(token="gw-token"), model=ModelConfig(primary=model), **kwargs)
+
+
+@pytest.fixture
+def claw(monkeypatch):
+    """A provisioned claw-pool Deployment (claimed, with node affinity) and its ConfigMap/Secret."""
+    name = "claw-pool-abc"
+    cm_data, items, mounts = _config_files(_config("openai/gpt-5"))
+    deploy = FakeResource(_deployment_manifest(
+        name, {"pool-id": "abc"}, {"user-id": "u1", "claw-id": "claw-1"}, items, mounts, "old-hash",
+        prefer_node="node-1",
+    ))
+    deploy.raw["metadata"]["annotations"] = {
+        REQUEST_ANNOTATION: "req-1",
+        TIMELINE_ANNOTATION: json.dumps({"started_at": 1.0, "steps": []}),
+    }
+    configmap = FakeResource({"metadata": {"name": name}, "data": cm_data})
+    secret = FakeResource({"metadata": {"name": name}, "data": {"OPENAI_API_KEY": "b2xk"}})
+
+    async def find_deployment(user_id, claw_id):
+        return deploy
+
+    async def get_configmap(name, namespace=None):
+        return configmap
+
+    async def get_secret(name, namespace=None):
+        return secret
+
+    monkeypatch.setattr(claw_client, "_find_deployment", find_deployment)
+    monkeypatch.setattr(claw_client.ConfigMap, "get", get_configmap)
+    monkeypatch.setattr(claw_client.Secret, "get", get_secret)
+    return deploy
+
+
+async def test_reconfigure_only_touches_the_config_hash(claw):
+    restarted = await ClawClient().update_claw_config("u1", "claw-1", _config("openai/gpt-5-mini"))
+
+    assert restarted
+    assert claw.replaced == 0
+    template = claw.raw["spec"]["template"]
+    assert template["metadata"]["annotations"][CONFIG_HASH_ANNOTATION] != "old-hash"
+    # What provisioning recorded survives
+    assert claw.metadata["annotations"][REQUEST_ANNOTATION] == "req-1"
+    assert TIMELINE_ANNOTATION in claw.metadata["annotations"]
+    assert template["spec"]["affinity"]["nodeAffinity"]
+    assert claw.raw["spec"]["selector"]["matchLabels"] == {"pool-id": "abc"}
+
+
+async def test_reconfigure_remounts_when_config_files_change(claw):
+    await ClawClient().update_claw_config("u1", "claw-1", _config("openai/gpt-5", system_instructions=""))
+
+    pod_spec = claw.raw["spec"]["template"]["spec"]
+    (config_volume,) = [v for v in pod_spec["volumes"] if v["name"] == "config"]
+    assert [i["key"] for i in config_volume["configMap"]["items"]] == ["openclaw.json"]
+    mounts = [m["name"] for m in pod_spec["containers"][0]["volumeMounts"]]
+    assert mounts == ["config", "workspace"]
+
+
+async def test_unchanged_config_is_a_no_op(claw):
+    client = ClawClient()
+    await client.update_claw_config("u1", "claw-1", _config("openai/gpt-5-mini"))
+
+    assert not await client.update_claw_config("u1", "claw-1", _config("openai/gpt-5-mini"))
@@ -0,0 +1,90 @@
+"""ReadinessNotifier: per-claw readiness tracking and webhook delivery."""
+
+import asyncio
+
+import httpx
+
+from backend_infra.services import readiness
+from backend_infra.services.readiness import ReadinessNotifier
+
+
+def _notifier(**kwargs) -> ReadinessNotifier:
+    return ReadinessNotifier("http://backend.test/api/v1/webhooks/infra", "key", **kwargs)
+
+
+def test_reports_only_claw_level_changes(pod):
+    seen = []
+    n = _notifier(on_pod_ready=seen.append)
+    old = pod("claw-1-a", "u1", "claw-1", ready=True)
+
+    n._observe("ADDED", old)
+    assert n._pending.pop(("u1", "claw-1"))["ready"] is True
+
+    # Recreate restart (reconfigure): the old pod goes before the new one starts
+    old.ready = False
+    n._observe("MODIFIED", old)
+    assert n._pending.pop(("u1", "claw-1"))["ready"] is False
+    n._observe("DELETED", old)
+    new = pod("claw-1-b", "u1", "claw-1", ready=False)
+    n._observe("ADDED", new)
+    assert n._pending.pop(("u1", "claw-1"))["pod_phase"] == "Pending"  # still not ready
+
+    new.ready = True
+    n._observe("MODIFIED", new)
+    assert n._pending.pop(("u1", "claw-1"))["ready"] is True
+    assert seen == [new]
+
+    n._observe("DELETED", new)
+    assert n._pending.pop(("u1", "claw-1"))["ready"] is False
+    assert ("u1", "claw-1") not in n._pods
+
+
+def test_on_pod_ready_errors_are_contained(pod):
+    def boom(_):
+        raise RuntimeError("stats down")
+
+    n = _notifier(on_pod_ready=boom)
+    p = pod("claw-1-a", "u1", "claw-1")
+    n._observe("ADDED", p)
+    p.ready = True
+    n._observe("MODIFIED", p)
+
+    assert n._pending[("u1", "claw-1")]["ready"] is True
+
+
+async def test_failed_delivery_is_retried_with_latest_state(pod, monkeypatch):
+    delivered = []
+    failures = [1]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if failures:
+            failures.pop()
+            return httpx.Response(503)
+        delivered.append(request.read())
+        return httpx.Response(200, json={"status": "ok"})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        readiness.httpx, "AsyncClient",
+        lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+    )
+    monkeypatch.setattr(readiness, "RETRY_BASE_DELAY", 0.05)
+
+    n = _notifier()
+    p = pod("claw-1-a", "u1", "claw-1", ready=True)
+    n._observe("ADDED", p)
+    task = asyncio.create_task(n._deliver_forever())
+    try:
+        await asyncio.sleep(0.01)  # first attempt fails
+        p.ready = False
+        n._observe("MODIFIED", p)  # queued while backing off
+        for _ in range(100):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert len(delivered) == 1
+    assert b'"ready":false' in delivered[0].replace(b" ", b"")
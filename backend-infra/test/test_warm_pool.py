@@ -0,0 +1,168 @@
+"""WarmPool claim/refill policy, and the optimistic take of a pool Deployment."""
+
+from dataclasses import dataclass, field
+
+import httpx
+import kr8s
+import pytest
+
+from backend_infra.services import claw_client
+from backend_infra.services.claw_client import POOL_COMPONENT, ClawClient, PoolInstance
+from backend_infra.services.warm_pool import WarmPool
+
+
+class FakeClaw:
+    """The pool-instance half of ClawClient, in memory."""
+
+    def __init__(self, *instances: PoolInstance) -> None:
+        self.instances = {i.name: i for i in instances}
+        self.taken_elsewhere: set[str] = set()  # claimed by another replica
+        self.claimed: list[tuple[str, str, str]] = []
+        self.created = 0
+
+    async def pool_instances(self) -> list[PoolInstance]:
+        return list(self.instances.values())
+
+    async def claim_pool_instance(self, name: str, user_id: str, claw_id: str):
+        self.instances.pop(name)
+        if name in self.taken_elsewhere:
+            return None
+        self.claimed.append((name, user_id, claw_id))
+        return f"deploy/{name}"
+
+    async def create_pool_instance(self) -> str:
+        self.created += 1
+        name = f"claw-pool-new{self.created}"
+        self.instances[name] = PoolInstance(name, ready=False, node_name=None, created_at="2026-01-02")
+        return name
+
+    async def retire_pool_instance(self, name: str) -> bool:
+        if name in self.taken_elsewhere:
+            return False
+        del self.instances[name]
+        return True
+
+
+def _inst(name: str, ready: bool, created_at: str) -> PoolInstance:
+    return PoolInstance(name, ready=ready, node_name="node-1" if ready else None, created_at=created_at)
+
+
+async def test_claim_prefers_ready_then_oldest():
+    claw = FakeClaw(
+        _inst("claw-pool-a", False, "2026-01-01"),
+        _inst("claw-pool-b", True, "2026-01-03"),
+        _inst("claw-pool-c", True, "2026-01-02"),
+    )
+    pool = WarmPool(claw, size=3)
+
+    assert await pool.claim("user-1", "claw-1") == ("deploy/claw-pool-c", "node-1")
+    assert await pool.claim("user-1", "claw-2") == ("deploy/claw-pool-b", "node-1")
+    assert await pool.claim("user-1", "claw-3") == ("deploy/claw-pool-a", None)
+    assert await pool.claim("user-1", "claw-4") is None
+
+    assert pool.stats()["claims"] == 3
+    assert pool.stats()["warm_claims"] == 2
+    assert pool.stats()["misses"] == 1
+
+
+async def test_claim_skips_instances_taken_by_another_replica():
+    claw = FakeClaw(_inst("claw-pool-a", True, "2026-01-01"), _inst("claw-pool-b", True, "2026-01-02"))
+    claw.taken_elsewhere.add("claw-pool-a")
+    pool = WarmPool(claw, size=2)
+
+    assert await pool.claim("user-1", "claw-1") == ("deploy/claw-pool-b", "node-1")
+    assert claw.claimed == [("claw-pool-b", "user-1", "claw-1")]
+
+
+async def test_claim_never_raises():
+    class Broken(FakeClaw):
+        async def pool_instances(self):
+            raise RuntimeError("API server down")
+
+    pool = WarmPool(Broken(), size=1)
+
+    assert await pool.claim("user-1", "claw-1") is None
+    assert pool.stats()["misses"] == 1
+
+
+async def test_refill_tops_up_to_size():
+    claw = FakeClaw(_inst("claw-pool-a", True, "2026-01-01"))
+    pool = WarmPool(claw, size=3)
+
+    await pool.refill_once()
+
+    assert claw.created == 2
+    assert pool.stats()["ready"] == 1 and pool.stats()["starting"] == 2
+
+
+async def test_refill_trims_least_warm_first():
+    claw = FakeClaw(
+        _inst("claw-pool-a", True, "2026-01-01"),
+        _inst("claw-pool-b", False, "2026-01-02"),
+        _inst("claw-pool-c", True, "2026-01-03"),
+    )
+    claw.taken_elsewhere.add("claw-pool-b")  # claimed before we could retire it
+    pool = WarmPool(claw, size=1)
+
+    await pool.refill_once()
+
+    # Not-ready b first (claimed meanwhile, so it stays), then the oldest ready one
+    assert sorted(claw.instances) == ["claw-pool-b", "claw-pool-c"]
+    assert pool.stats()["retired"] == 1
+    assert claw.created == 0
+
+
+@dataclass
+class FakeDeployment:
+    """The parts of a kr8s Deployment _take_pool_instance touches."""
+
+    name: str
+    component: str = POOL_COMPONENT
+    conflicts: int = 0  # patches to reject with 409 first
+    patches: list = field(default_factory=list)
+
+    @property
+    def metadata(self) -> dict:
+        return {"name": self.name, "resourceVersion": "1", "labels": {"component": self.component}}
+
+    async def patch(self, body: dict) -> None:
+        if self.conflicts:
+            self.conflicts -= 1
+            response = httpx.Response(409, request=httpx.Request("PATCH", "http://k8s"))
+            raise kr8s.ServerError("conflict", response=response)
+        self.patches.append(body)
+        self.component = body["metadata"]["labels"].get("component", "")
+
+
+@pytest.fixture
+def deployments(monkeypatch):
+    """Name -> FakeDeployment served by Deployment.get."""
+    store: dict[str, FakeDeployment] = {}
+
+    async def get(name, namespace=None):
+        if name not in store:
+            raise kr8s.NotFoundError(name)
+        return store[name]
+
+    monkeypatch.setattr(claw_client.Deployment, "get", get)
+    return store
+
+
+async def test_take_retries_conflicts_with_the_read_resource_version(deployments):
+    deployments["claw-pool-a"] = FakeDeployment("claw-pool-a", conflicts=1)
+
+    deploy = await ClawClient().claim_pool_instance("claw-pool-a", "user-1", "claw-1")
+
+    assert deploy is deployments["claw-pool-a"]
+    (patch,) = deploy.patches
+    assert patch["metadata"]["resourceVersion"] == "1"
+    assert patch["metadata"]["labels"]["claw-id"] == "claw-1"
+
+
+async def test_take_gives_up_on_claimed_or_missing_instances(deployments):
+    deployments["claw-pool-a"] = FakeDeployment("claw-pool-a", component="claw")
+
+    client = ClawClient()
+    assert await client.claim_pool_instance("claw-pool-a", "user-1", "claw-1") is None
+    assert await client.claim_pool_instance("claw-pool-gone", "user-1", "claw-1") is None
+    assert deployments["claw-pool-a"].patches == []
@@ -1,16 +1,228 @@
+"""Supabase access-token verification.
+
+Tokens are verified locally: HS256 tokens against SUPABASE_JWT_SECRET,
+asymmetric (RS256/ES256/EdDSA) tokens against the project's JWKS, which
+is cached and refreshed periodically or when an unknown key id shows up.
+exp, aud and iss are always checked.
+
+Supabase's /auth/v1/user endpoint is only called when a token can't be
+checked locally (no secret configured, signing key not in the JWKS, JWKS
+unreachable) and SUPABASE_AUTH_REMOTE_FALLBACK is on. Local verification
+doesn't see sign-outs: a revoked session stays valid until its token
+expires.
+
+Resolved tokens are cached per process under their SHA-256 until the
+token expires (capped by AUTH_TOKEN_CACHE_TTL); rejected tokens are
+cached for AUTH_NEGATIVE_CACHE_TTL so floods of bad tokens don't each
+cost a verification. Each newly verified token's email and metadata are
+checked against app.services.user_profiles' cache (refresh_from_token).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
 import uuid
 
 import httpx
-from fastapi import HTTPException, Request
+import jwt
+from fastapi import Header, HTTPException, Request
 
+from app.cache import MISSING, TTLCache
 from app.config import settings
+from app.services import user_profiles
+
+logger = logging.getLogger("yourclaw.auth")
+
+_ASYMMETRIC_ALGS = {"RS256", "ES256", "EdDSA"}
+
+_REJECTED = object()
+_token_cache = TTLCache(settings.auth_token_cache_max_entries)
+_stats = {"verified_locally": 0, "verified_remotely": 0, "rejected": 0, "rejected_cached": 0}
+
+
+class Unverifiable(Exception):
+    """The token can't be checked locally (missing key material), not proven invalid."""
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def _issuer() -> str:
+    return settings.supabase_jwt_issuer or f"{settings.supabase_url.rstrip('/')}/auth/v1"
+
+
+class JWKSCache:
+    """Signing keys from the project's JWKS endpoint, keyed by kid."""
+
+    def __init__(self, url: str, ttl: float, min_refresh_interval: float = 30.0) -> None:
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval  # throttles refreshes on unknown kids
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._refresh_at = float("-inf")
+        self._attempted_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str | None) -> jwt.PyJWK:
+        key = self._keys.get(kid) if kid else None
+        now = time.monotonic()
+        stale = now >= self._refresh_at
+        unknown = key is None and now - self._attempted_at >= self.min_refresh_interval
+        if kid and (stale or unknown):
+            await self._refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise Unverifiable(f"Signing key {kid!r} not in JWKS")
+        return key
+
+    async def _refresh(self) -> None:
+        seen = self._attempted_at
+        async with self._lock:
+            if self._attempted_at != seen:
+                return  # another request refreshed while we waited
+
+            self._attempted_at = time.monotonic()
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    resp = await client.get(self.url, headers={"apikey": settings.supabase_anon_key})
+                resp.raise_for_status()
+                jwks = resp.json()
+            except (httpx.HTTPError, ValueError) as e:
+                # Keep serving the keys we have; try again after the throttle interval
+                logger.warning(f"JWKS refresh failed: {e}")
+                self._refresh_at = self._attempted_at + self.min_refresh_interval
+                return
+
+            keys: dict[str, jwt.PyJWK] = {}
+            for data in jwks.get("keys", []):
+                if not data.get("kid"):
+                    continue
+                try:
+                    keys[data["kid"]] = jwt.PyJWK(data)
+                except (jwt.PyJWTError, KeyError, ValueError) as e:
+                    logger.warning(f"Skipping unusable JWKS key {data['kid']}: {e}")
+            self._keys = keys
+            self._refresh_at = self._attempted_at + self.ttl
+
+
+_jwks = JWKSCache(
+    f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+    ttl=settings.supabase_jwks_ttl,
+)
+
+
+async def verify_token_locally(token: str) -> dict:
+    """Verify a Supabase access token's signature and claims.
+
+    Returns:
+        The token's claims
+
+    Raises:
+        HTTPException: 401 if the token is malformed, badly signed, expired
+            or issued for another audience/issuer
+        Unverifiable: no key material to check it with
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        raise _unauthorized()
+
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not settings.supabase_jwt_secret:
+            raise Unverifiable("SUPABASE_JWT_SECRET not configured")
+        key = settings.supabase_jwt_secret
+    elif alg in _ASYMMETRIC_ALGS:
+        jwk = await _jwks.get_key(header.get("kid"))
+        if jwk.algorithm_name != alg:
+            raise _unauthorized()
+        key = jwk.key
+    else:
+        raise _unauthorized()
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=settings.supabase_jwt_audience,
+            issuer=_issuer(),
+            leeway=settings.supabase_jwt_leeway,
+            options={"require": ["exp", "sub"]},
+        )
+        uuid.UUID(claims["sub"])
+    except (jwt.PyJWTError, ValueError) as e:
+        logger.info(f"Rejected access token: {e}")
+        raise _unauthorized()
+
+    return claims
+
+
+async def _verify_remotely(token: str) -> dict:
+    """Validate the session with Supabase's /auth/v1/user endpoint.
+
+    Only a 4xx from Supabase rejects the token; a 5xx is an outage, not a
+    verdict, and must not end up in the negative cache.
+
+    Returns:
+        The auth user (id, email, user_metadata, ...)
+    """
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"{settings.supabase_url}/auth/v1/user",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "apikey": settings.supabase_anon_key,
+            },
+        )
+
+    if resp.status_code >= 500:
+        logger.error(f"Supabase auth unavailable ({resp.status_code})")
+        raise HTTPException(status_code=503, detail="Authentication service unavailable")
+    if resp.status_code != 200:
+        raise _unauthorized()
+
+    return resp.json()
+
+
+async def _verify(token: str) -> tuple[uuid.UUID, float | None]:
+    """Resolve a token to (user_id, exp), locally or via the remote fallback."""
+    try:
+        claims = await verify_token_locally(token)
+    except Unverifiable as e:
+        if not settings.supabase_auth_remote_fallback:
+            logger.warning(f"Cannot verify token locally: {e}")
+            raise _unauthorized()
+        logger.info(f"Verifying token remotely: {e}")
+        user = await _verify_remotely(token)
+        _stats["verified_remotely"] += 1
+        user_profiles.refresh_from_token({"sub": user["id"], **user})
+        # Supabase vouched for the token, so its unverified exp is trustworthy
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.PyJWTError:
+            exp = None
+        return uuid.UUID(user["id"]), exp
+
+    _stats["verified_locally"] += 1
+    user_profiles.refresh_from_token(claims)
+    return uuid.UUID(claims["sub"]), claims["exp"]
+
+
+def auth_stats() -> dict:
+    """Token cache and verification counters."""
+    return {**_stats, "token_cache": _token_cache.stats()}
 
 
 async def get_current_user(request: Request) -> uuid.UUID:
     """Validate Supabase JWT and return user_id.
 
-    Calls Supabase's /auth/v1/user endpoint with the bearer token
-    to validate the session and extract the user ID.
+    Answers from the token cache, else verifies the bearer token locally;
+    falls back to Supabase's /auth/v1/user endpoint only if the token
+    can't be checked locally and SUPABASE_AUTH_REMOTE_FALLBACK is enabled.
 
     In dev mode, set DEV_USER_ID in .env to bypass auth.
     """
@@ -23,21 +235,28 @@ async def get_current_user(request: Request) -> uuid.UUID:
         raise HTTPException(status_code=401, detail="Missing authorization token")
 
     token = auth_header.split(" ", 1)[1]
+    key = hashlib.sha256(token.encode()).digest()
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{settings.supabase_url}/auth/v1/user",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "apikey": settings.supabase_anon_key,
-            },
-        )
+    cached = _token_cache.get(key)
+    if cached is _REJECTED:
+        _stats["rejected_cached"] += 1
+        raise _unauthorized()
+    if cached is not MISSING:
+        return cached
 
-    if resp.status_code != 200:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    try:
+        user_id, exp = await _verify(token)
+    except HTTPException as e:
+        if e.status_code == 401:
+            _stats["rejected"] += 1
+            _token_cache.set(key, _REJECTED, settings.auth_negative_cache_ttl)
+        raise
 
-    user_data = resp.json()
-    return uuid.UUID(user_data["id"])
+    ttl = settings.auth_token_cache_ttl
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    _token_cache.set(key, user_id, ttl)
+    return user_id
 
 
 async def get_current_user_id(request: Request) -> str:
@@ -48,3 +267,13 @@ async def get_current_user_id(request: Request) -> str:
     """
     user_uuid = await get_current_user(request)
     return str(user_uuid)
+
+
+async def require_admin(authorization: str = Header("")) -> None:
+    """FastAPI dependency for operator-only endpoints (ADMIN_API_KEY bearer token).
+
+    Unset ADMIN_API_KEY disables those endpoints entirely.
+    """
+    expected = f"Bearer {settings.admin_api_key}"
+    if not settings.admin_api_key or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
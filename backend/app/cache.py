@@ -0,0 +1,103 @@
+"""In-process TTL cache with bounded LRU eviction.
+
+Not shared between worker processes, so only cache what can tolerate
+staleness up to its TTL when written from elsewhere.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+MISSING = object()
+
+
+class TTLCache:
+    """LRU cache where every entry carries its own expiry.
+
+    `on_evict` is called with each value that leaves the cache (expired,
+    evicted, replaced or invalidated), e.g. to wipe secrets.
+    """
+
+    def __init__(self, max_entries: int, on_evict: Callable[[object], None] | None = None) -> None:
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._data: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _discard(self, value: object) -> None:
+        if self.on_evict is not None:
+            self.on_evict(value)
+
+    def get(self, key: Hashable) -> object:
+        """Return the cached value, or MISSING if absent or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._discard(value)
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> object:
+        """Like get(), but leaves hit/miss counts and LRU order alone."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return MISSING
+        return entry[1]
+
+    def set(self, key: Hashable, value: object, ttl: float) -> None:
+        """Store `value` for `ttl` seconds, evicting the least recently used entry if full."""
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        old = self._data.get(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        if old is not None and old[1] is not value:
+            self._discard(old[1])
+        while len(self._data) > self.max_entries:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self._discard(evicted)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._discard(entry[1])
+            self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`. Returns the count dropped."""
+        stale = [key for key in self._data if predicate(key)]
+        for key in stale:
+            self._discard(self._data.pop(key)[1])
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._data)
+        for _, value in self._data.values():
+            self._discard(value)
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
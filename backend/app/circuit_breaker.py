@@ -0,0 +1,111 @@
+"""Circuit breaker over a rolling window of call outcomes.
+
+closed:    calls go through; outcomes are recorded. The breaker opens when,
+           over the last `window` seconds and at least `min_calls` calls,
+           the failure rate or the slow-call rate reaches its threshold.
+open:      calls are refused until `open_seconds` have passed.
+half-open: up to `half_open_calls` trial calls go through. If they all
+           succeed (and aren't slow) the breaker closes; any bad outcome
+           opens it again.
+
+Per process, like the rest of the in-memory state here.
+"""
+
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Rolling error-rate and latency breaker. Call allow() before, record() after."""
+
+    def __init__(
+        self,
+        window: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_rate: float,
+        open_seconds: float,
+        half_open_calls: int = 1,
+    ) -> None:
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._calls: deque[tuple[float, bool, bool]] = deque()  # (at, failed, slow)
+        self._opened_at = 0.0
+        self._trials = 0           # half-open calls let through
+        self._trial_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now. A True in half-open uses up a trial slot."""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._trials += 1
+        return True
+
+    def record(self, failed: bool, slow: bool = False) -> None:
+        """Record the outcome of a call that allow() let through."""
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._open(now)
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self.state = CLOSED
+                self._calls.clear()
+            return
+        if self.state == OPEN:
+            return  # a call started before the breaker opened
+
+        self._calls.append((now, failed, slow))
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+        total = len(self._calls)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._calls if f)
+        slow_calls = sum(1 for _, _, s in self._calls if s)
+        if failures / total >= self.failure_rate or slow_calls / total >= self.slow_rate:
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.times_opened += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after(), 1),
+        }
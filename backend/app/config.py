@@ -7,6 +7,51 @@ class Settings(BaseSettings):
     supabase_anon_key: str
     supabase_service_role_key: str
 
+    # Access-token verification (app.auth)
+    supabase_jwt_secret: str = ""  # legacy HS256 secret; asymmetric keys come from the JWKS
+    supabase_jwt_audience: str = "authenticated"
+    supabase_jwt_issuer: str = ""  # default: {supabase_url}/auth/v1
+    supabase_jwt_leeway: float = 10.0  # seconds of clock skew allowed on exp/iat
+    supabase_jwks_ttl: float = 600.0  # seconds between JWKS refreshes
+    supabase_auth_remote_fallback: bool = True  # ask /auth/v1/user when a token can't be checked locally
+    auth_token_cache_ttl: float = 300.0  # max seconds a resolved token is cached (never past its exp)
+    auth_negative_cache_ttl: float = 10.0  # seconds a rejected token is answered from cache
+    auth_token_cache_max_entries: int = 10000
+
+    # Auth user profiles (email/name) from the admin API (app.services.user_profiles)
+    user_profile_cache_ttl: float = 300.0
+    user_profile_cache_max_entries: int = 5000
+
+    # Supabase HTTP connection pool (shared by app.database.db)
+    supabase_http2: bool = True  # h2 comes with httpx[http2]
+    supabase_max_connections: int = 100
+    supabase_max_keepalive_connections: int = 20
+    supabase_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    supabase_timeout: float = 10.0
+    supabase_bulk_chunk_size: int = 500  # rows per request for insert_many/upsert_many
+
+    # Read-through select cache (opt-in per table), e.g. SUPABASE_CACHE_TTLS='{"user_phones": 30}'
+    # Per process: only list tables whose writes all go through this backend.
+    supabase_cache_ttls: dict[str, float] = {}  # table -> TTL seconds
+    supabase_cache_max_entries: int = 2048
+    supabase_coalesce_reads: bool = True  # identical concurrent selects share one request
+
+    # Supabase request policy
+    supabase_deadline: float = 15.0  # seconds per call, including retries
+    supabase_retry_attempts: int = 3  # total attempts for idempotent calls
+    supabase_retry_base_delay: float = 0.1  # backoff: random(0, min(max, base * 2^n))
+    supabase_retry_max_delay: float = 2.0
+    supabase_hedge_reads: bool = True  # duplicate reads slower than the percentile below
+    supabase_hedge_percentile: float = 0.95
+    supabase_hedge_min_delay: float = 0.05  # never hedge sooner than this (seconds)
+
+    # Data backend: "rest" (PostgREST over HTTPS) or "postgres" (direct asyncpg)
+    database_backend: str = "rest"
+    database_url: str = ""  # postgresql://... used when database_backend=postgres
+    postgres_pool_min_size: int = 1
+    postgres_pool_max_size: int = 10
+    postgres_statement_cache_size: int = 100  # set 0 behind pgbouncer in transaction mode
+
     # Stripe
     stripe_secret_key: str = ""
     stripe_publishable_key: str = ""
@@ -24,7 +69,14 @@ class Settings(BaseSettings):
     google_client_secret: str = ""
 
     # Security
-    encryption_key: str = ""  # Fernet key
+    encryption_key: str = ""  # Fernet key, or comma-separated keys (first encrypts) for rotation
+    secret_cache_ttl: float = 30.0  # seconds decrypted provisioning secrets are kept (0 disables)
+    secret_cache_max_entries: int = 1000
+    admin_api_key: str = ""  # Bearer token for the /health/* diagnostics (unset = disabled)
+
+    # Idempotency-Key replays on POST/PATCH /assistants (app.services.idempotency)
+    idempotency_cache_ttl: float = 600.0
+    idempotency_cache_max_entries: int = 5000
 
     # App URLs
     api_url: str = "http://localhost:8000"
@@ -41,6 +93,37 @@ class Settings(BaseSettings):
     # Infra API (separate provisioning service)
     infra_api_url: str = "https://infra.api.yourclaw.dev"
     yourclaw_api_key: str = ""  # Bearer token for infra API
+    infra_api_connect_timeout: float = 5.0
+    infra_api_status_timeout: float = 10.0  # GET /claws/{user}/{claw}, on every GET /assistants
+    infra_api_provision_timeout: float = 120.0
+    infra_api_deprovision_timeout: float = 60.0
+    infra_api_update_config_timeout: float = 60.0  # PATCH /claws/{user}/{claw}/config
+    infra_api_max_connections: int = 50
+    infra_api_max_keepalive_connections: int = 10
+    infra_api_keepalive_expiry: float = 60.0  # seconds an idle connection is kept
+    # Load shedding: provisions and the shorter calls get separate slots
+    infra_api_max_concurrent_provisions: int = 8
+    infra_api_max_concurrent_calls: int = 32  # status/deprovision calls in flight
+    infra_api_queue_timeout: float = 2.0  # seconds to wait for a slot before failing fast
+    # Circuit breaker (app.circuit_breaker) over all infra API calls
+    infra_api_breaker_window: float = 60.0  # seconds of outcomes considered
+    infra_api_breaker_min_calls: int = 10
+    infra_api_breaker_failure_rate: float = 0.5  # errors/timeouts/5xx share that opens it
+    infra_api_breaker_slow_rate: float = 0.5  # slow-call share that opens it
+    infra_api_breaker_slow_fraction: float = 0.5  # slow = past this share of the read timeout
+    infra_api_breaker_open_seconds: float = 30.0
+
+    # Provisioning worker (app.worker)
+    provisioning_worker_concurrency: int = 4  # provisions run at once per worker process
+    provisioning_poll_interval: float = 2.0  # seconds between queue polls when idle
+    provisioning_lease_seconds: int = 300  # renewed every third of this while a job runs
+    provisioning_max_attempts: int = 5
+    provisioning_retry_base_delay: float = 10.0  # seconds, doubled per attempt
+    provisioning_retry_max_delay: float = 300.0
+
+    # Claw status reconciler (runs in app.worker; backstop for pushed readiness)
+    reconcile_interval: float = 300.0  # seconds between full passes (0 disables)
+    reconcile_batch_size: int = 500  # claws per POST /claws/status
 
     # Mock Mode
     mock_containers: bool = False
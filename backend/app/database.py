@@ -2,28 +2,256 @@
 
 Uses Supabase REST API instead of direct Postgres connection.
 All CRUD operations go through /rest/v1/ endpoints.
+
+The singleton `db` owns one pooled httpx client (HTTP/2 when the `h2`
+package is installed). The FastAPI lifespan opens it on startup and
+closes it on shutdown; scripts get it lazily on first query.
+
+Selects on tables listed in settings.supabase_cache_ttls are served from
+an in-process read-through cache; writes through this client invalidate
+the cached selects they could affect. Identical selects that are in
+flight at the same time share one HTTP request.
+
+Every request runs under a deadline. Idempotent calls are retried with
+jittered exponential backoff on transient failures (connection errors,
+408/429/5xx); reads slower than the recent latency percentile get one
+hedged duplicate request and the first good answer wins.
 """
 
+import asyncio
+import copy
 import logging
+import random
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 
 import httpx
 
+from app.cache import MISSING, TTLCache
 from app.config import settings
 
 logger = logging.getLogger("yourclaw.database")
 
 
+@dataclass
+class ChunkFailure:
+    offset: int             # index of the chunk's first row in the input list
+    size: int               # rows in the chunk
+    status_code: int | None  # None for transport errors
+    error: str
+
+
+@dataclass
+class BulkResult:
+    rows: list[dict] = field(default_factory=list)  # empty with returning="minimal"
+    written: int = 0
+    failures: list[ChunkFailure] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+def _chunks(items: list, size: int):
+    for offset in range(0, len(items), size):
+        yield offset, items[offset:offset + size]
+
+
+# Statuses worth retrying for idempotent requests
+_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+# Transport errors where the request never reached the server (safe to retry any call)
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _prefer_return(returning: str) -> str:
+    """Prefer header value for a write's `returning` mode.
+
+    representation: the written rows come back in the body
+    headers-only: empty body, Location header only (inserts)
+    minimal: empty body
+    """
+    if returning not in ("representation", "headers-only", "minimal"):
+        raise ValueError(f"Unknown returning mode: {returning}")
+    return f"return={returning}"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 class SupabaseClient:
     """Async client for Supabase Data API."""
 
     def __init__(self) -> None:
-        self.base_url = f"{settings.supabase_url}/rest/v1"
+        self.supabase_url = settings.supabase_url
+        self.base_url = f"{self.supabase_url}/rest/v1"
         self.headers = {
             "apikey": settings.supabase_service_role_key,
             "Authorization": f"Bearer {settings.supabase_service_role_key}",
             "Content-Type": "application/json",
             "Prefer": "return=representation",
         }
+        self._client: httpx.AsyncClient | None = None
+        self.cache = TTLCache(settings.supabase_cache_max_entries)
+        # Bumped on every write, so a select that raced a write doesn't cache its result
+        self._write_generation: dict[str, int] = {}
+        # (select key, write generation) -> [shared GET task, followers joined]
+        self._inflight: dict[tuple, list] = {}
+        self.coalesced_reads = 0
+        # Recent read latencies (seconds), used to pick the hedge delay
+        self._read_latencies: deque[float] = deque(maxlen=256)
+        self.retries = 0
+        self.hedged_reads = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection-pooled client (created on first use if not started)."""
+        if self._client is None or self._client.is_closed:
+            http2 = settings.supabase_http2 and _http2_available()
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                timeout=settings.supabase_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.supabase_max_connections,
+                    max_keepalive_connections=settings.supabase_max_keepalive_connections,
+                    keepalive_expiry=settings.supabase_keepalive_expiry,
+                ),
+            )
+            logger.info(
+                f"Opened Supabase client pool (http2={http2}, "
+                f"max_connections={settings.supabase_max_connections})"
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Open the pooled client. Called from the FastAPI lifespan."""
+        _ = self.client
+
+    async def close(self) -> None:
+        """Close the pooled client and drop idle connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "cache": self.cache.stats(),
+            "coalesced_reads": self.coalesced_reads,
+            "retries": self.retries,
+            "hedged_reads": self.hedged_reads,
+        }
+
+    # --- Request policy: deadline, retry, hedging ---
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        idempotent: bool,
+        hedge: bool = False,
+        deadline: float | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request under a deadline, retrying transient failures.
+
+        Non-idempotent calls are only retried when the request provably
+        never reached the server. Raises TimeoutError past the deadline.
+        """
+        attempts = max(1, settings.supabase_retry_attempts)
+        async with asyncio.timeout(deadline or settings.supabase_deadline):
+            for attempt in range(attempts):
+                last_attempt = attempt == attempts - 1
+                try:
+                    if hedge:
+                        resp = await self._send_hedged(method, url, **kwargs)
+                    else:
+                        resp = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    if last_attempt or not (idempotent or isinstance(e, _NOT_SENT_ERRORS)):
+                        raise
+                    reason = type(e).__name__
+                else:
+                    if last_attempt or not idempotent or resp.status_code not in _RETRY_STATUSES:
+                        return resp
+                    reason = str(resp.status_code)
+
+                # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+                delay = random.uniform(
+                    0, min(settings.supabase_retry_max_delay, settings.supabase_retry_base_delay * 2**attempt)
+                )
+                logger.warning(f"Supabase {method} {url} failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    def _hedge_delay(self) -> float | None:
+        """Latency percentile after which a read gets a hedged duplicate."""
+        if not settings.supabase_hedge_reads or len(self._read_latencies) < 20:
+            return None
+        ordered = sorted(self._read_latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * settings.supabase_hedge_percentile))
+        return max(settings.supabase_hedge_min_delay, ordered[index])
+
+    async def _timed_read(self, method: str, url: str, **kwargs) -> httpx.Response:
+        start = asyncio.get_running_loop().time()
+        resp = await self.client.request(method, url, **kwargs)
+        self._read_latencies.append(asyncio.get_running_loop().time() - start)
+        return resp
+
+    async def _send_hedged(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a read; if it is slower than usual, race a second copy."""
+        delay = self._hedge_delay()
+        first = asyncio.ensure_future(self._timed_read(method, url, **kwargs))
+        if delay is None:
+            return await first
+
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedged_reads += 1
+                pending.add(asyncio.ensure_future(self._timed_read(method, url, **kwargs)))
+
+            # First non-5xx response wins; otherwise surface the last outcome
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        return task.result()
+                if not pending:
+                    return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # --- Read cache ---
+
+    def invalidate(self, table: str, rows: list[dict] | None = None) -> None:
+        """Drop cached selects on `table` that writing `rows` could affect.
+
+        `rows` are column=value dicts describing the written rows (before
+        and/or after the write). A cached select survives only if one of
+        its eq filters contradicts every row; None drops the whole table.
+        """
+        self._write_generation[table] = self._write_generation.get(table, 0) + 1
+        if not len(self.cache):
+            return
+
+        written = [{k: str(v) for k, v in row.items()} for row in rows] if rows is not None else None
+
+        def affected(key) -> bool:
+            if key[0] != table:
+                return False
+            if written is None:
+                return True
+            return any(all(row.get(k, v) == v for k, v in key[2]) for row in written)
+
+        self.cache.invalidate_where(affected)
 
     async def select(
         self,
@@ -34,6 +262,8 @@ class SupabaseClient:
         order_by: str | None = None,
         order_desc: bool = False,
         limit: int | None = None,
+        cache: bool = True,
+        deadline: float | None = None,
     ) -> list[dict] | dict | None:
         """SELECT query.
 
@@ -45,10 +275,30 @@ class SupabaseClient:
             order_by: Column to order by
             order_desc: If True, order descending (default: ascending)
             limit: Max rows to return
+            cache: Set False to bypass the read cache for this call
+            deadline: Seconds for the whole call incl. retries (default: settings.supabase_deadline)
 
         Returns:
             List of rows, single row, or None
         """
+        ttl = settings.supabase_cache_ttls.get(table, 0) if cache else 0
+        cache_key = (
+            table,
+            columns,
+            tuple(sorted((k, str(v)) for k, v in (filters or {}).items())),
+            order_by,
+            order_desc,
+            limit,
+        )
+        generation = self._write_generation.get(table, 0)
+        if ttl:
+            data = self.cache.get(cache_key)
+            if data is not MISSING:
+                data = copy.deepcopy(data)
+                if single:
+                    return data[0] if data else None
+                return data
+
         params = {"select": columns}
         if filters:
             for key, value in filters.items():
@@ -60,112 +310,483 @@ class SupabaseClient:
         if limit:
             params["limit"] = str(limit)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/{table}",
-                headers=self.headers,
-                params=params,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        # Keyed on the write generation too: a select issued after a write
+        # never joins a request that started before it
+        data = await self._get_coalesced((cache_key, generation), table, params, deadline)
+
+        if ttl and generation == self._write_generation.get(table, 0):
+            self.cache.set(cache_key, copy.deepcopy(data), ttl)
 
-            if single:
-                return data[0] if data else None
-            return data
+        if single:
+            return data[0] if data else None
+        return data
 
-    async def insert(self, table: str, data: dict) -> dict:
+    async def _get(self, table: str, params: dict, deadline: float | None = None) -> list[dict]:
+        resp = await self._send(
+            "GET",
+            f"{self.base_url}/{table}",
+            idempotent=True,
+            hedge=True,
+            deadline=deadline,
+            headers=self.headers,
+            params=params,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _get_coalesced(
+        self, key: tuple, table: str, params: dict, deadline: float | None = None,
+    ) -> list[dict]:
+        """Run the GET, or join an identical one already in flight.
+
+        The shared request runs as its own task, so a caller that is
+        cancelled (e.g. client disconnect) doesn't fail the others.
+        """
+        if not settings.supabase_coalesce_reads:
+            return await self._get(table, params, deadline)
+
+        entry = self._inflight.get(key)
+        if entry is not None:
+            entry[1] += 1
+            self.coalesced_reads += 1
+            return copy.deepcopy(await asyncio.shield(entry[0]))
+
+        task = asyncio.ensure_future(self._get(table, params, deadline))
+        entry = [task, 0]
+        self._inflight[key] = entry
+
+        def _done(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is entry:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # mark retrieved even if every caller was cancelled
+
+        task.add_done_callback(_done)
+        data = await asyncio.shield(task)
+        # Followers copy the same result; give the leader its own copy too
+        return copy.deepcopy(data) if entry[1] else data
+
+    async def insert(
+        self,
+        table: str,
+        data: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> dict:
         """INSERT a single row.
 
         Args:
             table: Table name
             data: Row data as dict
+            returning: "representation" to get the row back, "minimal"/"headers-only" for none
+            deadline: Seconds for the whole call (default: settings.supabase_deadline)
 
         Returns:
-            Inserted row
+            Inserted row ({} unless returning="representation")
         """
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/{table}",
-                headers=self.headers,
-                json=data,
-            )
-            if resp.status_code >= 400:
-                logger.error(f"Supabase INSERT {table} failed ({resp.status_code}): {resp.text}")
-            resp.raise_for_status()
-            result = resp.json()
-            return result[0] if result else {}
+        resp = await self._send(
+            "POST",
+            f"{self.base_url}/{table}",
+            idempotent=False,
+            deadline=deadline,
+            headers={**self.headers, "Prefer": _prefer_return(returning)},
+            json=data,
+        )
+        if resp.status_code >= 400:
+            logger.error(f"Supabase INSERT {table} failed ({resp.status_code}): {resp.text}")
+        resp.raise_for_status()
+        self.invalidate(table, [data])
+        result = resp.json() if resp.content else None
+        return result[0] if result else {}
 
-    async def upsert(self, table: str, data: dict, on_conflict: str = "id") -> dict:
+    async def upsert(
+        self,
+        table: str,
+        data: dict,
+        on_conflict: str = "id",
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> dict:
         """UPSERT (insert or update on conflict).
 
         Args:
             table: Table name
             data: Row data as dict
             on_conflict: Column(s) to check for conflict
+            returning: "representation" to get the row back, "minimal"/"headers-only" for none
+            deadline: Seconds for the whole call incl. retries (default: settings.supabase_deadline)
 
         Returns:
-            Upserted row
+            Upserted row ({} unless returning="representation")
         """
-        headers = {**self.headers, "Prefer": "return=representation,resolution=merge-duplicates"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/{table}",
-                headers=headers,
-                params={"on_conflict": on_conflict},
-                json=data,
-            )
-            resp.raise_for_status()
-            result = resp.json()
-            return result[0] if result else {}
+        headers = {**self.headers, "Prefer": f"{_prefer_return(returning)},resolution=merge-duplicates"}
+        resp = await self._send(
+            "POST",
+            f"{self.base_url}/{table}",
+            idempotent=True,
+            deadline=deadline,
+            headers=headers,
+            params={"on_conflict": on_conflict},
+            json=data,
+        )
+        resp.raise_for_status()
+        self.invalidate(table, [data])
+        result = resp.json() if resp.content else None
+        return result[0] if result else {}
 
-    async def update(self, table: str, data: dict, filters: dict) -> list[dict]:
+    async def update(
+        self,
+        table: str,
+        data: dict,
+        filters: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> list[dict]:
         """UPDATE rows matching filters.
 
         Args:
             table: Table name
             data: Fields to update
             filters: Dict of column=value filters
+            returning: "representation" to get the rows back, "minimal" for none
+            deadline: Seconds for the whole call incl. retries (default: settings.supabase_deadline)
 
         Returns:
-            Updated rows
+            Updated rows ([] unless returning="representation")
         """
         params = {}
         for key, value in filters.items():
             params[key] = f"eq.{value}"
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(
-                f"{self.base_url}/{table}",
-                headers=self.headers,
-                params=params,
-                json=data,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._send(
+            "PATCH",
+            f"{self.base_url}/{table}",
+            idempotent=True,
+            deadline=deadline,
+            headers={**self.headers, "Prefer": _prefer_return(returning)},
+            params=params,
+            json=data,
+        )
+        resp.raise_for_status()
+        self.invalidate(table, [filters, {**filters, **data}])
+        return resp.json() if resp.content else []
 
-    async def delete(self, table: str, filters: dict) -> list[dict]:
+    async def delete(
+        self,
+        table: str,
+        filters: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> list[dict]:
         """DELETE rows matching filters.
 
         Args:
             table: Table name
             filters: Dict of column=value filters
+            returning: "representation" to get the rows back, "minimal" for none
+            deadline: Seconds for the whole call incl. retries (default: settings.supabase_deadline)
 
         Returns:
-            Deleted rows
+            Deleted rows ([] unless returning="representation")
         """
         params = {}
         for key, value in filters.items():
             params[key] = f"eq.{value}"
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(
-                f"{self.base_url}/{table}",
-                headers=self.headers,
-                params=params,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._send(
+            "DELETE",
+            f"{self.base_url}/{table}",
+            idempotent=True,
+            deadline=deadline,
+            headers={**self.headers, "Prefer": _prefer_return(returning)},
+            params=params,
+        )
+        resp.raise_for_status()
+        self.invalidate(table, [filters])
+        return resp.json() if resp.content else []
+
+    async def rpc(
+        self,
+        function: str,
+        params: dict | None = None,
+        read_only: bool = False,
+        deadline: float | None = None,
+    ) -> object:
+        """Call a Postgres function exposed by PostgREST.
+
+        Args:
+            function: Function name (in the public schema)
+            params: Named arguments
+            read_only: The function has no side effects, so it may be retried and hedged
+            deadline: Seconds for the whole call incl. retries (default: settings.supabase_deadline)
+
+        Returns:
+            Decoded JSON result (scalar, dict or list depending on the function)
+        """
+        resp = await self._send(
+            "POST",
+            f"{self.base_url}/rpc/{function}",
+            idempotent=read_only,
+            hedge=read_only,
+            deadline=deadline,
+            headers=self.headers,
+            json=params or {},
+        )
+        if resp.status_code >= 400:
+            logger.error(f"Supabase RPC {function} failed ({resp.status_code}): {resp.text}")
+        resp.raise_for_status()
+        return resp.json()
+
+    # --- Streaming reads ---
+
+    async def iter_rows(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: dict | None = None,
+        key: str = "id",
+        tiebreak: str | None = "id",
+        page_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """Stream every matching row, paging by keyset on `key`.
+
+        Holds at most two pages in memory: the next page is fetched while
+        the current one is being consumed. Bypasses the read cache.
+
+        Args:
+            table: Table name
+            columns: Columns to select (key/tiebreak columns are added if missing)
+            filters: Dict of column=value filters (uses eq operator)
+            key: Column to page on (e.g. "id" or "created_at")
+            tiebreak: Unique column ordering rows with equal `key` (None if `key` is unique)
+            page_size: Rows per request
+
+        Yields:
+            Rows in (key, tiebreak) order
+        """
+        if tiebreak == key:
+            tiebreak = None
+        order_cols = [key] + ([tiebreak] if tiebreak else [])
+        if columns.strip() != "*":
+            selected = [c.strip() for c in columns.split(",")]
+            columns = ",".join(selected + [c for c in order_cols if c not in selected])
+
+        base = {"select": columns, "order": ",".join(f"{c}.asc" for c in order_cols), "limit": str(page_size)}
+        for k, v in (filters or {}).items():
+            base[k] = f"eq.{v}"
+
+        def page_params(last: dict | None) -> dict:
+            if last is None:
+                return base
+            if not tiebreak:
+                return {**base, key: f"gt.{last[key]}"}
+            k, t = last[key], last[tiebreak]
+            # Values quoted: timestamps may contain characters reserved in logic trees
+            return {**base, "or": f'({key}.gt."{k}",and({key}.eq."{k}",{tiebreak}.gt."{t}"))'}
+
+        page = await self._get(table, page_params(None))
+        while page:
+            next_page = None
+            if len(page) == page_size:
+                next_page = asyncio.ensure_future(self._get(table, page_params(page[-1])))
+            try:
+                for row in page:
+                    yield row
+            except BaseException:
+                if next_page is not None:
+                    next_page.cancel()  # consumer stopped early
+                raise
+            page = await next_page if next_page is not None else []
+
+    async def get_auth_user(self, user_id: str, deadline: float | None = None) -> dict | None:
+        """Fetch one Supabase auth user via the admin API.
+
+        Returns:
+            Auth user dict (id, email, user_metadata, ...), or None if not found
+        """
+        resp = await self._send(
+            "GET",
+            f"{self.supabase_url}/auth/v1/admin/users/{user_id}",
+            idempotent=True,
+            deadline=deadline,
+            headers=self.headers,
+        )
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
+    # --- Bulk writes ---
+
+    async def _bulk_post(
+        self,
+        op: str,
+        table: str,
+        rows: list[dict],
+        prefer: list[str],
+        params: dict,
+        chunk_size: int | None,
+        idempotent: bool,
+    ) -> BulkResult:
+        """POST `rows` as JSON arrays, one request per chunk.
+
+        A failed chunk is logged and recorded; remaining chunks still run.
+        """
+        result = BulkResult()
+        if not rows:
+            return result
+
+        # Union of keys lets PostgREST default missing columns per row
+        columns = sorted({key for row in rows for key in row})
+        params = {**params, "columns": ",".join(columns)}
+        headers = {**self.headers, "Prefer": ",".join(prefer)}
+
+        for offset, chunk in _chunks(rows, chunk_size or settings.supabase_bulk_chunk_size):
+            try:
+                resp = await self._send(
+                    "POST",
+                    f"{self.base_url}/{table}",
+                    idempotent=idempotent,
+                    headers=headers,
+                    params=params,
+                    json=chunk,
+                )
+            except (httpx.HTTPError, TimeoutError) as e:
+                logger.error(f"Supabase {op} {table} chunk @{offset} failed: {e}")
+                result.failures.append(ChunkFailure(offset, len(chunk), None, str(e)))
+                continue
+
+            if resp.status_code >= 400:
+                logger.error(f"Supabase {op} {table} chunk @{offset} failed ({resp.status_code}): {resp.text}")
+                result.failures.append(ChunkFailure(offset, len(chunk), resp.status_code, resp.text))
+                continue
+
+            self.invalidate(table, chunk)
+            result.written += len(chunk)
+            if resp.content:
+                result.rows.extend(resp.json())
+
+        return result
+
+    async def insert_many(
+        self,
+        table: str,
+        rows: list[dict],
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """INSERT many rows, one round trip per chunk.
+
+        Args:
+            table: Table name
+            rows: Row dicts (may have differing keys; missing columns get defaults)
+            chunk_size: Rows per request (default: settings.supabase_bulk_chunk_size)
+            returning: "representation" to get rows back, "minimal" for none
+
+        Returns:
+            BulkResult with inserted rows and per-chunk failures
+        """
+        return await self._bulk_post(
+            "INSERT", table, rows, [_prefer_return(returning)], {}, chunk_size, idempotent=False,
+        )
+
+    async def upsert_many(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "id",
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """UPSERT many rows, one round trip per chunk.
+
+        Args:
+            table: Table name
+            rows: Row dicts
+            on_conflict: Column(s) to check for conflict
+            chunk_size: Rows per request (default: settings.supabase_bulk_chunk_size)
+            returning: "representation" to get rows back, "minimal" for none
+
+        Returns:
+            BulkResult with upserted rows and per-chunk failures
+        """
+        return await self._bulk_post(
+            "UPSERT",
+            table,
+            rows,
+            [_prefer_return(returning), "resolution=merge-duplicates"],
+            {"on_conflict": on_conflict},
+            chunk_size,
+            idempotent=True,
+        )
+
+    async def update_many(
+        self,
+        table: str,
+        data: dict,
+        column: str,
+        values: list,
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """UPDATE every row whose `column` is in `values` with the same `data`.
+
+        Uses the PostgREST `in` operator, one round trip per chunk of values.
+        For per-row different values, use upsert_many instead.
+
+        Args:
+            table: Table name
+            data: Fields to update
+            column: Column matched against `values`
+            values: Values to match
+            chunk_size: Values per request (default: settings.supabase_bulk_chunk_size)
+            returning: "representation" to get rows back, "minimal" for none
+
+        Returns:
+            BulkResult with updated rows and per-chunk failures
+        """
+        result = BulkResult()
+        # count=exact puts the matched row count in Content-Range even for return=minimal
+        headers = {**self.headers, "Prefer": f"{_prefer_return(returning)},count=exact"}
+
+        for offset, chunk in _chunks(values, chunk_size or settings.supabase_bulk_chunk_size):
+            params = {column: f"in.({','.join(str(v) for v in chunk)})"}
+            try:
+                resp = await self._send(
+                    "PATCH",
+                    f"{self.base_url}/{table}",
+                    idempotent=True,
+                    headers=headers,
+                    params=params,
+                    json=data,
+                )
+            except (httpx.HTTPError, TimeoutError) as e:
+                logger.error(f"Supabase UPDATE {table} chunk @{offset} failed: {e}")
+                result.failures.append(ChunkFailure(offset, len(chunk), None, str(e)))
+                continue
+
+            if resp.status_code >= 400:
+                logger.error(f"Supabase UPDATE {table} chunk @{offset} failed ({resp.status_code}): {resp.text}")
+                result.failures.append(ChunkFailure(offset, len(chunk), resp.status_code, resp.text))
+                continue
+
+            self.invalidate(table, [{column: v} for v in chunk] + [{column: v, **data} for v in chunk])
+            if resp.content:
+                result.rows.extend(resp.json())
+            total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+            result.written += int(total) if total.isdigit() else 0
+
+        return result
+
+
+def _make_db():
+    """Pick the data backend from settings.database_backend."""
+    if settings.database_backend == "postgres":
+        from app.database_postgres import PostgresClient
+
+        return PostgresClient()
+    return SupabaseClient()
 
 
 # Singleton instance
-db = SupabaseClient()
+db = _make_db()
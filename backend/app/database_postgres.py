@@ -0,0 +1,451 @@
+"""Direct Postgres backend for the data layer (asyncpg).
+
+Implements the same API as SupabaseClient (select/insert/upsert/update/
+delete, bulk variants, rpc) over a pooled asyncpg connection, so routers
+don't change when DATABASE_BACKEND=postgres. Statements are prepared and
+cached per connection by asyncpg.
+
+Values go in and come out the way PostgREST handles them: uuid, timestamps
+and dates are exchanged as strings, json/jsonb as Python objects. Auth
+users are read straight from auth.users, shaped like the admin API's user
+objects. Every statement runs under settings.supabase_deadline unless the
+call passes its own deadline.
+
+Unlike the REST backend this one supports real transactions:
+
+    async with db.transaction() as tx:
+        await tx.update("assistants", {...}, {"user_id": uid})
+        await tx.insert("provisioning_jobs", {...})
+
+Requires the optional `asyncpg` dependency (pip install yourclaw-api[postgres]).
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.config import settings
+from app.database import BulkResult, ChunkFailure, _chunks
+
+logger = logging.getLogger("yourclaw.database")
+
+# Exchanged as text to match PostgREST's JSON representation
+_TEXT_TYPES = ("uuid", "timestamptz", "timestamp", "date", "time")
+
+# auth.users columns under the admin API's field names
+_AUTH_USER_COLUMNS = (
+    "id, email, phone, raw_user_meta_data AS user_metadata, raw_app_meta_data AS app_metadata, "
+    "created_at, updated_at, last_sign_in_at"
+)
+
+
+def _ident(name: str) -> str:
+    """Quote a table/column identifier."""
+    return '"' + name.strip().replace('"', '""') + '"'
+
+
+def _select_list(columns: str) -> str:
+    if columns.strip() == "*":
+        return "*"
+    if "(" in columns or ":" in columns:
+        raise ValueError(f"PostgREST embedding/aliasing not supported by the postgres backend: {columns}")
+    return ", ".join(_ident(c) for c in columns.split(","))
+
+
+def _where(filters: dict | None, args: list) -> str:
+    """Build `WHERE a = $1 AND ...`, appending values to `args`."""
+    if not filters:
+        return ""
+    clauses = []
+    for key, value in filters.items():
+        args.append(value)
+        clauses.append(f"{_ident(key)} = ${len(args)}")
+    return " WHERE " + " AND ".join(clauses)
+
+
+def _assignments(data: dict, args: list) -> str:
+    parts = []
+    for key, value in data.items():
+        args.append(value)
+        parts.append(f"{_ident(key)} = ${len(args)}")
+    return ", ".join(parts)
+
+
+def _values_rows(rows: list[dict], columns: list[str], args: list) -> str:
+    """Multi-row VALUES list; keys missing from a row use the column DEFAULT."""
+    tuples = []
+    for row in rows:
+        items = []
+        for col in columns:
+            if col in row:
+                args.append(row[col])
+                items.append(f"${len(args)}")
+            else:
+                items.append("DEFAULT")
+        tuples.append(f"({', '.join(items)})")
+    return ", ".join(tuples)
+
+
+def _on_conflict(on_conflict: str, columns: list[str]) -> str:
+    conflict_cols = [c.strip() for c in on_conflict.split(",")]
+    updates = [c for c in columns if c not in conflict_cols]
+    target = ", ".join(_ident(c) for c in conflict_cols)
+    if not updates:
+        return f" ON CONFLICT ({target}) DO NOTHING"
+    sets = ", ".join(f"{_ident(c)} = EXCLUDED.{_ident(c)}" for c in updates)
+    return f" ON CONFLICT ({target}) DO UPDATE SET {sets}"
+
+
+def _returning(returning: str) -> str:
+    return " RETURNING *" if returning == "representation" else ""
+
+
+async def _init_connection(conn) -> None:
+    for typename in _TEXT_TYPES:
+        await conn.set_type_codec(typename, schema="pg_catalog", encoder=str, decoder=str, format="text")
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(typename, schema="pg_catalog", encoder=json.dumps, decoder=json.loads, format="text")
+
+
+class PostgresClient:
+    """Async Postgres client with the SupabaseClient interface."""
+
+    def __init__(self, conn=None) -> None:
+        self._pool = None
+        self._conn = conn  # set on transaction-bound clients
+
+    async def start(self) -> None:
+        """Create the connection pool. Called from the FastAPI lifespan."""
+        if self._pool is not None or self._conn is not None:
+            return
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError("DATABASE_BACKEND=postgres requires the asyncpg package") from e
+        if not settings.database_url:
+            raise RuntimeError("DATABASE_BACKEND=postgres requires DATABASE_URL")
+
+        self._pool = await asyncpg.create_pool(
+            settings.database_url,
+            min_size=settings.postgres_pool_min_size,
+            max_size=settings.postgres_pool_max_size,
+            statement_cache_size=settings.postgres_statement_cache_size,
+            init=_init_connection,
+        )
+        logger.info(
+            f"Opened Postgres pool (min={settings.postgres_pool_min_size}, "
+            f"max={settings.postgres_pool_max_size})"
+        )
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    @asynccontextmanager
+    async def _connection(self):
+        if self._conn is not None:
+            yield self._conn
+            return
+        if self._pool is None:
+            await self.start()
+        async with self._pool.acquire() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Run several statements atomically on one connection.
+
+        Yields a PostgresClient bound to the transaction's connection.
+        """
+        if self._conn is not None:
+            # Nested: savepoint on the same connection
+            async with self._conn.transaction():
+                yield self
+            return
+        async with self._connection() as conn:
+            async with conn.transaction():
+                yield PostgresClient(conn)
+
+    async def _fetch(self, sql: str, args: list, deadline: float | None = None) -> list[dict]:
+        async with self._connection() as conn:
+            rows = await conn.fetch(sql, *args, timeout=deadline or settings.supabase_deadline)
+        return [dict(r) for r in rows]
+
+    async def _execute(self, sql: str, args: list, deadline: float | None = None) -> str:
+        async with self._connection() as conn:
+            return await conn.execute(sql, *args, timeout=deadline or settings.supabase_deadline)
+
+    # The REST backend's cache hooks; nothing is cached here
+
+    def invalidate(self, table: str, rows: list[dict] | None = None) -> None:
+        pass
+
+    def stats(self) -> dict:
+        if self._pool is None:
+            return {}
+        return {"pool_size": self._pool.get_size(), "pool_idle": self._pool.get_idle_size()}
+
+    async def select(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: dict | None = None,
+        single: bool = False,
+        order_by: str | None = None,
+        order_desc: bool = False,
+        limit: int | None = None,
+        cache: bool = True,
+        deadline: float | None = None,
+    ) -> list[dict] | dict | None:
+        """SELECT query. Same arguments as SupabaseClient.select."""
+        args: list = []
+        sql = f"SELECT {_select_list(columns)} FROM {_ident(table)}{_where(filters, args)}"
+        if order_by:
+            sql += f" ORDER BY {_ident(order_by)} {'DESC' if order_desc else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        data = await self._fetch(sql, args, deadline)
+        if single:
+            return data[0] if data else None
+        return data
+
+    async def insert(
+        self,
+        table: str,
+        data: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> dict:
+        """INSERT a single row. Same arguments as SupabaseClient.insert."""
+        columns = list(data)
+        args: list = []
+        sql = (
+            f"INSERT INTO {_ident(table)} ({', '.join(_ident(c) for c in columns)}) "
+            f"VALUES {_values_rows([data], columns, args)}{_returning(returning)}"
+        )
+        result = await self._fetch(sql, args, deadline)
+        return result[0] if result else {}
+
+    async def upsert(
+        self,
+        table: str,
+        data: dict,
+        on_conflict: str = "id",
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> dict:
+        """UPSERT (insert or update on conflict). Same arguments as SupabaseClient.upsert."""
+        columns = list(data)
+        args: list = []
+        sql = (
+            f"INSERT INTO {_ident(table)} ({', '.join(_ident(c) for c in columns)}) "
+            f"VALUES {_values_rows([data], columns, args)}"
+            f"{_on_conflict(on_conflict, columns)}{_returning(returning)}"
+        )
+        result = await self._fetch(sql, args, deadline)
+        return result[0] if result else {}
+
+    async def update(
+        self,
+        table: str,
+        data: dict,
+        filters: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> list[dict]:
+        """UPDATE rows matching filters. Same arguments as SupabaseClient.update."""
+        args: list = []
+        sql = f"UPDATE {_ident(table)} SET {_assignments(data, args)}{_where(filters, args)}{_returning(returning)}"
+        return await self._fetch(sql, args, deadline)
+
+    async def delete(
+        self,
+        table: str,
+        filters: dict,
+        returning: str = "representation",
+        deadline: float | None = None,
+    ) -> list[dict]:
+        """DELETE rows matching filters. Same arguments as SupabaseClient.delete."""
+        args: list = []
+        sql = f"DELETE FROM {_ident(table)}{_where(filters, args)}{_returning(returning)}"
+        return await self._fetch(sql, args, deadline)
+
+    async def rpc(
+        self,
+        function: str,
+        params: dict | None = None,
+        read_only: bool = False,
+        deadline: float | None = None,
+    ) -> object:
+        """Call a Postgres function with named arguments and return its value."""
+        args: list = []
+        named = []
+        for key, value in (params or {}).items():
+            args.append(value)
+            named.append(f"{_ident(key)} => ${len(args)}")
+        sql = f"SELECT {_ident(function)}({', '.join(named)})"
+        async with self._connection() as conn:
+            return await conn.fetchval(sql, *args, timeout=deadline or settings.supabase_deadline)
+
+    async def iter_rows(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: dict | None = None,
+        key: str = "id",
+        tiebreak: str | None = "id",
+        page_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """Stream every matching row, paging by keyset on (key, tiebreak).
+
+        Same contract as SupabaseClient.iter_rows: at most two pages in
+        memory, next page fetched while the current one is consumed.
+        """
+        if tiebreak == key:
+            tiebreak = None
+        order_cols = [key] + ([tiebreak] if tiebreak else [])
+        if columns.strip() != "*":
+            selected = [c.strip() for c in columns.split(",")]
+            columns = ",".join(selected + [c for c in order_cols if c not in selected])
+        order = ", ".join(_ident(c) for c in order_cols)
+
+        async def fetch(last: dict | None) -> list[dict]:
+            args: list = []
+            where = _where(filters, args)
+            if last is not None:
+                placeholders = []
+                for col in order_cols:
+                    args.append(last[col])
+                    placeholders.append(f"${len(args)}")
+                cursor = f"({order}) > ({', '.join(placeholders)})"
+                where = f"{where} AND {cursor}" if where else f" WHERE {cursor}"
+            sql = (
+                f"SELECT {_select_list(columns)} FROM {_ident(table)}{where} "
+                f"ORDER BY {order} LIMIT {int(page_size)}"
+            )
+            return await self._fetch(sql, args)
+
+        page = await fetch(None)
+        while page:
+            next_page = asyncio.ensure_future(fetch(page[-1])) if len(page) == page_size else None
+            try:
+                for row in page:
+                    yield row
+            except BaseException:
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            page = await next_page if next_page is not None else []
+
+    async def get_auth_user(self, user_id: str, deadline: float | None = None) -> dict | None:
+        """Fetch one auth user from auth.users. Same result as SupabaseClient.get_auth_user.
+
+        Returns:
+            Auth user dict (id, email, user_metadata, ...), or None if not found
+        """
+        sql = f"SELECT {_AUTH_USER_COLUMNS} FROM auth.users WHERE id = $1"
+        rows = await self._fetch(sql, [str(user_id)], deadline)
+        return rows[0] if rows else None
+
+    # --- Bulk writes ---
+
+    async def _bulk_insert(
+        self,
+        op: str,
+        table: str,
+        rows: list[dict],
+        on_conflict: str | None,
+        chunk_size: int | None,
+        returning: str,
+    ) -> BulkResult:
+        result = BulkResult()
+        if not rows:
+            return result
+
+        columns = sorted({key for row in rows for key in row})
+        col_list = ", ".join(_ident(c) for c in columns)
+
+        for offset, chunk in _chunks(rows, chunk_size or settings.supabase_bulk_chunk_size):
+            args: list = []
+            sql = f"INSERT INTO {_ident(table)} ({col_list}) VALUES {_values_rows(chunk, columns, args)}"
+            if on_conflict:
+                sql += _on_conflict(on_conflict, columns)
+            sql += _returning(returning)
+            try:
+                if returning == "representation":
+                    result.rows.extend(await self._fetch(sql, args))
+                else:
+                    await self._execute(sql, args)
+            except Exception as e:
+                if self._conn is not None:
+                    raise  # a failed statement aborts the whole transaction
+                logger.error(f"Postgres {op} {table} chunk @{offset} failed: {e}")
+                result.failures.append(ChunkFailure(offset, len(chunk), None, str(e)))
+                continue
+            result.written += len(chunk)
+
+        return result
+
+    async def insert_many(
+        self,
+        table: str,
+        rows: list[dict],
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """INSERT many rows, one statement per chunk."""
+        return await self._bulk_insert("INSERT", table, rows, None, chunk_size, returning)
+
+    async def upsert_many(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "id",
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """UPSERT many rows, one statement per chunk."""
+        return await self._bulk_insert("UPSERT", table, rows, on_conflict, chunk_size, returning)
+
+    async def update_many(
+        self,
+        table: str,
+        data: dict,
+        column: str,
+        values: list,
+        chunk_size: int | None = None,
+        returning: str = "representation",
+    ) -> BulkResult:
+        """UPDATE every row whose `column` is in `values` with the same `data`."""
+        result = BulkResult()
+
+        for offset, chunk in _chunks(values, chunk_size or settings.supabase_bulk_chunk_size):
+            args: list = []
+            sets = _assignments(data, args)
+            placeholders = []
+            for value in chunk:
+                args.append(value)
+                placeholders.append(f"${len(args)}")
+            sql = (
+                f"UPDATE {_ident(table)} SET {sets} "
+                f"WHERE {_ident(column)} IN ({', '.join(placeholders)}){_returning(returning)}"
+            )
+            try:
+                if returning == "representation":
+                    rows = await self._fetch(sql, args)
+                    result.rows.extend(rows)
+                    result.written += len(rows)
+                else:
+                    status = await self._execute(sql, args)  # e.g. "UPDATE 3"
+                    result.written += int(status.rsplit(" ", 1)[-1])
+            except Exception as e:
+                if self._conn is not None:
+                    raise
+                logger.error(f"Postgres UPDATE {table} chunk @{offset} failed: {e}")
+                result.failures.append(ChunkFailure(offset, len(chunk), None, str(e)))
+
+        return result
@@ -1,11 +1,17 @@
 import logging
+import math
+from contextlib import asynccontextmanager
 
 import httpx
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.auth import auth_stats, require_admin
 from app.config import settings
+from app.database import db
 from app.schemas import HealthResponse
+from app.services import idempotency, infra_api, secret_cache, user_profiles
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,11 +19,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger("yourclaw")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared connection pools on startup, close them on shutdown."""
+    await db.start()
+    await infra_api.start()
+    await ensure_dev_user()
+    try:
+        yield
+    finally:
+        await infra_api.close()
+        await db.close()
+
+
 app = FastAPI(
     title="YourClaw API",
     version="0.1.0",
     docs_url="/docs",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Build CORS origins list (include www variants automatically)
@@ -53,11 +74,40 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(infra_api.InfraUnavailable)
+async def infra_unavailable(request: Request, exc: infra_api.InfraUnavailable) -> JSONResponse:
+    """Infra API calls refused by the breaker/limiter: tell the client to retry later."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "code": "infra_unavailable"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     return HealthResponse(status="ok", version="0.1.0")
 
 
+@app.get("/health/stats", dependencies=[Depends(require_admin)])
+async def health_stats() -> dict:
+    """In-process cache and client counters for this worker. Requires ADMIN_API_KEY."""
+    return {
+        "database": db.stats(),
+        "auth": auth_stats(),
+        "user_profiles": user_profiles.stats(),
+        "secret_cache": secret_cache.stats(),
+        "infra_api": infra_api.stats(),
+        "idempotency": idempotency.stats(),
+    }
+
+
+@app.get("/health/provisioning", dependencies=[Depends(require_admin)])
+async def health_provisioning(hours: int = Query(24, ge=1, le=168)) -> dict:
+    """Per-step provisioning duration percentiles (ms) over recently completed jobs."""
+    return await db.rpc("provisioning_step_percentiles", {"p_hours": hours})
+
+
 @app.post("/api/v1/test/welcome-email")
 async def test_welcome_email(
     email: str = "test@example.com",
@@ -90,7 +140,6 @@ async def test_cancellation_email(
     return {"status": "sent", "to": email, "first_name": first_name, "channel": channel}
 
 
-@app.on_event("startup")
 async def ensure_dev_user() -> None:
     """In dev mode, create the dev user in Supabase auth if it doesn't exist."""
     if not settings.dev_user_id:
@@ -4,13 +4,15 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.auth import get_current_user
 from app.config import settings
 from app.database import db
 from app.schemas import ApiKeyInput, ApiKeyResponse
-from app.services import infra_api
-from app.services.infra_api import infra_user_id as _infra_user_id
+from app.services import provisioning, secret_cache
+from app.services.assistant_state import transition
 from app.services.encryption import encrypt
+from app.services.provisioning import PROVIDER_KEY_MAP, get_provision_secrets, provider_for_model
+from app.timeline import Timeline
+from app.user_context import UserContext, get_user_context
 
 router = APIRouter(prefix="/api-keys", tags=["api-keys"])
 logger = logging.getLogger("yourclaw.api_keys")
@@ -19,67 +21,55 @@ logger = logging.getLogger("yourclaw.api_keys")
 VALID_PROVIDERS = ["ANTHROPIC", "OPENAI", "GOOGLE", "VERCEL"]
 
 
-async def trigger_reprovisioning(user_id: str) -> bool:
+async def trigger_reprovisioning(ctx: UserContext) -> bool:
     """Trigger reprovisioning if user has an active assistant.
 
-    Re-provisions directly via infra API with updated keys.
-    Returns True if reprovisioning was triggered.
+    Queues an in-place reconfiguration of the current claw with the updated
+    keys for app.worker. Returns True if reprovisioning was triggered.
     """
-    from app.routers.assistants import _get_provision_keys
-    from app.services.encryption import decrypt
-
-    assistant = await db.select("assistants", filters={"user_id": user_id}, single=True)
-    if not assistant or assistant.get("status") not in ["READY", "ERROR"]:
+    user_id = ctx.user_id
+
+    # READY/ERROR -> PROVISIONING in one step; anything else is left alone
+    timeline = Timeline()
+    job_id = str(uuid.uuid4())
+    with timeline.span("claim_assistant"):
+        claimed = await transition(user_id, "PROVISIONING", ["READY", "ERROR"], pending_job_id=job_id)
+    if not claimed.applied:
         return False
 
+    assistant = claimed.assistant
     claw_id = assistant.get("claw_id")
     model = assistant.get("model", "anthropic/claude-sonnet-4-5-20250929")
     if not claw_id:
+        # Nothing to reprovision: restore the previous status
+        await transition(user_id, claimed.previous["status"], ["PROVISIONING"])
         return False
 
-    # Get telegram bot token
-    phone_row = await db.select("user_phones", filters={"user_id": user_id}, single=True)
-    telegram_bot_token = ""
-    if phone_row and phone_row.get("telegram_bot_token_encrypted"):
-        telegram_bot_token = decrypt(phone_row["telegram_bot_token_encrypted"])
-
-    provision_keys = await _get_provision_keys(user_id)
-
-    # Check the model's provider key is still present
-    from app.routers.assistants import _PROVIDER_KEY_MAP, _get_provider_for_model
-    provider = _get_provider_for_model(model)
-    required_key = _PROVIDER_KEY_MAP.get(provider)
-    if required_key and required_key not in provision_keys:
-        await db.update("assistants", {"status": "ERROR", "updated_at": datetime.utcnow().isoformat()}, {"user_id": user_id})
+    # Check the model's provider key is still present (fail now rather than in the worker)
+    secrets = await get_provision_secrets(ctx)
+    provider = provider_for_model(model)
+    required_key = PROVIDER_KEY_MAP.get(provider)
+    if required_key and required_key not in secrets.api_keys:
+        await transition(user_id, "ERROR", ["PROVISIONING"], expected_claw_id=claw_id)
         logger.warning(f"Cannot reprovision user {user_id}: no {provider} key for model {model}")
         return False
 
-    await db.update("assistants", {"status": "PROVISIONING", "updated_at": datetime.utcnow().isoformat()}, {"user_id": user_id})
-
     try:
-        await infra_api.provision(
-            user_id=_infra_user_id(user_id),
-            claw_id=claw_id,
-            model=model,
-            telegram_bot_token=telegram_bot_token,
-            **provision_keys,
-        )
-        await db.update("assistants", {"status": "READY", "updated_at": datetime.utcnow().isoformat()}, {"user_id": user_id})
-        logger.info(f"Reprovisioned user {user_id} with updated API keys")
+        await provisioning.enqueue(user_id, claw_id, model, reconfigure=True, timeline=timeline, job_id=job_id)
         return True
     except Exception as e:
-        logger.error(f"Reprovisioning failed for user {user_id}: {e}")
-        await db.update("assistants", {"status": "ERROR", "updated_at": datetime.utcnow().isoformat()}, {"user_id": user_id})
+        logger.error(f"Failed to queue reprovisioning for user {user_id}: {e}")
+        await transition(user_id, "ERROR", ["PROVISIONING"], expected_claw_id=claw_id)
         return False
 
 
 @router.get("", response_model=list[ApiKeyResponse])
 async def list_api_keys(
-    user_id: uuid.UUID = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
 ) -> list[ApiKeyResponse]:
     """List user's API keys (without exposing actual values)."""
 
-    keys = await db.select("api_keys", filters={"user_id": str(user_id)})
+    keys = await ctx.api_keys()
 
     return [
         ApiKeyResponse(
@@ -94,7 +84,7 @@ async def list_api_keys(
 @router.post("", response_model=ApiKeyResponse, status_code=201)
 async def add_api_key(
     body: ApiKeyInput,
-    user_id: uuid.UUID = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
 ) -> ApiKeyResponse:
     """Store user's own API key (BYOK).
 
@@ -114,15 +104,19 @@ async def add_api_key(
     await db.upsert(
         "api_keys",
         {
-            "user_id": str(user_id),
+            "user_id": ctx.user_id,
             "provider": body.provider,
             "encrypted_key": encrypted,
         },
         on_conflict="user_id,provider",
+        returning="minimal",
     )
 
+    ctx.forget("api_keys")
+    secret_cache.invalidate(ctx.user_id)
+
     # Trigger reprovisioning to apply new key
-    await trigger_reprovisioning(str(user_id))
+    await trigger_reprovisioning(ctx)
 
     return ApiKeyResponse(
         provider=body.provider,
@@ -134,7 +128,7 @@ async def add_api_key(
 @router.delete("", status_code=204)
 async def delete_api_key(
     provider: str = "ANTHROPIC",
-    user_id: uuid.UUID = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
 ) -> None:
     """Remove user's API key.
 
@@ -148,9 +142,11 @@ async def delete_api_key(
             detail=f"Invalid provider. Valid providers: {', '.join(VALID_PROVIDERS)}"
         )
 
-    result = await db.delete("api_keys", {"user_id": str(user_id), "provider": provider})
+    result = await db.delete("api_keys", {"user_id": ctx.user_id, "provider": provider})
     if not result:
         raise HTTPException(status_code=404, detail="No API key found for this provider")
+    ctx.forget("api_keys")
+    secret_cache.invalidate(ctx.user_id)
 
     # Trigger reprovisioning (will set ERROR if model needs this provider's key)
-    await trigger_reprovisioning(str(user_id))
+    await trigger_reprovisioning(ctx)
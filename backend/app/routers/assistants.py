@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 
 from app.auth import get_current_user
 from app.config import settings
@@ -14,89 +15,75 @@ from app.schemas import (
     AssistantUpdateInput,
     AVAILABLE_MODELS,
     DEFAULT_MODEL,
+    ProvisioningStep,
+    ProvisioningTimeline,
 )
-from app.services import infra_api
+from app.services import idempotency, infra_api, provisioning, secret_cache
+from app.services.assistant_state import transition
 from app.services.infra_api import infra_user_id as _infra_user_id
 from app.services.encryption import encrypt
+from app.services.provisioning import get_provision_secrets, provider_for_model
+from app.timeline import Timeline
+from app.user_context import UserContext, get_user_context
 
 logger = logging.getLogger("yourclaw.assistants")
 
 router = APIRouter(prefix="/assistants", tags=["assistants"])
 
-_PROVIDER_KEY_MAP = {
-    "ANTHROPIC": "anthropic_key",
-    "OPENAI": "openai_key",
-    "GOOGLE": "google_key",
-    "VERCEL": "ai_gateway_key",
-}
 
-# Map model prefixes to the BYOK provider name stored in the api_keys table
-_MODEL_PREFIX_TO_PROVIDER = {
-    "anthropic": "ANTHROPIC",
-    "openai": "OPENAI",
-    "minimax": "VERCEL",
-}
-
-
-def _get_provider_for_model(model: str) -> str:
-    """Extract provider from model ID (e.g., 'anthropic/claude-sonnet-4-5' -> 'ANTHROPIC')."""
-    prefix = model.split("/")[0]
-    return _MODEL_PREFIX_TO_PROVIDER.get(prefix, prefix.upper())
-
-
-async def _validate_provider_key(user_id: str, model: str) -> None:
+async def _validate_provider_key(ctx: UserContext, model: str) -> None:
     """Raise 400 if user has no BYOK API key for the selected model's provider."""
-    provider = _get_provider_for_model(model)
-    row = await db.select("api_keys", filters={"user_id": user_id, "provider": provider}, single=True)
-    if not row or not row.get("encrypted_key"):
+    provider = provider_for_model(model)
+    secrets = await get_provision_secrets(ctx)
+    if provider not in secrets.providers:
         raise HTTPException(
             status_code=400,
             detail=f"API key required for {provider}. Add your {provider} key in the API Keys section first.",
         )
 
 
-async def _get_provision_keys(user_id: str) -> dict[str, str]:
-    """Build API key dict for infra API provision call.
+async def _lost_key_race(
+    user_id: str, idempotency_key: str | None, claw_id: str, previous: dict | None,
+) -> bool:
+    """After a failed enqueue: whether a request with the same key queued its job first.
 
-    Uses the user's BYOK keys configured in the dashboard.
-    When VERCEL key is present, only the ai_gateway_key is sent
-    (Vercel AI Gateway routes to all providers).
+    Two retries can miss each other's job and both claim the assistant, one
+    after the other; the unique (user_id, idempotency_key) index then rejects
+    the second job. The second claim is undone so the caller can answer as a
+    replay of the first request instead of failing the assistant.
     """
-    from app.services.encryption import decrypt
-
-    keys: dict[str, str] = {}
-
-    # BYOK keys from dashboard (individual provider keys)
-    byok_rows = await db.select("api_keys", filters={"user_id": user_id})
-    has_vercel = any(row["provider"] == "VERCEL" for row in byok_rows)
-
-    for row in byok_rows:
-        provider = row["provider"]
-        encrypted = row.get("encrypted_key")
-        if not encrypted:
-            continue
-
-        # When Vercel key is present, only pass ai_gateway_key
-        if has_vercel and provider != "VERCEL":
-            continue
-
-        decrypted = decrypt(encrypted)
-        key_name = _PROVIDER_KEY_MAP.get(provider)
-        if key_name:
-            keys[key_name] = decrypted
+    if not idempotency_key:
+        return False
+    job = await db.select(
+        "provisioning_jobs",
+        columns="id",
+        filters={"user_id": user_id, "idempotency_key": idempotency_key},
+        single=True,
+        cache=False,
+    )
+    if not job:
+        return False
 
-    return keys
+    if previous:
+        await transition(
+            user_id, previous["status"], ["PROVISIONING"], expected_claw_id=claw_id,
+            model=previous.get("model"), claw_id=previous.get("claw_id"), clear_claw_id=not previous.get("claw_id"),
+        )
+    else:
+        await transition(user_id, "NONE", ["PROVISIONING"], expected_claw_id=claw_id, clear_claw_id=True)
+    return True
 
 
 @router.get("", response_model=AssistantResponse)
-async def get_assistant(user_id: uuid.UUID = Depends(get_current_user)) -> AssistantResponse:
+async def get_assistant(ctx: UserContext = Depends(get_user_context)) -> AssistantResponse:
     """Get current user's assistant status.
 
-    When DB says READY or PROVISIONING, checks real pod status from infra API.
-    Updates DB if pod is not actually ready.
+    Pure DB read: pod readiness is pushed by the infra API
+    (POST /webhooks/infra) and stored on the assistant row.
     """
-
-    row = await db.select("assistants", filters={"user_id": str(user_id)}, single=True)
+    # The phone row is needed either way; load it alongside the assistant
+    await ctx.prefetch("assistant", "phone")
+    row = await ctx.assistant()
 
     if not row:
         return AssistantResponse(status="NONE")
@@ -104,26 +91,12 @@ async def get_assistant(user_id: uuid.UUID = Depends(get_current_user)) -> Assis
     db_status = row["status"]
     claw_id = row.get("claw_id")
 
-    # Check real pod status for READY/PROVISIONING states
-    if db_status in ("READY", "PROVISIONING") and claw_id:
-        try:
-            pod_status = await infra_api.get_status(_infra_user_id(user_id), claw_id)
-            pod_ready = pod_status.get("ready", False)
-
-            if db_status == "READY" and not pod_ready:
-                db_status = "PROVISIONING"
-            elif db_status == "PROVISIONING" and pod_ready:
-                db_status = "READY"
-                await db.update(
-                    "assistants",
-                    {"status": "READY", "updated_at": datetime.utcnow().isoformat()},
-                    {"user_id": str(user_id)},
-                )
-        except Exception as e:
-            logger.warning(f"Failed to check pod status for {claw_id}: {e}")
+    # READY but the pod last reported not ready (restarting, rescheduled)
+    if db_status == "READY" and row.get("pod_ready") is False:
+        db_status = "PROVISIONING"
 
     # Get channel from user_phones
-    phone_row = await db.select("user_phones", filters={"user_id": str(user_id)}, single=True)
+    phone_row = await ctx.phone()
     channel = phone_row["channel"] if phone_row else None
 
     return AssistantResponse(
@@ -136,15 +109,103 @@ async def get_assistant(user_id: uuid.UUID = Depends(get_current_user)) -> Assis
     )
 
 
-@router.post("", response_model=AssistantCreateResponse, status_code=200)
+@router.get("/timeline", response_model=ProvisioningTimeline)
+async def get_provisioning_timeline(ctx: UserContext = Depends(get_user_context)) -> ProvisioningTimeline:
+    """Where the time went in the latest provision, request to ready pod.
+
+    Backend steps come from the provisioning job; the infra API adds its
+    resource creation steps and the pod's Kubernetes milestones.
+    """
+    user_id = ctx.user_id
+    job = await db.select(
+        "provisioning_jobs",
+        columns="claw_id,status,timeline,created_at",
+        filters={"user_id": user_id},
+        order_by="created_at",
+        order_desc=True,
+        single=True,
+        cache=False,
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="No provisioning found")
+
+    created_at = datetime.fromisoformat(job["created_at"]).timestamp()
+    timeline = Timeline.from_dict(job.get("timeline") or {"started_at": created_at})
+    start = timeline.started_at
+    steps = [
+        ProvisioningStep(name=st["name"], source="backend", at_ms=round((st["start"] - start) * 1000, 1), ms=st["ms"])
+        for st in timeline.steps
+    ]
+
+    total_ms = None
+    infra = None
+    if job.get("claw_id"):
+        try:
+            infra = await infra_api.get_timeline(_infra_user_id(user_id), job["claw_id"])
+        except Exception as e:
+            logger.warning(f"Failed to get infra timeline for user {user_id}: {e}")
+    if infra and infra.get("started_at"):
+        offset = (infra["started_at"] - start) * 1000
+        steps += [
+            ProvisioningStep(
+                name=st["name"],
+                source="infra" if st["source"] == "control_plane" else st["source"],
+                at_ms=round(st["at_ms"] + offset, 1),
+                ms=st.get("ms"),
+            )
+            for st in infra["steps"]
+        ]
+        if infra.get("total_ms") is not None:
+            total_ms = round(infra["total_ms"] + offset, 1)
+
+    return ProvisioningTimeline(
+        claw_id=job.get("claw_id"),
+        status=job["status"],
+        started_at=datetime.fromtimestamp(start, timezone.utc),
+        steps=sorted(steps, key=lambda st: st.at_ms),
+        total_ms=total_ms,
+    )
+
+
+@router.post("", response_model=AssistantCreateResponse, status_code=202)
 async def create_assistant(
     body: AssistantCreateInput = AssistantCreateInput(),
-    user_id: uuid.UUID = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
+    idempotency_key: str | None = Header(None),
 ) -> AssistantCreateResponse:
     """Create or recreate user's assistant.
 
-    Calls the infra API to provision an OpenClaw instance directly.
+    Validates the request, moves the assistant to PROVISIONING and queues the
+    provision for app.worker. Poll GET /assistants for READY or ERROR.
+
+    Retries sent with the same Idempotency-Key header get the first
+    request's response instead of provisioning again. Reusing a key for a
+    different request is a 422.
     """
+    try:
+        return await idempotency.run(
+            "create_assistant", ctx.user_id, idempotency_key,
+            lambda: _create_assistant(body, ctx, idempotency_key),
+            fingerprint=idempotency.fingerprint(body),
+        )
+    except idempotency.KeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _create_assistant(
+    body: AssistantCreateInput, ctx: UserContext, idempotency_key: str | None,
+) -> AssistantCreateResponse:
+    user_id = ctx.user_id
+    timeline = Timeline()
+    fingerprint = idempotency.fingerprint(body)
+
+    # Replay of a request another process already handled
+    if idempotency_key:
+        job = await provisioning.find_job(user_id, idempotency_key, "create_assistant", fingerprint)
+        if job:
+            return AssistantCreateResponse(
+                status="PROVISIONING", model=job["model"], channel=job["channel"], claw_id=job["claw_id"],
+            )
 
     # Validate model
     model = body.model
@@ -154,12 +215,20 @@ async def create_assistant(
             detail=f"Invalid model. Available: {', '.join(AVAILABLE_MODELS)}",
         )
 
+    # Everything below reads these; fetch them in parallel up front
+    # (api_keys only if the decrypted secrets aren't cached)
+    rows = ["phone"]
+    if not settings.mock_stripe:
+        rows.append("subscription")
+    with timeline.span("load_user"):
+        await asyncio.gather(ctx.prefetch(*rows), get_provision_secrets(ctx))
+
     # Validate user has a BYOK key for the model's provider
-    await _validate_provider_key(str(user_id), model)
+    await _validate_provider_key(ctx, model)
 
     # Check subscription is active (skip in mock mode)
     if not settings.mock_stripe:
-        sub = await db.select("subscriptions", filters={"user_id": str(user_id)}, single=True)
+        sub = await ctx.subscription()
         if not sub or sub["status"] != "ACTIVE":
             raise HTTPException(
                 status_code=402,
@@ -175,10 +244,23 @@ async def create_assistant(
         if not body.telegram_username:
             raise HTTPException(status_code=400, detail="Telegram username required")
 
-    # Check if already provisioning
-    assistant = await db.select("assistants", filters={"user_id": str(user_id)}, single=True)
-    if assistant and assistant["status"] == "PROVISIONING":
-        phone_row = await db.select("user_phones", filters={"user_id": str(user_id)}, single=True)
+    # Generate claw_id
+    claw_id = f"claw-{uuid.uuid4().int % 10**7}"
+
+    # Claim the assistant: any state but PROVISIONING -> PROVISIONING (creates the row if needed)
+    with timeline.span("claim_assistant"):
+        claimed = await transition(
+            user_id,
+            "PROVISIONING",
+            ["NONE", "READY", "ERROR"],
+            model=model,
+            claw_id=claw_id,
+            create=True,
+        )
+    if not claimed.applied:
+        # Already provisioning (possibly by a concurrent request)
+        assistant = claimed.assistant or {}
+        phone_row = await ctx.phone()
         return AssistantCreateResponse(
             status="PROVISIONING",
             model=assistant.get("model", DEFAULT_MODEL),
@@ -186,105 +268,73 @@ async def create_assistant(
             claw_id=assistant.get("claw_id"),
         )
 
-    # Generate claw_id
-    claw_id = f"claw-{uuid.uuid4().int % 10**7}"
-
-    # Set status to PROVISIONING
-    now = datetime.utcnow().isoformat()
-    if assistant:
-        # Deprovision existing instance first
-        old_claw_id = assistant.get("claw_id")
-        if old_claw_id:
-            try:
-                await infra_api.deprovision(_infra_user_id(user_id), old_claw_id)
-            except Exception as e:
-                logger.warning(f"Failed to deprovision old claw {old_claw_id}: {e}")
-
-        await db.update(
-            "assistants",
-            {"status": "PROVISIONING", "model": model, "claw_id": claw_id, "updated_at": now},
-            {"user_id": str(user_id)},
-        )
-    else:
-        await db.insert(
-            "assistants",
-            {"user_id": str(user_id), "status": "PROVISIONING", "model": model, "claw_id": claw_id},
-        )
-
-    # Build channel-specific params
-    telegram_bot_token = ""
-    telegram_allow_from = None
-    whatsapp_allow_from = None
+    old_claw_id = claimed.previous.get("claw_id") if claimed.previous else None
 
-    if channel == "WHATSAPP":
-        phone_row = await db.select("user_phones", filters={"user_id": str(user_id)}, single=True)
-        phone_e164 = phone_row.get("phone_e164") if phone_row else None
-        if phone_e164:
-            whatsapp_allow_from = [phone_e164]
-
-    elif channel == "TELEGRAM":
-        # Store telegram bot token + username if provided
+    # Store telegram bot token + username before the worker reads them
+    if channel == "TELEGRAM":
         phone_update: dict = {}
         if body.telegram_bot_token:
             phone_update["telegram_bot_token_encrypted"] = encrypt(body.telegram_bot_token)
         if body.telegram_username:
             phone_update["telegram_username"] = body.telegram_username.lstrip("@").strip()
         if phone_update:
-            await db.update("user_phones", phone_update, {"user_id": str(user_id)})
-
-        # Get bot token + username (from input or stored)
-        phone_row = await db.select("user_phones", filters={"user_id": str(user_id)}, single=True)
-        telegram_bot_token = body.telegram_bot_token or ""
-        if not telegram_bot_token and phone_row and phone_row.get("telegram_bot_token_encrypted"):
-            from app.services.encryption import decrypt
-            telegram_bot_token = decrypt(phone_row["telegram_bot_token_encrypted"])
+            with timeline.span("store_channel"):
+                await db.update("user_phones", phone_update, {"user_id": user_id}, returning="minimal")
+            ctx.forget("phone")
+            secret_cache.invalidate(user_id)
 
-        telegram_username = body.telegram_username or (phone_row.get("telegram_username") if phone_row else None)
-        telegram_allow_from = [telegram_username] if telegram_username else None
-
-    # Build API keys (shared + BYOK overrides)
-    provision_keys = await _get_provision_keys(str(user_id))
-
-    # Call infra API to provision
+    # app.worker deprovisions the old instance and provisions the new one
     try:
-        await infra_api.provision(
-            user_id=_infra_user_id(user_id),
-            claw_id=claw_id,
-            model=model,
-            telegram_bot_token=telegram_bot_token,
-            telegram_allow_from=telegram_allow_from,
-            whatsapp_allow_from=whatsapp_allow_from,
-            **provision_keys,
-        )
-
-        await db.update(
-            "assistants",
-            {"status": "READY", "claw_id": claw_id, "updated_at": datetime.utcnow().isoformat()},
-            {"user_id": str(user_id)},
+        await provisioning.enqueue(
+            user_id, claw_id, model,
+            channel=channel, previous_claw_id=old_claw_id, timeline=timeline,
+            idempotency_key=idempotency_key, idempotency_scope="create_assistant", request_fingerprint=fingerprint,
         )
-
-        logger.info(f"Assistant provisioned for user {user_id}: claw_id={claw_id}, channel={channel}")
-        return AssistantCreateResponse(status="READY", model=model, channel=channel, claw_id=claw_id)
-
     except Exception as e:
-        logger.error(f"Provisioning failed for user {user_id}: {e}")
-        await db.update(
-            "assistants",
-            {"status": "ERROR", "updated_at": datetime.utcnow().isoformat()},
-            {"user_id": str(user_id)},
-        )
-        raise HTTPException(status_code=500, detail=f"Provisioning failed: {e}")
+        if await _lost_key_race(user_id, idempotency_key, claw_id, claimed.previous):
+            return await _create_assistant(body, ctx, idempotency_key)
+        logger.error(f"Failed to queue provisioning for user {user_id}: {e}")
+        await transition(user_id, "ERROR", ["PROVISIONING"], expected_claw_id=claw_id)
+        raise HTTPException(status_code=500, detail="Failed to start provisioning")
 
+    return AssistantCreateResponse(status="PROVISIONING", model=model, channel=channel, claw_id=claw_id)
 
-@router.patch("", response_model=AssistantResponse)
+
+@router.patch("", response_model=AssistantResponse, status_code=202)
 async def update_assistant(
     body: AssistantUpdateInput,
-    user_id: uuid.UUID = Depends(get_current_user),
+    ctx: UserContext = Depends(get_user_context),
+    idempotency_key: str | None = Header(None),
 ) -> AssistantResponse:
     """Update assistant settings (e.g., model).
 
-    Deprovisions old instance, provisions new one with updated settings.
+    Queues a reconfiguration of the current instance for app.worker: new
+    config, one pod restart, same claw_id and workspace. An assistant
+    without an instance gets a fresh one. Honors Idempotency-Key like POST.
     """
+    try:
+        return await idempotency.run(
+            "update_assistant", ctx.user_id, idempotency_key,
+            lambda: _update_assistant(body, ctx, idempotency_key),
+            fingerprint=idempotency.fingerprint(body),
+        )
+    except idempotency.KeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def _update_assistant(
+    body: AssistantUpdateInput, ctx: UserContext, idempotency_key: str | None,
+) -> AssistantResponse:
+    user_id = ctx.user_id
+    fingerprint = idempotency.fingerprint(body)
+
+    # Replay of a request another process already handled
+    if idempotency_key:
+        job = await provisioning.find_job(user_id, idempotency_key, "update_assistant", fingerprint)
+        if job:
+            return AssistantResponse(
+                status="PROVISIONING", model=job["model"], claw_id=job["claw_id"], updated_at=job["created_at"],
+            )
 
     if body.model not in AVAILABLE_MODELS:
         raise HTTPException(
@@ -292,109 +342,73 @@ async def update_assistant(
             detail=f"Invalid model. Available: {', '.join(AVAILABLE_MODELS)}",
         )
 
-    # Validate user has a BYOK key for the model's provider
-    await _validate_provider_key(str(user_id), body.model)
-
-    assistant = await db.select("assistants", filters={"user_id": str(user_id)}, single=True)
-    if not assistant:
-        raise HTTPException(status_code=404, detail="No assistant found")
+    timeline = Timeline()
+    with timeline.span("load_user"):
+        await asyncio.gather(ctx.prefetch("phone", "assistant"), get_provision_secrets(ctx))
 
-    if assistant["status"] == "PROVISIONING":
+    # Validate user has a BYOK key for the model's provider
+    await _validate_provider_key(ctx, body.model)
+
+    current = await ctx.assistant()
+    claw_id = current.get("claw_id") if current else None
+    job_id = None
+    with timeline.span("claim_assistant"):
+        if claw_id:
+            # Reconfigure the running claw in place; the job owns the
+            # PROVISIONING state until it has applied the new config
+            job_id = str(uuid.uuid4())
+            claimed = await transition(
+                user_id, "PROVISIONING", ["READY", "ERROR"],
+                expected_claw_id=claw_id, model=body.model, pending_job_id=job_id,
+            )
+        else:
+            claw_id = f"claw-{uuid.uuid4().int % 10**7}"
+            claimed = await transition(
+                user_id, "PROVISIONING", ["NONE", "READY", "ERROR"], model=body.model, claw_id=claw_id,
+            )
+    if not claimed.applied:
+        if not claimed.assistant:
+            raise HTTPException(status_code=404, detail="No assistant found")
         raise HTTPException(status_code=409, detail="Assistant is currently provisioning")
 
-    old_claw_id = assistant.get("claw_id")
-    new_claw_id = f"claw-{uuid.uuid4().int % 10**7}"
-
-    await db.update(
-        "assistants",
-        {"status": "PROVISIONING", "model": body.model, "claw_id": new_claw_id, "updated_at": datetime.utcnow().isoformat()},
-        {"user_id": str(user_id)},
-    )
-
-    # Deprovision old
-    if old_claw_id:
-        try:
-            await infra_api.deprovision(_infra_user_id(user_id), old_claw_id)
-        except Exception as e:
-            logger.warning(f"Failed to deprovision old claw {old_claw_id}: {e}")
-
-    # Get channel-specific params
-    phone_row = await db.select("user_phones", filters={"user_id": str(user_id)}, single=True)
-    channel = phone_row["channel"] if phone_row else "TELEGRAM"
-
-    telegram_bot_token = ""
-    telegram_allow_from = None
-    whatsapp_allow_from = None
-
-    if channel == "WHATSAPP":
-        phone_e164 = phone_row.get("phone_e164") if phone_row else None
-        if phone_e164:
-            whatsapp_allow_from = [phone_e164]
-    elif channel == "TELEGRAM":
-        if phone_row and phone_row.get("telegram_bot_token_encrypted"):
-            from app.services.encryption import decrypt
-            telegram_bot_token = decrypt(phone_row["telegram_bot_token_encrypted"])
-
-        telegram_username = phone_row.get("telegram_username") if phone_row else None
-        telegram_allow_from = [telegram_username] if telegram_username else None
-
-    provision_keys = await _get_provision_keys(str(user_id))
+    assistant = claimed.previous
+    reconfigure = assistant.get("claw_id") == claw_id
 
     try:
-        await infra_api.provision(
-            user_id=_infra_user_id(user_id),
-            claw_id=new_claw_id,
-            model=body.model,
-            telegram_bot_token=telegram_bot_token,
-            telegram_allow_from=telegram_allow_from,
-            whatsapp_allow_from=whatsapp_allow_from,
-            **provision_keys,
-        )
-
-        await db.update(
-            "assistants",
-            {"status": "READY", "updated_at": datetime.utcnow().isoformat()},
-            {"user_id": str(user_id)},
-        )
-
-        return AssistantResponse(
-            status="READY",
-            model=body.model,
-            claw_id=new_claw_id,
-            created_at=assistant["created_at"],
-            updated_at=datetime.utcnow().isoformat(),
+        await provisioning.enqueue(
+            user_id, claw_id, body.model, reconfigure=reconfigure, timeline=timeline, job_id=job_id,
+            idempotency_key=idempotency_key, idempotency_scope="update_assistant", request_fingerprint=fingerprint,
         )
     except Exception as e:
-        logger.error(f"Reprovisioning failed for user {user_id}: {e}")
-        await db.update(
-            "assistants",
-            {"status": "ERROR", "updated_at": datetime.utcnow().isoformat()},
-            {"user_id": str(user_id)},
-        )
-        raise HTTPException(status_code=500, detail=f"Reprovisioning failed: {e}")
+        if await _lost_key_race(user_id, idempotency_key, claw_id, claimed.previous):
+            return await _update_assistant(body, ctx, idempotency_key)
+        logger.error(f"Failed to queue reprovisioning for user {user_id}: {e}")
+        await transition(user_id, "ERROR", ["PROVISIONING"], expected_claw_id=claw_id)
+        raise HTTPException(status_code=500, detail="Failed to start reprovisioning")
+
+    phone_row = await ctx.phone()
+    return AssistantResponse(
+        status="PROVISIONING",
+        model=body.model,
+        channel=phone_row["channel"] if phone_row else None,
+        claw_id=claw_id,
+        created_at=assistant["created_at"],
+        updated_at=datetime.utcnow().isoformat(),
+    )
 
 
 @router.delete("", status_code=204)
 async def delete_assistant(user_id: uuid.UUID = Depends(get_current_user)) -> None:
     """Delete user's assistant by calling infra API to deprovision."""
 
-    assistant = await db.select("assistants", filters={"user_id": str(user_id)}, single=True)
-    if not assistant:
+    # Reset first so an in-flight provision can't mark it READY afterwards
+    reset = await transition(str(user_id), "NONE", clear_claw_id=True)
+    if not reset.applied:
         return
 
-    claw_id = assistant.get("claw_id")
+    claw_id = reset.previous.get("claw_id")
     if claw_id:
         try:
             await infra_api.deprovision(_infra_user_id(user_id), claw_id)
         except Exception as e:
             logger.warning(f"Failed to deprovision claw {claw_id}: {e}")
-
-    await db.update(
-        "assistants",
-        {
-            "status": "NONE",
-            "claw_id": None,
-            "updated_at": datetime.utcnow().isoformat(),
-        },
-        {"user_id": str(user_id)},
-    )
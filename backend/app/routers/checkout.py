@@ -1,14 +1,13 @@
 import logging
-import uuid
 from datetime import datetime
 
 import stripe
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.auth import get_current_user
 from app.config import settings
 from app.database import db
 from app.schemas import CancelResponse, CheckoutResponse, SubscriptionResponse
+from app.user_context import UserContext, get_user_context
 
 logger = logging.getLogger("yourclaw.checkout")
 
@@ -19,7 +18,7 @@ stripe.api_key = settings.stripe_secret_key
 
 
 @router.post("/checkout", response_model=CheckoutResponse)
-async def create_checkout(user_id: uuid.UUID = Depends(get_current_user)) -> CheckoutResponse:
+async def create_checkout(ctx: UserContext = Depends(get_user_context)) -> CheckoutResponse:
     """Create a Stripe Checkout session for subscription.
 
     Returns checkout URL for frontend to redirect to.
@@ -30,7 +29,7 @@ async def create_checkout(user_id: uuid.UUID = Depends(get_current_user)) -> Che
         return CheckoutResponse(checkout_url=f"{settings.app_url}/dashboard?mock_payment=true")
 
     # Check if user already has active subscription
-    sub = await db.select("subscriptions", filters={"user_id": str(user_id)}, single=True)
+    sub = await ctx.subscription()
     if sub and sub["status"] == "ACTIVE":
         raise HTTPException(status_code=400, detail="Already subscribed")
 
@@ -47,7 +46,7 @@ async def create_checkout(user_id: uuid.UUID = Depends(get_current_user)) -> Che
             subscription_data={
                 "trial_period_days": 2,
             },
-            metadata={"user_id": str(user_id)},
+            metadata={"user_id": ctx.user_id},
             success_url=f"{settings.app_url}/dashboard?session_id={{CHECKOUT_SESSION_ID}}",
             cancel_url=f"{settings.app_url}/dashboard",
         )
@@ -58,10 +57,10 @@ async def create_checkout(user_id: uuid.UUID = Depends(get_current_user)) -> Che
 
 
 @router.get("/subscription", response_model=SubscriptionResponse)
-async def get_subscription(user_id: uuid.UUID = Depends(get_current_user)) -> SubscriptionResponse:
+async def get_subscription(ctx: UserContext = Depends(get_user_context)) -> SubscriptionResponse:
     """Get current subscription status and details."""
 
-    sub = await db.select("subscriptions", filters={"user_id": str(user_id)}, single=True)
+    sub = await ctx.subscription()
 
     if not sub:
         raise HTTPException(status_code=404, detail="No subscription found")
@@ -93,10 +92,10 @@ async def get_subscription(user_id: uuid.UUID = Depends(get_current_user)) -> Su
 
 
 @router.post("/subscription/cancel", response_model=CancelResponse)
-async def cancel_subscription(user_id: uuid.UUID = Depends(get_current_user)) -> CancelResponse:
+async def cancel_subscription(ctx: UserContext = Depends(get_user_context)) -> CancelResponse:
     """Cancel subscription at period end. User keeps access until current_period_end."""
 
-    sub = await db.select("subscriptions", filters={"user_id": str(user_id)}, single=True)
+    sub = await ctx.subscription()
     if not sub:
         raise HTTPException(status_code=404, detail="No subscription found")
 
@@ -125,7 +124,8 @@ async def cancel_subscription(user_id: uuid.UUID = Depends(get_current_user)) ->
                     "current_period_end": period_end.isoformat(),
                     "updated_at": datetime.utcnow().isoformat(),
                 },
-                {"user_id": str(user_id)},
+                {"user_id": ctx.user_id},
+                returning="minimal",
             )
 
         return CancelResponse(
@@ -3,13 +3,12 @@
 import logging
 import uuid
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.auth import get_current_user
-from app.config import settings
 from app.schemas import FeedbackInput, FeedbackResponse
 from app.services.email_service import send_feedback_email
+from app.services.user_profiles import get_profile
 
 logger = logging.getLogger("yourclaw.feedback")
 router = APIRouter(prefix="/feedback", tags=["feedback"])
@@ -22,19 +21,15 @@ async def submit_feedback(
 ) -> FeedbackResponse:
     """Send feedback from a user to the team via email."""
     # Fetch user email from Supabase auth
-    headers = {
-        "apikey": settings.supabase_service_role_key,
-        "Authorization": f"Bearer {settings.supabase_service_role_key}",
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{settings.supabase_url}/auth/v1/admin/users/{user_id}",
-            headers=headers,
-        )
-    if resp.status_code != 200:
+    try:
+        profile = await get_profile(str(user_id))
+    except Exception as e:
+        logger.error(f"Failed to fetch user info for {user_id}: {e}")
+        profile = None
+    if not profile:
         raise HTTPException(status_code=500, detail="Could not fetch user info")
 
-    user_email = resp.json().get("email", "unknown")
+    user_email = profile.email or "unknown"
 
     await send_feedback_email(
         user_email=user_email,
@@ -13,6 +13,7 @@ from app.auth import get_current_user_id
 from app.config import settings
 from app.database import db
 from app.services.encryption import encrypt, decrypt
+from app.user_context import UserContext, get_user_context
 
 logger = logging.getLogger("yourclaw.oauth")
 
@@ -181,6 +182,7 @@ async def google_callback(
             "updated_at": datetime.utcnow().isoformat(),
         },
         on_conflict="user_id,service",
+        returning="minimal",
     )
 
     logger.info(f"Stored {service} integration for user {user_id} ({email})")
@@ -193,14 +195,10 @@ async def google_callback(
 
 @router.get("/integrations")
 async def list_integrations(
-    user_id: str = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
 ) -> dict:
     """List user's connected integrations."""
-    integrations = await db.select(
-        "user_integrations",
-        columns="service,email,created_at,updated_at",
-        filters={"user_id": user_id},
-    )
+    integrations = await ctx.integrations()
 
     # Build response with connection status for each service
     connected = {row["service"]: {"email": row["email"], "connected_at": row["created_at"]}
@@ -224,7 +222,7 @@ async def disconnect_service(
 
     service_name = SERVICE_DB_NAMES[service]
 
-    await db.delete("user_integrations", {"user_id": user_id, "service": service_name})
+    await db.delete("user_integrations", {"user_id": user_id, "service": service_name}, returning="minimal")
 
     logger.info(f"Disconnected {service} for user {user_id}")
 
@@ -245,6 +243,7 @@ async def refresh_google_token(user_id: str, service: str) -> str | None:
 
     integration = await db.select(
         "user_integrations",
+        columns="refresh_token_encrypted",
         filters={"user_id": user_id, "service": service_name},
         single=True,
     )
@@ -284,6 +283,7 @@ async def refresh_google_token(user_id: str, service: str) -> str | None:
             "updated_at": datetime.utcnow().isoformat(),
         },
         {"user_id": user_id, "service": service_name},
+        returning="minimal",
     )
 
     logger.info(f"Refreshed {service} token for user {user_id}")
@@ -298,6 +298,7 @@ async def get_valid_token(user_id: str, service: str) -> str | None:
 
     integration = await db.select(
         "user_integrations",
+        columns="token_expires_at,access_token_encrypted",
         filters={"user_id": user_id, "service": service_name},
         single=True,
     )
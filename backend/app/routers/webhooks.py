@@ -1,17 +1,20 @@
+import hmac
 import logging
 from datetime import datetime
 
-import httpx
 import stripe
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Header, HTTPException, Request
 
 from app.config import settings
 from app.database import db
+from app.schemas import ClawReadinessBatch
 from app.services.email_service import (
     send_cancellation_email,
     send_new_subscriber_notification,
     send_subscription_email,
 )
+from app.services.user_profiles import get_profile
+from app.user_context import UserContext
 
 logger = logging.getLogger("yourclaw.webhooks")
 
@@ -61,6 +64,32 @@ async def stripe_webhook(request: Request) -> dict:
     return {"status": "ok"}
 
 
+@router.post("/infra")
+async def infra_webhook(body: ClawReadinessBatch, authorization: str = Header("")) -> dict:
+    """Record claw pod readiness changes pushed by the infra API.
+
+    Authenticated with the same shared key the backend uses to call the
+    infra API. Reports are matched on user and claw_id; those for unknown
+    claws (already replaced or deleted) are ignored.
+    """
+    expected = f"Bearer {settings.yourclaw_api_key}"
+    if not settings.yourclaw_api_key or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+    if not body.events:
+        return {"status": "ok", "updated": 0}
+
+    user_ids = await db.rpc(
+        "record_claw_readiness",
+        {"p_events": [{"user_id": e.user_id, "claw_id": e.claw_id, "ready": e.ready} for e in body.events]},
+    )
+    # Written through RPC, so the select cache can't see it
+    db.invalidate("assistants", [{"user_id": u} for u in user_ids])
+
+    logger.info(f"Infra readiness: {len(body.events)} event(s), {len(user_ids)} assistant(s) updated")
+    return {"status": "ok", "updated": len(user_ids)}
+
+
 async def handle_checkout_completed(session: dict) -> None:
     """Handle successful checkout: create subscription + trigger provisioning."""
     user_id = session["metadata"]["user_id"]
@@ -77,33 +106,20 @@ async def handle_checkout_completed(session: dict) -> None:
             "status": "ACTIVE",
         },
         on_conflict="user_id",
+        returning="minimal",
     )
 
     logger.info(f"Checkout completed for user {user_id}")
 
     # Send subscription thank-you email (best-effort)
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{settings.supabase_url}/auth/v1/admin/users/{user_id}",
-                headers={
-                    "apikey": settings.supabase_service_role_key,
-                    "Authorization": f"Bearer {settings.supabase_service_role_key}",
-                },
-            )
-            if resp.status_code == 200:
-                user_data = resp.json()
-                email = user_data.get("email", "")
-                # Extract first name from Google metadata
-                meta = user_data.get("user_metadata", {})
-                first_name = meta.get("name", "").split(" ")[0] if meta.get("name") else ""
-                # Get channel
-                phone_row = await db.select("user_phones", filters={"user_id": user_id}, single=True)
-                channel = phone_row["channel"] if phone_row else "TELEGRAM"
-
-                if email:
-                    await send_subscription_email(email, first_name, channel)
-                    await send_new_subscriber_notification(email, first_name, channel, user_id)
+        profile = await get_profile(user_id)
+        if profile and profile.email:
+            phone_row = await UserContext(user_id).phone()
+            channel = phone_row["channel"] if phone_row else "TELEGRAM"
+
+            await send_subscription_email(profile.email, profile.first_name, channel)
+            await send_new_subscriber_notification(profile.email, profile.first_name, channel, user_id)
     except Exception as e:
         logger.error(f"Failed to send welcome email for user {user_id}: {e}")
 
@@ -115,6 +131,7 @@ async def handle_invoice_paid(invoice: dict) -> None:
     # Find subscription by stripe_subscription_id
     sub = await db.select(
         "subscriptions",
+        columns="user_id",
         filters={"stripe_subscription_id": subscription_id},
         single=True,
     )
@@ -131,6 +148,7 @@ async def handle_invoice_paid(invoice: dict) -> None:
             "updated_at": datetime.utcnow().isoformat(),
         },
         {"user_id": user_id},
+        returning="minimal",
     )
 
     logger.info(f"Invoice paid for user {user_id}")
@@ -142,6 +160,7 @@ async def handle_invoice_failed(invoice: dict) -> None:
 
     sub = await db.select(
         "subscriptions",
+        columns="user_id",
         filters={"stripe_subscription_id": subscription_id},
         single=True,
     )
@@ -152,6 +171,7 @@ async def handle_invoice_failed(invoice: dict) -> None:
         "subscriptions",
         {"status": "PAST_DUE", "updated_at": datetime.utcnow().isoformat()},
         {"user_id": sub["user_id"]},
+        returning="minimal",
     )
 
     logger.info(f"Invoice failed for user {sub['user_id']}")
@@ -163,6 +183,7 @@ async def handle_subscription_deleted(subscription: dict) -> None:
 
     sub = await db.select(
         "subscriptions",
+        columns="user_id",
         filters={"stripe_subscription_id": subscription_id},
         single=True,
     )
@@ -176,6 +197,7 @@ async def handle_subscription_deleted(subscription: dict) -> None:
         "subscriptions",
         {"status": "CANCELED", "updated_at": datetime.utcnow().isoformat()},
         {"user_id": user_id},
+        returning="minimal",
     )
 
     # Mark assistant as NONE
@@ -183,30 +205,19 @@ async def handle_subscription_deleted(subscription: dict) -> None:
         "assistants",
         {"status": "NONE", "updated_at": datetime.utcnow().isoformat()},
         {"user_id": user_id},
+        returning="minimal",
     )
 
     logger.info(f"Subscription canceled for user {user_id}")
 
     # Send cancellation email (best-effort)
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{settings.supabase_url}/auth/v1/admin/users/{user_id}",
-                headers={
-                    "apikey": settings.supabase_service_role_key,
-                    "Authorization": f"Bearer {settings.supabase_service_role_key}",
-                },
-            )
-            if resp.status_code == 200:
-                user_data = resp.json()
-                email = user_data.get("email", "")
-                meta = user_data.get("user_metadata", {})
-                first_name = meta.get("name", "").split(" ")[0] if meta.get("name") else ""
-                phone_row = await db.select("user_phones", filters={"user_id": user_id}, single=True)
-                channel = phone_row["channel"] if phone_row else "TELEGRAM"
-
-                if email:
-                    await send_cancellation_email(email, first_name, channel)
+        profile = await get_profile(user_id)
+        if profile and profile.email:
+            phone_row = await UserContext(user_id).phone()
+            channel = phone_row["channel"] if phone_row else "TELEGRAM"
+
+            await send_cancellation_email(profile.email, profile.first_name, channel)
     except Exception as e:
         logger.error(f"Failed to send cancellation email for user {user_id}: {e}")
 
@@ -217,6 +228,7 @@ async def handle_subscription_updated(subscription: dict) -> None:
 
     sub = await db.select(
         "subscriptions",
+        columns="user_id",
         filters={"stripe_subscription_id": subscription_id},
         single=True,
     )
@@ -239,7 +251,7 @@ async def handle_subscription_updated(subscription: dict) -> None:
     elif stripe_status == "past_due":
         update_data["status"] = "PAST_DUE"
 
-    await db.update("subscriptions", update_data, {"user_id": user_id})
+    await db.update("subscriptions", update_data, {"user_id": user_id}, returning="minimal")
 
     logger.info(
         f"Subscription updated for user {user_id}: "
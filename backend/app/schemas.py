@@ -72,12 +72,27 @@ class AssistantUpdateInput(BaseModel):
 
 
 class AssistantCreateResponse(BaseModel):
-    status: str  # READY or ERROR
+    status: str  # PROVISIONING; poll GET /assistants for READY or ERROR
     model: str = DEFAULT_MODEL
     channel: str | None = None
     claw_id: str | None = None
 
 
+class ProvisioningStep(BaseModel):
+    name: str
+    source: str  # backend | infra | kubernetes
+    at_ms: float  # offset from the request
+    ms: float | None = None  # duration; None for point-in-time milestones
+
+
+class ProvisioningTimeline(BaseModel):
+    claw_id: str | None = None
+    status: str  # the job's status
+    started_at: datetime
+    steps: list[ProvisioningStep]
+    total_ms: float | None = None  # request -> pod ready, once it is
+
+
 # --- Checkout / Subscription ---
 
 class CheckoutResponse(BaseModel):
@@ -111,6 +126,19 @@ class ApiKeyResponse(BaseModel):
     has_key: bool = True  # never expose the actual key
 
 
+# --- Infra API callbacks ---
+
+class ClawReadinessEvent(BaseModel):
+    user_id: str  # infra user id (infra_api.infra_user_id)
+    claw_id: str
+    ready: bool
+    pod_phase: str | None = None
+
+
+class ClawReadinessBatch(BaseModel):
+    events: list[ClawReadinessEvent]
+
+
 # --- Health ---
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,79 @@
+"""Atomic assistant status transitions.
+
+Wraps the transition_assistant Postgres function (migrations 007, 014): one
+round trip that checks the current status (and optionally claw_id) and
+applies the change under a row lock. Use it instead of select-then-update
+so concurrent requests can't both start provisioning the same assistant.
+
+Statuses: NONE -> PROVISIONING -> READY | ERROR
+"""
+
+import logging
+from dataclasses import dataclass
+
+from app.database import db
+
+logger = logging.getLogger("yourclaw.assistant_state")
+
+
+@dataclass
+class Transition:
+    applied: bool
+    previous: dict | None   # row before the call (None if the user had none)
+    assistant: dict | None  # row after the call (the unchanged row if not applied)
+
+
+async def transition(
+    user_id: str,
+    to_status: str,
+    from_status: list[str] | None = None,
+    expected_claw_id: str | None = None,
+    model: str | None = None,
+    claw_id: str | None = None,
+    clear_claw_id: bool = False,
+    create: bool = False,
+    pending_job_id: str | None = None,
+) -> Transition:
+    """Move a user's assistant to `to_status` if it is still in `from_status`.
+
+    Args:
+        user_id: Supabase user ID
+        to_status: Target status
+        from_status: Allowed current statuses (None = any)
+        expected_claw_id: Only apply if the row still has this claw_id
+        model: New model (None = unchanged)
+        claw_id: New claw_id (None = unchanged)
+        clear_claw_id: Set claw_id to NULL
+        create: Insert the row if the user has none (counts as status NONE)
+        pending_job_id: Job that owns the new state (None clears it); readiness
+            reports don't complete a PROVISIONING row that has one (migration 014)
+
+    Returns:
+        Transition with applied flag and the rows before/after
+    """
+    result = await db.rpc(
+        "transition_assistant",
+        {
+            "p_user_id": user_id,
+            "p_to_status": to_status,
+            "p_from_status": from_status,
+            "p_expected_claw_id": expected_claw_id,
+            "p_model": model,
+            "p_claw_id": claw_id,
+            "p_clear_claw_id": clear_claw_id,
+            "p_create": create,
+            "p_pending_job_id": pending_job_id,
+        },
+    )
+    # Written through RPC, so the select cache can't see it
+    db.invalidate("assistants", [{"user_id": user_id}])
+
+    if not result["applied"]:
+        current = result["assistant"]["status"] if result["assistant"] else None
+        logger.info(f"Assistant transition {current} -> {to_status} not applied for user {user_id}")
+
+    return Transition(
+        applied=result["applied"],
+        previous=result["previous"],
+        assistant=result["assistant"],
+    )
@@ -1,15 +1,28 @@
-"""Fernet encryption for API keys and gateway tokens."""
+"""Fernet encryption for API keys and gateway tokens.
 
-from cryptography.fernet import Fernet
+ENCRYPTION_KEY may hold several comma-separated Fernet keys to rotate
+without re-encrypting stored data: the first key encrypts, every key is
+tried for decryption. Use rotate() to move a ciphertext to the first key.
+"""
+
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, MultiFernet
 
 from app.config import settings
 
 
-def get_fernet() -> Fernet:
-    """Get Fernet instance with encryption key from settings."""
+@lru_cache(maxsize=4)
+def _cipher(key_setting: str) -> MultiFernet:
+    keys = [k.strip() for k in key_setting.split(",") if k.strip()]
+    return MultiFernet([Fernet(k.encode()) for k in keys])
+
+
+def get_fernet() -> MultiFernet:
+    """Get the process-wide cipher for the keys in settings (built once per key set)."""
     if not settings.encryption_key:
         raise ValueError("ENCRYPTION_KEY not set")
-    return Fernet(settings.encryption_key.encode())
+    return _cipher(settings.encryption_key)
 
 
 def encrypt(plaintext: str) -> str:
@@ -22,3 +35,15 @@ def decrypt(ciphertext: str) -> str:
     """Decrypt base64-encoded ciphertext and return plaintext."""
     f = get_fernet()
     return f.decrypt(ciphertext.encode()).decode()
+
+
+def decrypt_many(ciphertexts: list[str]) -> list[str]:
+    """Decrypt several ciphertexts with one cipher lookup, preserving order."""
+    f = get_fernet()
+    return [f.decrypt(c.encode()).decode() for c in ciphertexts]
+
+
+def rotate(ciphertext: str) -> str:
+    """Re-encrypt a ciphertext under the primary (first) key."""
+    f = get_fernet()
+    return f.rotate(ciphertext.encode()).decode()
@@ -0,0 +1,102 @@
+"""Idempotency-Key support for write endpoints.
+
+run() executes a request handler at most once per (user, key) in
+this process: concurrent duplicates wait for the first one and share its
+result, and successful results are replayed for
+settings.idempotency_cache_ttl seconds. Errors are not cached, so a retry
+after a failure runs again. A key belongs to the first request that used
+it: sending it again to another endpoint or with a different body raises
+KeyReused instead of replaying.
+
+Per process only: handlers must also look up their own durable record of
+the key (e.g. provisioning.find_job) for retries that land elsewhere.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from app.cache import MISSING, TTLCache
+from app.config import settings
+
+logger = logging.getLogger("yourclaw.idempotency")
+
+T = TypeVar("T")
+
+_results = TTLCache(settings.idempotency_cache_max_entries)
+_inflight: dict[tuple, tuple[tuple, asyncio.Task]] = {}  # key -> ((scope, fingerprint), task)
+_stats = {"replayed": 0, "joined": 0}
+
+
+class KeyReused(Exception):
+    """An Idempotency-Key came back on another endpoint or with another body."""
+
+    def __init__(self, scope: str) -> None:
+        super().__init__(f"Idempotency-Key was already used for a different {scope} request")
+        self.scope = scope
+
+
+def fingerprint(body: BaseModel) -> str:
+    """Stable hash of a request body, stored with its key to spot reuse."""
+    return hashlib.sha256(body.model_dump_json().encode()).hexdigest()[:32]
+
+
+def check(scope: str, fingerprint: str, used_scope: str | None, used_fingerprint: str | None) -> None:
+    """Raise KeyReused unless a key's first use (`used_*`) was this same request.
+
+    Records without a scope predate fingerprints and are accepted.
+    """
+    if used_scope is not None and (used_scope, used_fingerprint) != (scope, fingerprint):
+        raise KeyReused(used_scope)
+
+
+async def run(
+    scope: str,
+    user_id: str,
+    key: str | None,
+    handler: Callable[[], Awaitable[T]],
+    fingerprint: str = "",
+) -> T:
+    """Run `handler` once per Idempotency-Key (or every time if `key` is None).
+
+    Raises:
+        KeyReused: the key was used for another scope or fingerprint
+    """
+    if not key:
+        return await handler()
+
+    cache_key = (str(user_id), key)
+    request = (scope, fingerprint)
+    cached = _results.get(cache_key)
+    if cached is not MISSING:
+        check(scope, fingerprint, *cached[0])
+        _stats["replayed"] += 1
+        return cached[1]
+
+    inflight = _inflight.get(cache_key)
+    if inflight is not None:
+        check(scope, fingerprint, *inflight[0])
+        task = inflight[1]
+        _stats["joined"] += 1
+        logger.info(f"Joining in-flight {scope} request for user {user_id}")
+    else:
+        task = asyncio.ensure_future(handler())
+        _inflight[cache_key] = (request, task)
+
+        def done(t: asyncio.Task) -> None:
+            _inflight.pop(cache_key, None)
+            if not t.cancelled() and t.exception() is None:
+                _results.set(cache_key, (request, t.result()), settings.idempotency_cache_ttl)
+
+        task.add_done_callback(done)
+
+    # Shielded: one caller disconnecting must not cancel the work others wait on
+    return await asyncio.shield(task)
+
+
+def stats() -> dict:
+    return {**_results.stats(), **_stats, "in_flight": len(_inflight)}
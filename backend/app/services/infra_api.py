@@ -3,27 +3,52 @@
 The infra API is a separate service that handles container provisioning
 and deprovisioning on the k8s cluster. This module calls its endpoints.
 
+All calls share one keep-alive connection pool, opened and closed by the
+FastAPI lifespan (scripts get it lazily). Each operation has its own
+timeout profile; connect timeouts stay short so a dead infra API fails
+fast. stats() reports per-operation counters and how many TCP/TLS
+connections were actually opened, i.e. how well the pool is reused.
+
+Every call passes a concurrency limiter and a circuit breaker first. When
+the infra API is failing or slow, or too many calls are already in
+flight, calls raise InfraUnavailable immediately instead of piling onto
+the control plane; the API maps it to 503 with Retry-After.
+
 Base URL: https://infra.api.yourclaw.dev
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import math
+import time
 import uuid as _uuid
 
 import httpx
 
+from app.circuit_breaker import CircuitBreaker
 from app.config import settings
 
 logger = logging.getLogger("yourclaw.infra_api")
 
 
+class InfraUnavailable(Exception):
+    """The infra API call was refused locally (breaker open or no free slot)."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Infra API unavailable ({reason}), retry in {math.ceil(retry_after)}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
 def infra_user_id(user_id: str | _uuid.UUID) -> str:
     """Convert Supabase UUID to stable short numeric ID for infra API.
 
     Uses SHA-256 hash truncated to 8 digits for collision resistance
     while keeping IDs numeric-only (k8s label friendly).
-    Same UUID always produces the same ID.
+    Same UUID always produces the same ID. Migration 016 mirrors this in
+    SQL (infra_user_id()) to match readiness reports; keep them in sync.
     """
     h = hashlib.sha256(str(user_id).encode()).hexdigest()
     return f"user-{int(h[:10], 16) % 10**8}"
@@ -36,6 +61,193 @@ def _headers() -> dict[str, str]:
     }
 
 
+_client: httpx.AsyncClient | None = None
+_stats: dict = {
+    "connections_opened": 0,
+    "tls_handshakes": 0,
+    "shed": 0,
+    "in_flight": {"provision": 0, "other": 0},
+    "operations": {},
+}
+
+_breaker = CircuitBreaker(
+    window=settings.infra_api_breaker_window,
+    min_calls=settings.infra_api_breaker_min_calls,
+    failure_rate=settings.infra_api_breaker_failure_rate,
+    slow_rate=settings.infra_api_breaker_slow_rate,
+    open_seconds=settings.infra_api_breaker_open_seconds,
+)
+# Long provisions must not starve the status/deprovision calls
+_slots = {
+    "provision": asyncio.Semaphore(settings.infra_api_max_concurrent_provisions),
+    "other": asyncio.Semaphore(settings.infra_api_max_concurrent_calls),
+}
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.infra_api_max_connections,
+                max_keepalive_connections=settings.infra_api_max_keepalive_connections,
+                keepalive_expiry=settings.infra_api_keepalive_expiry,
+            ),
+        )
+    return _client
+
+
+async def start() -> None:
+    """Open the pooled client. Called from the FastAPI lifespan."""
+    _get_client()
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _timeout(operation: str) -> httpx.Timeout:
+    """Timeout profile for an operation: its own read budget, a short connect."""
+    read = {
+        "provision": settings.infra_api_provision_timeout,
+        "status": settings.infra_api_status_timeout,
+        "deprovision": settings.infra_api_deprovision_timeout,
+        "deprovision_user": settings.infra_api_deprovision_timeout,
+        "update_config": settings.infra_api_update_config_timeout,
+    }[operation]
+    return httpx.Timeout(read, connect=settings.infra_api_connect_timeout)
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    # httpcore trace events: only fire when a new connection is set up
+    if event_name == "connection.connect_tcp.complete":
+        _stats["connections_opened"] += 1
+    elif event_name == "connection.start_tls.complete":
+        _stats["tls_handshakes"] += 1
+
+
+async def _request(
+    operation: str, method: str, path: str, headers: dict | None = None, **kwargs,
+) -> httpx.Response:
+    """Send one infra API request through the pool with the operation's timeout profile.
+
+    Raises:
+        InfraUnavailable: breaker open or no free slot within infra_api_queue_timeout
+    """
+    # Fail fast while the breaker is open, without queueing for a slot
+    if _breaker.retry_after() > 0:
+        _stats["shed"] += 1
+        raise InfraUnavailable("circuit open", _breaker.retry_after())
+
+    pool = "provision" if operation in ("provision", "update_config") else "other"
+    try:
+        await asyncio.wait_for(_slots[pool].acquire(), settings.infra_api_queue_timeout)
+    except asyncio.TimeoutError:
+        _stats["shed"] += 1
+        raise InfraUnavailable("overloaded", settings.infra_api_queue_timeout)
+
+    _stats["in_flight"][pool] += 1
+    try:
+        if not _breaker.allow():
+            # Half-open and the trial calls are already out
+            _stats["shed"] += 1
+            raise InfraUnavailable("circuit open", settings.infra_api_queue_timeout)
+
+        op = _stats["operations"].setdefault(
+            operation, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        op["requests"] += 1
+        timeout = _timeout(operation)
+        failed = True
+        start = time.perf_counter()
+        try:
+            resp = await _get_client().request(
+                method,
+                f"{settings.infra_api_url}{path}",
+                headers={**_headers(), **(headers or {})},
+                timeout=timeout,
+                extensions={"trace": _trace},
+                **kwargs,
+            )
+            failed = resp.status_code >= 500
+        except httpx.HTTPError:
+            op["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            op["total_ms"] += elapsed * 1000
+            op["max_ms"] = max(op["max_ms"], elapsed * 1000)
+            _breaker.record(failed, slow=elapsed > timeout.read * settings.infra_api_breaker_slow_fraction)
+    finally:
+        _stats["in_flight"][pool] -= 1
+        _slots[pool].release()
+
+    if resp.status_code >= 400:
+        op["errors"] += 1
+    return resp
+
+
+def stats() -> dict:
+    return {
+        "connections_opened": _stats["connections_opened"],
+        "tls_handshakes": _stats["tls_handshakes"],
+        "shed": _stats["shed"],
+        "breaker": _breaker.stats(),
+        "in_flight": dict(_stats["in_flight"]),
+        "operations": {
+            name: {**op, "avg_ms": op["total_ms"] / op["requests"] if op["requests"] else 0.0}
+            for name, op in _stats["operations"].items()
+        },
+    }
+
+
+def _config_payload(
+    model: str,
+    anthropic_key: str,
+    openai_key: str,
+    google_key: str,
+    ai_gateway_key: str,
+    system_instructions: str | None,
+    telegram_bot_token: str,
+    telegram_allow_from: list[str] | None,
+    whatsapp_allow_from: list[str] | None,
+) -> dict:
+    """Claw config fields shared by /provision and PATCH .../config (unset ones omitted)."""
+    payload: dict = {"model": model}
+    if anthropic_key:
+        payload["anthropic_key"] = anthropic_key
+    if openai_key:
+        payload["openai_key"] = openai_key
+    if google_key:
+        payload["google_key"] = google_key
+    if ai_gateway_key:
+        payload["ai_gateway_key"] = ai_gateway_key
+    if system_instructions is not None:
+        payload["system_instructions"] = system_instructions
+    if telegram_bot_token:
+        payload["telegram_bot_token"] = telegram_bot_token
+    if telegram_allow_from:
+        payload["telegram_allow_from"] = telegram_allow_from
+    if whatsapp_allow_from:
+        payload["whatsapp_allow_from"] = whatsapp_allow_from
+    return payload
+
+
+def _redacted(payload: dict) -> dict:
+    """Copy of a config payload safe for debug logging (never log secrets)."""
+    _secret_fields = ("anthropic_key", "openai_key", "google_key", "ai_gateway_key", "telegram_bot_token")
+    return {
+        k: (
+            f"{v[:4]}...{v[-4:]}" if k in _secret_fields and isinstance(v, str) and len(v) > 8
+            else v
+        )
+        for k, v in payload.items()
+    }
+
+
 async def provision(
     user_id: str,
     claw_id: str,
@@ -48,6 +260,7 @@ async def provision(
     telegram_bot_token: str = "",
     telegram_allow_from: list[str] | None = None,
     whatsapp_allow_from: list[str] | None = None,
+    idempotency_key: str | None = None,
 ) -> dict:
     """Provision an OpenClaw instance via the infra API.
 
@@ -61,6 +274,8 @@ async def provision(
         ai_gateway_key: Vercel AI Gateway API key (BYOK).
         system_instructions: Custom system prompt (stored as SOUL.md).
         telegram_bot_token: Per-user Telegram bot token from @BotFather.
+        idempotency_key: Sent as Idempotency-Key; the infra API runs a
+            retried request with the same key and body only once.
 
     Returns:
         Response dict from infra API.
@@ -72,65 +287,104 @@ async def provision(
     payload: dict = {
         "user_id": user_id,
         "claw_id": claw_id,
-        "model": model,
-    }
-
-    if anthropic_key:
-        payload["anthropic_key"] = anthropic_key
-    if openai_key:
-        payload["openai_key"] = openai_key
-    if google_key:
-        payload["google_key"] = google_key
-    if ai_gateway_key:
-        payload["ai_gateway_key"] = ai_gateway_key
-    if system_instructions is not None:
-        payload["system_instructions"] = system_instructions
-    if telegram_bot_token:
-        payload["telegram_bot_token"] = telegram_bot_token
-    if telegram_allow_from:
-        payload["telegram_allow_from"] = telegram_allow_from
-    if whatsapp_allow_from:
-        payload["whatsapp_allow_from"] = whatsapp_allow_from
-
-    # Build a redacted copy for debug logging (never log secrets)
-    _secret_fields = ("anthropic_key", "openai_key", "google_key", "ai_gateway_key", "telegram_bot_token")
-    debug_payload = {
-        k: (
-            f"{v[:4]}...{v[-4:]}" if k in _secret_fields and isinstance(v, str) and len(v) > 8
-            else v
-        )
-        for k, v in payload.items()
+        **_config_payload(
+            model, anthropic_key, openai_key, google_key, ai_gateway_key, system_instructions,
+            telegram_bot_token, telegram_allow_from, whatsapp_allow_from,
+        ),
     }
 
     url = f"{settings.infra_api_url}/provision"
-    logger.info(f"Provision POST {url}\n{json.dumps(debug_payload, indent=2)}")
+    logger.info(f"Provision POST {url}\n{json.dumps(_redacted(payload), indent=2)}")
 
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        resp = await client.post(
-            url,
-            headers=_headers(),
-            json=payload,
-        )
-        logger.info(f"Provision response status={resp.status_code} body={resp.text}")
-        resp.raise_for_status()
-        data = resp.json()
+    headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+    resp = await _request("provision", "POST", "/provision", json=payload, headers=headers)
+    logger.info(f"Provision response status={resp.status_code} body={resp.text}")
+    resp.raise_for_status()
+    data = resp.json()
 
     logger.info(f"Provisioned {user_id}/{claw_id}: {data}")
     return data
 
 
+async def update_config(
+    user_id: str,
+    claw_id: str,
+    model: str,
+    anthropic_key: str = "",
+    openai_key: str = "",
+    google_key: str = "",
+    ai_gateway_key: str = "",
+    system_instructions: str | None = None,
+    telegram_bot_token: str = "",
+    telegram_allow_from: list[str] | None = None,
+    whatsapp_allow_from: list[str] | None = None,
+) -> dict:
+    """Reconfigure an existing claw in place via the infra API.
+
+    Takes the same config as provision(); the claw keeps its volume and
+    Service and its pod restarts once if anything changed.
+
+    Returns:
+        Response dict from infra API ("restarted": whether the pod restarts).
+
+    Raises:
+        httpx.HTTPStatusError: 404 if the claw doesn't exist (provision it instead)
+    """
+    if settings.mock_containers:
+        logger.info(f"[Mock] Update config {user_id}/{claw_id} model={model}")
+        return {"user_id": user_id, "claw_id": claw_id, "restarted": True}
+
+    payload = _config_payload(
+        model, anthropic_key, openai_key, google_key, ai_gateway_key, system_instructions,
+        telegram_bot_token, telegram_allow_from, whatsapp_allow_from,
+    )
+    path = f"/claws/{user_id}/{claw_id}/config"
+    logger.info(f"Update config PATCH {path}\n{json.dumps(_redacted(payload), indent=2)}")
+
+    resp = await _request("update_config", "PATCH", path, json=payload)
+    logger.info(f"Update config response status={resp.status_code} body={resp.text}")
+    resp.raise_for_status()
+    return resp.json()
+
+
 async def get_status(user_id: str, claw_id: str) -> dict:
     """Get real-time pod status for a claw instance from the infra API."""
     if settings.mock_containers:
         logger.info(f"[Mock] Status {user_id}/{claw_id}")
         return {"user_id": user_id, "claw_id": claw_id, "ready": True, "pod_phase": "Running"}
 
-    url = f"{settings.infra_api_url}/claws/{user_id}/{claw_id}"
+    resp = await _request("status", "GET", f"/claws/{user_id}/{claw_id}")
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def get_timeline(user_id: str, claw_id: str) -> dict | None:
+    """The infra side of a claw's last provision (steps, pod milestones), or None if unknown."""
+    if settings.mock_containers:
+        return None
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.get(url, headers=_headers())
-        resp.raise_for_status()
-        return resp.json()
+    resp = await _request("status", "GET", f"/claws/{user_id}/{claw_id}/timeline")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def get_statuses(claws: list[tuple[str, str]]) -> list[dict]:
+    """Pod status for many (user_id, claw_id) pairs in one infra API call."""
+    if settings.mock_containers:
+        logger.info(f"[Mock] Status of {len(claws)} claws")
+        return [
+            {"user_id": user_id, "claw_id": claw_id, "ready": True, "pod_phase": "Running"}
+            for user_id, claw_id in claws
+        ]
+
+    resp = await _request(
+        "status", "POST", "/claws/status",
+        json={"claws": [{"user_id": user_id, "claw_id": claw_id} for user_id, claw_id in claws]},
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 async def deprovision(user_id: str, claw_id: str) -> dict:
@@ -144,15 +398,10 @@ async def deprovision(user_id: str, claw_id: str) -> dict:
     logger.info(f"Deprovisioning {user_id}/{claw_id}")
     logger.debug(f"Deprovision POST {url} payload={deprovision_payload}")
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(
-            url,
-            headers=_headers(),
-            json=deprovision_payload,
-        )
-        logger.debug(f"Deprovision response status={resp.status_code} body={resp.text}")
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await _request("deprovision", "POST", "/deprovision", json=deprovision_payload)
+    logger.debug(f"Deprovision response status={resp.status_code} body={resp.text}")
+    resp.raise_for_status()
+    data = resp.json()
 
     logger.info(f"Deprovisioned {user_id}/{claw_id}: {data}")
     return data
@@ -169,15 +418,10 @@ async def deprovision_user(user_id: str) -> dict:
     logger.info(f"Deprovisioning all claws for user {user_id}")
     logger.debug(f"Deprovision-user POST {url} payload={deprovision_payload}")
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(
-            url,
-            headers=_headers(),
-            json=deprovision_payload,
-        )
-        logger.debug(f"Deprovision-user response status={resp.status_code} body={resp.text}")
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await _request("deprovision_user", "POST", "/deprovision-user", json=deprovision_payload)
+    logger.debug(f"Deprovision-user response status={resp.status_code} body={resp.text}")
+    resp.raise_for_status()
+    data = resp.json()
 
     logger.info(f"Deprovisioned all for user {user_id}: {data}")
     return data
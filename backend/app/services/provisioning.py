@@ -0,0 +1,304 @@
+"""Assistant provisioning: job queue and the work each job does.
+
+The API never calls infra_api.provision inline. It moves the assistant to
+PROVISIONING (assistant_state.transition), enqueues a provisioning_jobs
+row with enqueue() and answers 202. app.worker claims jobs and runs them
+with run_job(); the assistant ends up READY or ERROR.
+
+A job provisions `claw_id` with the user's current BYOK keys and channel
+settings, after deprovisioning `previous_claw_id` if set. A `reconfigure`
+job instead updates the config of the existing `claw_id` in place (one pod
+restart), falling back to a full provision if the claw is gone.
+"""
+
+import logging
+
+import httpx
+
+from app.database import db
+from app.services import idempotency, infra_api, secret_cache
+from app.services.assistant_state import transition
+from app.services.infra_api import infra_user_id
+from app.timeline import Timeline
+from app.user_context import UserContext
+
+logger = logging.getLogger("yourclaw.provisioning")
+
+PROVIDER_KEY_MAP = {
+    "ANTHROPIC": "anthropic_key",
+    "OPENAI": "openai_key",
+    "GOOGLE": "google_key",
+    "VERCEL": "ai_gateway_key",
+}
+
+# Map model prefixes to the BYOK provider name stored in the api_keys table
+_MODEL_PREFIX_TO_PROVIDER = {
+    "anthropic": "ANTHROPIC",
+    "openai": "OPENAI",
+    "minimax": "VERCEL",
+}
+
+
+class JobSuperseded(Exception):
+    """The assistant no longer wants this job (deleted or re-provisioned since)."""
+
+
+class JobFailed(Exception):
+    """Retrying won't help (e.g. the model's provider key is gone)."""
+
+
+def provider_for_model(model: str) -> str:
+    """Extract provider from model ID (e.g., 'anthropic/claude-sonnet-4-5' -> 'ANTHROPIC')."""
+    prefix = model.split("/")[0]
+    return _MODEL_PREFIX_TO_PROVIDER.get(prefix, prefix.upper())
+
+
+async def get_provision_secrets(ctx: UserContext) -> secret_cache.ProvisionSecrets:
+    """Decrypted API keys and stored Telegram bot token for the infra API provision call.
+
+    Uses the user's BYOK keys configured in the dashboard.
+    When VERCEL key is present, only the ai_gateway_key is sent
+    (Vercel AI Gateway routes to all providers).
+
+    Served from the short-lived secret cache when possible; callers that
+    change api_keys or the bot token must call secret_cache.invalidate().
+    """
+    cached = secret_cache.get(ctx.user_id)
+    if cached:
+        return cached
+
+    from app.services.encryption import decrypt_many
+
+    # BYOK keys from dashboard (individual provider keys)
+    await ctx.prefetch("api_keys", "phone")
+    byok_rows = await ctx.api_keys()
+    providers = frozenset(row["provider"] for row in byok_rows if row.get("encrypted_key"))
+    has_vercel = any(row["provider"] == "VERCEL" for row in byok_rows)
+
+    wanted: dict[str, str] = {}  # key name -> ciphertext
+    for row in byok_rows:
+        provider = row["provider"]
+        encrypted = row.get("encrypted_key")
+        if not encrypted:
+            continue
+
+        # When Vercel key is present, only pass ai_gateway_key
+        if has_vercel and provider != "VERCEL":
+            continue
+
+        key_name = PROVIDER_KEY_MAP.get(provider)
+        if key_name:
+            wanted[key_name] = encrypted
+
+    # Decrypt the bot token in the same batch
+    phone_row = await ctx.phone()
+    token_encrypted = phone_row.get("telegram_bot_token_encrypted") if phone_row else None
+    ciphertexts = list(wanted.values()) + ([token_encrypted] if token_encrypted else [])
+    plaintexts = decrypt_many(ciphertexts)
+
+    secrets = secret_cache.ProvisionSecrets(
+        providers=providers,
+        api_keys=dict(zip(wanted, plaintexts)),
+        telegram_bot_token=plaintexts[-1] if token_encrypted else "",
+    )
+    secret_cache.put(ctx.user_id, secrets)
+    return secrets
+
+
+async def enqueue(
+    user_id: str,
+    claw_id: str,
+    model: str,
+    channel: str | None = None,
+    previous_claw_id: str | None = None,
+    idempotency_key: str | None = None,
+    idempotency_scope: str | None = None,
+    request_fingerprint: str | None = None,
+    reconfigure: bool = False,
+    timeline: Timeline | None = None,
+    job_id: str | None = None,
+) -> None:
+    """Queue a provision of `claw_id` for app.worker.
+
+    The caller must already have moved the assistant to PROVISIONING with
+    this claw_id; the worker drops jobs whose claw_id is no longer current.
+    `idempotency_key` is the client's Idempotency-Key, stored with the
+    endpoint (`idempotency_scope`) and body hash it came with, see find_job().
+    `reconfigure` updates the running claw in place instead; the caller
+    passes the same `job_id` it claimed the assistant with (pending_job_id),
+    so the running pod's readiness reports can't complete the assistant
+    before the job has run. `timeline` holds the request's steps so far;
+    the worker appends its own.
+    """
+    await db.insert(
+        "provisioning_jobs",
+        {
+            **({"id": job_id} if job_id else {}),
+            "user_id": user_id,
+            "claw_id": claw_id,
+            "model": model,
+            "channel": channel,
+            "previous_claw_id": previous_claw_id,
+            "idempotency_key": idempotency_key,
+            "idempotency_scope": idempotency_scope,
+            "request_fingerprint": request_fingerprint,
+            "reconfigure": reconfigure,
+            "timeline": timeline.to_dict() if timeline else None,
+        },
+        returning="minimal",
+    )
+    action = "reconfiguration" if reconfigure else "provisioning"
+    logger.info(f"Queued {action} of {claw_id} for user {user_id}")
+
+
+async def find_job(user_id: str, idempotency_key: str, scope: str, fingerprint: str) -> dict | None:
+    """The job an earlier request with this Idempotency-Key queued, if any.
+
+    Raises:
+        idempotency.KeyReused: the key was first sent to another endpoint or with another body
+    """
+    job = await db.select(
+        "provisioning_jobs",
+        columns="claw_id,model,channel,created_at,idempotency_scope,request_fingerprint",
+        filters={"user_id": user_id, "idempotency_key": idempotency_key},
+        single=True,
+        cache=False,
+    )
+    if job:
+        idempotency.check(scope, fingerprint, job["idempotency_scope"], job["request_fingerprint"])
+    return job
+
+
+async def _deprovision_quietly(user_id: str, claw_id: str) -> None:
+    try:
+        await infra_api.deprovision(infra_user_id(user_id), claw_id)
+    except Exception as e:
+        logger.warning(f"Failed to deprovision claw {claw_id}: {e}")
+
+
+async def _reconfigure(user_id: str, claw_id: str, config: dict) -> bool:
+    """Update a running claw's config in place.
+
+    Returns:
+        False if the claw doesn't exist in the cluster and must be provisioned
+    """
+    # Mark the pod not ready first, so the restarted pod's readiness report
+    # (webhook or reconciler) always lands after this write
+    await _set_pod_ready(user_id, claw_id, False)
+    try:
+        result = await infra_api.update_config(infra_user_id(user_id), claw_id, **config)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            logger.info(f"Claw {claw_id} not found, provisioning it instead")
+            return False
+        raise
+    if not result.get("restarted"):
+        # Config was already current and the pod untouched: no report is coming
+        await _set_pod_ready(user_id, claw_id, None)
+    return True
+
+
+async def _set_pod_ready(user_id: str, claw_id: str, ready: bool | None) -> None:
+    await db.update(
+        "assistants", {"pod_ready": ready}, {"user_id": user_id, "claw_id": claw_id}, returning="minimal",
+    )
+
+
+async def run_job(job: dict, timeline: Timeline) -> None:
+    """Provision one job's claw and mark the assistant READY.
+
+    Each step is recorded on `timeline`.
+
+    Raises:
+        JobSuperseded: the assistant moved on; nothing was provisioned
+        JobFailed: permanent failure; the caller marks the assistant ERROR
+        Exception: anything else is transient and may be retried
+    """
+    user_id = job["user_id"]
+    claw_id = job["claw_id"]
+    model = job["model"]
+
+    with timeline.span("load_assistant"):
+        assistant = await db.select(
+            "assistants", columns="status,claw_id,pending_job_id", filters={"user_id": user_id}, single=True,
+            cache=False,
+        )
+    if not assistant or assistant["status"] != "PROVISIONING" or assistant.get("claw_id") != claw_id:
+        raise JobSuperseded(f"assistant no longer provisioning {claw_id}")
+    # A reconfigure keeps the claw_id: only the job that claimed the assistant may run
+    if assistant.get("pending_job_id") not in (None, job["id"]):
+        raise JobSuperseded(f"assistant is waiting on job {assistant['pending_job_id']}")
+
+    # The API process may have changed keys or the bot token since this
+    # process cached them
+    secret_cache.invalidate(user_id)
+    ctx = UserContext(user_id)
+    with timeline.span("load_secrets"):
+        secrets = await get_provision_secrets(ctx)
+
+    # Check the model's provider key is still present
+    provider = provider_for_model(model)
+    required_key = PROVIDER_KEY_MAP.get(provider)
+    if required_key and required_key not in secrets.api_keys:
+        raise JobFailed(f"no {provider} key for model {model}")
+
+    if job.get("previous_claw_id"):
+        with timeline.span("deprovision_previous"):
+            await _deprovision_quietly(user_id, job["previous_claw_id"])
+
+    # Channel-specific params
+    phone_row = await ctx.phone()
+    channel = job.get("channel") or (phone_row["channel"] if phone_row else "TELEGRAM")
+    telegram_bot_token = ""
+    telegram_allow_from = None
+    whatsapp_allow_from = None
+
+    if channel == "WHATSAPP":
+        phone_e164 = phone_row.get("phone_e164") if phone_row else None
+        if phone_e164:
+            whatsapp_allow_from = [phone_e164]
+    elif channel == "TELEGRAM":
+        telegram_bot_token = secrets.telegram_bot_token
+        telegram_username = phone_row.get("telegram_username") if phone_row else None
+        telegram_allow_from = [telegram_username] if telegram_username else None
+
+    config = dict(
+        model=model,
+        telegram_bot_token=telegram_bot_token,
+        telegram_allow_from=telegram_allow_from,
+        whatsapp_allow_from=whatsapp_allow_from,
+        **secrets.api_keys,
+    )
+    reconfigured = False
+    if job.get("reconfigure"):
+        with timeline.span("infra_reconfigure"):
+            reconfigured = await _reconfigure(user_id, claw_id, config)
+    if not reconfigured:
+        with timeline.span("infra_provision"):
+            await infra_api.provision(
+                user_id=infra_user_id(user_id),
+                claw_id=claw_id,
+                # Stable across this job's retries: a retry after a lost response is free
+                idempotency_key=f"provisioning-job-{job['id']}",
+                **config,
+            )
+
+    with timeline.span("mark_ready"):
+        done = await transition(user_id, "READY", ["PROVISIONING"], expected_claw_id=claw_id)
+    if not done.applied:
+        current = done.assistant.get("claw_id") if done.assistant else None
+        if current == claw_id and done.assistant["status"] == "READY":
+            # The pod's readiness report got there first
+            logger.info(f"Assistant provisioned for user {user_id}: claw_id={claw_id}, channel={channel}")
+            return
+        # Deleted or re-claimed while we provisioned: don't leave an orphan pod behind
+        if current != claw_id:
+            await _deprovision_quietly(user_id, claw_id)
+        raise JobSuperseded(f"assistant moved on while provisioning {claw_id}")
+
+    logger.info(f"Assistant provisioned for user {user_id}: claw_id={claw_id}, channel={channel}")
+
+
+async def fail_assistant(job: dict) -> None:
+    """Mark the job's assistant ERROR if it is still waiting on this job."""
+    await transition(job["user_id"], "ERROR", ["PROVISIONING"], expected_claw_id=job["claw_id"])
@@ -0,0 +1,80 @@
+"""Periodic bulk sync of pod readiness onto assistants.
+
+Backstop for the readiness webhook (POST /webhooks/infra): a missed or
+undeliverable push is corrected on the next pass. Each pass streams every
+READY/PROVISIONING assistant and asks the infra API about them
+settings.reconcile_batch_size at a time (POST /claws/status, one pod list
+per call), then records the batch with record_claw_readiness, so a full
+pass costs O(assistants / batch size) calls rather than one per user.
+
+A ready report completes a PROVISIONING assistant only when no job owns
+it (pending_job_id, migration 014): during an in-place reconfiguration
+the old pod is still ready, and the job marks READY itself once applied.
+
+Runs inside app.worker.
+"""
+
+import asyncio
+import logging
+
+from app.config import settings
+from app.database import db
+from app.services import infra_api
+from app.services.infra_api import infra_user_id
+
+logger = logging.getLogger("yourclaw.reconciler")
+
+
+async def _sync_batch(batch: list[dict]) -> int:
+    """Fetch and record readiness for one batch of assistant rows."""
+    statuses = await infra_api.get_statuses([(infra_user_id(r["user_id"]), r["claw_id"]) for r in batch])
+    user_ids = await db.rpc(
+        "record_claw_readiness",
+        {"p_events": [{"user_id": s["user_id"], "claw_id": s["claw_id"], "ready": s["ready"]} for s in statuses]},
+    )
+    # Written through RPC, so the select cache can't see it
+    db.invalidate("assistants", [{"user_id": u} for u in user_ids])
+    return sum(1 for s in statuses if s["ready"])
+
+
+async def reconcile_once() -> dict:
+    """One full pass over READY/PROVISIONING assistants.
+
+    Returns:
+        Counts: claws checked, ready, batches sent
+    """
+    checked = ready = batches = 0
+    batch: list[dict] = []
+    for status in ("READY", "PROVISIONING"):
+        async for row in db.iter_rows("assistants", columns="user_id,claw_id", filters={"status": status}):
+            if not row.get("claw_id"):
+                continue
+            batch.append(row)
+            if len(batch) >= settings.reconcile_batch_size:
+                ready += await _sync_batch(batch)
+                checked += len(batch)
+                batches += 1
+                batch = []
+    if batch:
+        ready += await _sync_batch(batch)
+        checked += len(batch)
+        batches += 1
+    return {"checked": checked, "ready": ready, "batches": batches}
+
+
+async def run_reconciler(stop: asyncio.Event) -> None:
+    """Reconcile every settings.reconcile_interval seconds until `stop` is set."""
+    if settings.reconcile_interval <= 0:
+        return
+    while not stop.is_set():
+        try:
+            result = await reconcile_once()
+            logger.info(
+                f"Reconciled {result['checked']} claws ({result['ready']} ready) in {result['batches']} batch(es)"
+            )
+        except Exception as e:
+            logger.error(f"Reconcile pass failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.reconcile_interval)
+        except asyncio.TimeoutError:
+            pass
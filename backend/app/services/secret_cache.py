@@ -0,0 +1,70 @@
+"""Short-lived cache of a user's decrypted provisioning secrets.
+
+Reprovisioning bursts (key added, model switched, retried) would otherwise
+re-select api_keys/user_phones and decrypt the same values each time.
+Entries live for settings.secret_cache_ttl seconds, are dropped by
+invalidate() whenever a user's keys or bot token change, and their
+plaintext buffers are zeroed when they leave the cache.
+
+Zeroing covers the cached copies only: get() hands out str values, which
+Python can't wipe. The cache is per process, so a key changed through
+another worker is picked up here after at most one TTL.
+"""
+
+from dataclasses import dataclass
+
+from app.cache import MISSING, TTLCache
+from app.config import settings
+
+
+@dataclass
+class ProvisionSecrets:
+    providers: frozenset[str]   # BYOK providers with a stored key
+    api_keys: dict[str, str]    # infra API key name -> plaintext, as passed to provision()
+    telegram_bot_token: str     # "" if none stored
+
+
+@dataclass
+class _Sealed:
+    providers: frozenset[str]
+    api_keys: dict[str, bytearray]
+    telegram_bot_token: bytearray
+
+
+def _wipe(sealed: _Sealed) -> None:
+    for buf in (*sealed.api_keys.values(), sealed.telegram_bot_token):
+        buf[:] = bytes(len(buf))
+
+
+_cache = TTLCache(settings.secret_cache_max_entries, on_evict=_wipe)
+
+
+def get(user_id: str) -> ProvisionSecrets | None:
+    sealed = _cache.get(str(user_id))
+    if sealed is MISSING:
+        return None
+    return ProvisionSecrets(
+        providers=sealed.providers,
+        api_keys={name: buf.decode() for name, buf in sealed.api_keys.items()},
+        telegram_bot_token=sealed.telegram_bot_token.decode(),
+    )
+
+
+def put(user_id: str, secrets: ProvisionSecrets) -> None:
+    if settings.secret_cache_ttl <= 0:
+        return
+    sealed = _Sealed(
+        providers=secrets.providers,
+        api_keys={name: bytearray(value.encode()) for name, value in secrets.api_keys.items()},
+        telegram_bot_token=bytearray(secrets.telegram_bot_token.encode()),
+    )
+    _cache.set(str(user_id), sealed, settings.secret_cache_ttl)
+
+
+def invalidate(user_id: str) -> None:
+    """Forget (and wipe) a user's secrets after their keys or bot token change."""
+    _cache.pop(str(user_id))
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,111 @@
+"""Cached lookup of Supabase auth users (email + name metadata).
+
+Emails and names live in auth.users: db.get_auth_user reads them through
+the admin API on the REST backend and straight from the table on the
+postgres backend. Lookups are cached per process for
+settings.user_profile_cache_ttl seconds; prefetch() warms the cache for
+many users at once.
+
+Emails and names are changed through Supabase Auth, not this API, so the
+first sign of a change is the user's next access token: app.auth passes
+each newly verified token's claims to refresh_from_token(), which drops a
+cached profile that disagrees with them.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from app.cache import MISSING, TTLCache
+from app.config import settings
+from app.database import db
+
+logger = logging.getLogger("yourclaw.user_profiles")
+
+_cache = TTLCache(settings.user_profile_cache_max_entries)
+
+
+@dataclass
+class UserProfileInfo:
+    id: str
+    email: str
+    full_name: str
+
+    @property
+    def first_name(self) -> str:
+        return self.full_name.split(" ")[0] if self.full_name else ""
+
+    @property
+    def last_name(self) -> str:
+        parts = self.full_name.split(" ", 1) if self.full_name else []
+        return parts[1] if len(parts) > 1 else ""
+
+
+def _from_auth_user(user: dict) -> UserProfileInfo:
+    meta = user.get("user_metadata") or {}
+    return UserProfileInfo(
+        id=user["id"],
+        email=user.get("email") or "",
+        full_name=meta.get("name") or meta.get("full_name") or "",
+    )
+
+
+async def get_profile(user_id: str) -> UserProfileInfo | None:
+    """Email and name of an auth user, or None if the user doesn't exist."""
+    user_id = str(user_id)
+    cached = _cache.get(user_id)
+    if cached is not MISSING:
+        return cached
+
+    user = await db.get_auth_user(user_id)
+    profile = _from_auth_user(user) if user else None
+    if profile:
+        _cache.set(user_id, profile, settings.user_profile_cache_ttl)
+    return profile
+
+
+async def prefetch(user_ids: list[str], concurrency: int = 10) -> dict[str, UserProfileInfo]:
+    """Load many profiles into the cache, fetching the missing ones concurrently.
+
+    The admin API has no multi-id lookup, so this fans out get_profile calls.
+
+    Returns:
+        user_id -> profile for every user that exists
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(user_id: str) -> UserProfileInfo | None:
+        async with semaphore:
+            try:
+                return await get_profile(user_id)
+            except Exception as e:
+                logger.warning(f"Failed to fetch profile for user {user_id}: {e}")
+                return None
+
+    unique = list(dict.fromkeys(str(u) for u in user_ids))
+    profiles = await asyncio.gather(*(load(u) for u in unique))
+    return {u: p for u, p in zip(unique, profiles) if p}
+
+
+def invalidate(user_id: str) -> None:
+    _cache.pop(str(user_id))
+
+
+def refresh_from_token(claims: dict) -> None:
+    """Drop the cached profile of a token's user if the token shows other values."""
+    # Runs on every new token; peek so it doesn't count as a lookup in stats()
+    cached = _cache.peek(str(claims.get("sub")))
+    if cached is MISSING or cached is None:
+        return
+    current = _from_auth_user({"id": cached.id, **claims})
+    # Only compare what the token carries
+    changed = ("email" in claims and current.email != cached.email) or (
+        "user_metadata" in claims and current.full_name != cached.full_name
+    )
+    if changed:
+        logger.info(f"Profile of user {cached.id} changed, dropping cached copy")
+        invalidate(cached.id)
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,40 @@
+"""Provisioning timeline: named, timed steps of one provision.
+
+The API records its part (loading the user, claiming the assistant) and
+stores it on the provisioning job; app.worker appends queue wait, secrets,
+the infra API call and the READY write. Times are epoch seconds, like the
+infra API's own timeline of the same claw (GET /claws/{user}/{claw}/timeline),
+so GET /api/v1/assistants/timeline can lay the two side by side.
+
+Percentiles over completed jobs come from the provisioning_step_percentiles
+RPC (migration 012).
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class Timeline:
+    def __init__(self, started_at: float | None = None, steps: list[dict] | None = None) -> None:
+        self.started_at = started_at or time.time()
+        self.steps: list[dict] = list(steps or [])
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time() - start)
+
+    def add(self, name: str, start: float, seconds: float) -> None:
+        """Record a step measured elsewhere (e.g. time spent queued)."""
+        self.steps.append({"name": name, "start": round(start, 3), "ms": round(seconds * 1000, 1)})
+
+    def to_dict(self) -> dict:
+        return {"started_at": round(self.started_at, 3), "steps": self.steps}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "Timeline":
+        data = data or {}
+        return cls(data.get("started_at"), data.get("steps"))
@@ -0,0 +1,79 @@
+"""Request-scoped access to the current user's rows.
+
+Depend on get_user_context instead of selecting user_phones, subscriptions,
+assistants, api_keys or user_integrations directly: each row is fetched at most once per
+request (concurrent callers share the in-flight select) and prefetch()
+loads independent rows in parallel.
+
+Rows are snapshots from the first read. After writing one of these tables
+in the same request, call forget() so the next read goes to the database.
+Code running outside a request for a known user (e.g. Stripe webhooks)
+can build a UserContext(user_id) directly.
+"""
+
+import asyncio
+import uuid
+
+from fastapi import Depends
+
+from app.auth import get_current_user
+from app.database import db
+
+# name -> (table, columns, single row)
+_ROWS = {
+    "phone": ("user_phones", "channel,phone_e164,telegram_username,telegram_bot_token_encrypted", True),
+    "subscription": ("subscriptions", "status,current_period_end,stripe_subscription_id", True),
+    "assistant": ("assistants", "status,model,claw_id,pod_ready,created_at,updated_at", True),
+    "api_keys": ("api_keys", "provider,encrypted_key,created_at", False),
+    "integrations": ("user_integrations", "service,email,created_at,updated_at", False),
+}
+
+
+class UserContext:
+    """Lazily loaded, memoized user rows for one request."""
+
+    def __init__(self, user_id: uuid.UUID | str) -> None:
+        self.user_id = str(user_id)
+        self._loads: dict[str, asyncio.Task] = {}
+
+    def _load(self, name: str) -> asyncio.Task:
+        task = self._loads.get(name)
+        if task is None:
+            table, columns, single = _ROWS[name]
+            task = asyncio.ensure_future(
+                db.select(table, columns=columns, filters={"user_id": self.user_id}, single=single)
+            )
+            self._loads[name] = task
+        return task
+
+    async def prefetch(self, *names: str) -> None:
+        """Start loading the named rows concurrently and wait for all of them."""
+        await asyncio.gather(*(self._load(name) for name in names))
+
+    def forget(self, *names: str) -> None:
+        """Drop memoized rows so the next read refetches them."""
+        for name in names:
+            self._loads.pop(name, None)
+
+    async def phone(self) -> dict | None:
+        return await self._load("phone")
+
+    async def subscription(self) -> dict | None:
+        return await self._load("subscription")
+
+    async def assistant(self) -> dict | None:
+        return await self._load("assistant")
+
+    async def api_keys(self) -> list[dict]:
+        return await self._load("api_keys")
+
+    async def api_key(self, provider: str) -> dict | None:
+        return next((row for row in await self.api_keys() if row["provider"] == provider), None)
+
+    async def integrations(self) -> list[dict]:
+        return await self._load("integrations")
+
+
+async def get_user_context(user_id: uuid.UUID = Depends(get_current_user)) -> UserContext:
+    """FastAPI dependency: a fresh UserContext for the authenticated user."""
+    return UserContext(user_id)
@@ -0,0 +1,214 @@
+"""Provisioning worker: runs the jobs queued by app.services.provisioning.
+
+Usage:
+    cd backend
+    uv run python -m app.worker
+
+Claims jobs with claim_provisioning_jobs (migration 008), which leases rows
+with FOR UPDATE SKIP LOCKED, so any number of workers can share the queue.
+The lease is renewed while a job runs; a job whose worker dies is picked up
+again once its lease expires, until it has used up its attempts (migration 015).
+
+Failed jobs are retried with exponential backoff up to
+settings.provisioning_max_attempts, then the assistant is marked ERROR.
+SIGTERM/SIGINT stop claiming and wait for running jobs to finish.
+
+Also runs the claw status reconciler (app.services.reconciler).
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database import db
+from app.services import infra_api, provisioning
+from app.services.reconciler import run_reconciler
+from app.timeline import Timeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+logger = logging.getLogger("yourclaw.worker")
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt, after `attempts` tries."""
+    delay = settings.provisioning_retry_base_delay * 2 ** (attempts - 1)
+    return min(delay, settings.provisioning_retry_max_delay)
+
+
+async def _finish(job: dict, data: dict) -> None:
+    """Update a job we hold the lease on and release the lease."""
+    now = datetime.utcnow()
+    updated = await db.update(
+        "provisioning_jobs",
+        {**data, "locked_by": None, "locked_until": None, "updated_at": now.isoformat()},
+        {"id": job["id"], "locked_by": WORKER_ID},
+    )
+    if not updated:
+        logger.warning(f"Lost the lease on job {job['id']} before it finished")
+
+
+def _timeline(job: dict) -> Timeline:
+    """The job's timeline so far, plus the time it waited to be claimed."""
+    created = datetime.fromisoformat(job["created_at"])
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    created_at = created.timestamp()
+
+    timeline = Timeline.from_dict(job.get("timeline") or {"started_at": created_at})
+    if not any(step["name"] == "queue_wait" for step in timeline.steps):
+        timeline.add("queue_wait", created_at, datetime.now(timezone.utc).timestamp() - created_at)
+    return timeline
+
+
+async def _renew_lease(job: dict) -> None:
+    """Push the job's lease forward until cancelled, so a slow attempt isn't claimed twice."""
+    lease = settings.provisioning_lease_seconds
+    while True:
+        await asyncio.sleep(lease / 3)
+        locked_until = datetime.now(timezone.utc) + timedelta(seconds=lease)
+        try:
+            renewed = await db.update(
+                "provisioning_jobs",
+                {"locked_until": locked_until.isoformat()},
+                {"id": job["id"], "locked_by": WORKER_ID},
+            )
+        except Exception as e:
+            # The lease still has two thirds left; try again next round
+            logger.warning(f"Failed to renew the lease on job {job['id']}: {e}")
+            continue
+        if not renewed:
+            logger.warning(f"Lost the lease on job {job['id']} while it ran")
+            return
+
+
+async def _run_leased(job: dict, timeline: Timeline) -> None:
+    renewal = asyncio.create_task(_renew_lease(job))
+    try:
+        await provisioning.run_job(job, timeline)
+    finally:
+        renewal.cancel()
+
+
+async def _run(job: dict) -> None:
+    job_id = job["id"]
+    attempts = job["attempts"]
+    logger.info(f"Job {job_id}: provisioning {job['claw_id']} for user {job['user_id']} (attempt {attempts})")
+    timeline = _timeline(job)
+
+    try:
+        await _run_leased(job, timeline)
+    except provisioning.JobSuperseded as e:
+        logger.info(f"Job {job_id} canceled: {e}")
+        await _finish(job, {"status": "CANCELED", "last_error": str(e), "timeline": timeline.to_dict()})
+        return
+    except infra_api.InfraUnavailable as e:
+        # Refused before reaching the infra API: wait it out without using up an attempt
+        logger.warning(f"Job {job_id} deferred: {e}")
+        run_after = datetime.utcnow() + timedelta(seconds=max(e.retry_after, settings.provisioning_poll_interval))
+        await _finish(job, {
+            "status": "PENDING",
+            "attempts": attempts - 1,
+            "last_error": str(e),
+            "run_after": run_after.isoformat(),
+            "timeline": timeline.to_dict(),
+        })
+        return
+    except Exception as e:
+        permanent = isinstance(e, provisioning.JobFailed)
+        if permanent or attempts >= settings.provisioning_max_attempts:
+            logger.error(f"Job {job_id} failed after {attempts} attempt(s): {e}")
+            await _finish(job, {"status": "FAILED", "last_error": str(e), "timeline": timeline.to_dict()})
+            await provisioning.fail_assistant(job)
+        else:
+            delay = _retry_delay(attempts)
+            logger.warning(f"Job {job_id} attempt {attempts} failed, retrying in {delay:.0f}s: {e}")
+            run_after = datetime.utcnow() + timedelta(seconds=delay)
+            await _finish(job, {
+                "status": "PENDING",
+                "last_error": str(e),
+                "run_after": run_after.isoformat(),
+                "timeline": timeline.to_dict(),
+            })
+        return
+
+    await _finish(job, {"status": "COMPLETED", "last_error": None, "timeline": timeline.to_dict()})
+
+
+async def _run_safely(job: dict) -> None:
+    try:
+        await _run(job)
+    except Exception:
+        # Bookkeeping failed too; the lease expires and another attempt is made
+        logger.exception(f"Job {job['id']} could not be recorded")
+
+
+async def run_worker(stop: asyncio.Event) -> None:
+    """Claim and run jobs until `stop` is set, then drain running jobs."""
+    running: set[asyncio.Task] = set()
+    concurrency = settings.provisioning_worker_concurrency
+
+    while not stop.is_set():
+        free = concurrency - len(running)
+        jobs: list[dict] = []
+        if free > 0:
+            try:
+                jobs = await db.rpc(
+                    "claim_provisioning_jobs",
+                    {
+                        "p_worker": WORKER_ID,
+                        "p_limit": free,
+                        "p_lease_seconds": settings.provisioning_lease_seconds,
+                        "p_max_attempts": settings.provisioning_max_attempts,
+                    },
+                ) or []
+            except Exception as e:
+                logger.error(f"Failed to claim jobs: {e}")
+
+        for job in jobs:
+            task = asyncio.create_task(_run_safely(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        waiters = [asyncio.ensure_future(stop.wait())]
+        if running:
+            # Wake up as soon as a slot frees
+            waiters.append(asyncio.ensure_future(asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)))
+        _, pending = await asyncio.wait(
+            waiters, timeout=settings.provisioning_poll_interval, return_when=asyncio.FIRST_COMPLETED,
+        )
+        for w in pending:
+            w.cancel()
+
+    if running:
+        logger.info(f"Waiting for {len(running)} running job(s)")
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await db.start()
+    await infra_api.start()
+    logger.info(f"Provisioning worker {WORKER_ID} started (concurrency={settings.provisioning_worker_concurrency})")
+    try:
+        await asyncio.gather(run_worker(stop), run_reconciler(stop))
+    finally:
+        await infra_api.close()
+        await db.close()
+    logger.info("Provisioning worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""Compare select latency of the REST (PostgREST) and postgres (asyncpg) data backends.
+
+Usage:
+    cd backend
+    DATABASE_URL=postgresql://... uv run --extra postgres python bench_db.py <user_id> [iterations]
+
+A local Postgres stand-in works too (only the tables need to exist).
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from app.config import settings
+from app.database import SupabaseClient
+from app.database_postgres import PostgresClient
+
+
+async def bench(name: str, client, user_id: str, iterations: int) -> None:
+    await client.start()
+    try:
+        # Warm up the pool / prepared statements
+        await client.select("assistants", filters={"user_id": user_id}, single=True, cache=False)
+
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await client.select("assistants", filters={"user_id": user_id}, single=True, cache=False)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await client.close()
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:>8}: p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms max={timings[-1]:.2f}ms")
+
+
+async def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    user_id = sys.argv[1]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    await bench("rest", SupabaseClient(), user_id, iterations)
+    if settings.database_url:
+        await bench("postgres", PostgresClient(), user_id, iterations)
+    else:
+        print("DATABASE_URL not set, skipping postgres backend")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
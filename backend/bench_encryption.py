@@ -0,0 +1,51 @@
+"""Micro-benchmark: per-call Fernet construction vs the cached cipher and decrypt_many.
+
+Usage:
+    cd backend
+    uv run python bench_encryption.py [iterations]
+
+Decrypts a provisioning-sized batch (4 provider keys + a Telegram token)
+per iteration. Uses a throwaway key, so no .env is needed.
+"""
+
+import os
+import sys
+import time
+
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+
+from app.config import settings  # noqa: E402
+from app.services.encryption import decrypt, decrypt_many, encrypt  # noqa: E402
+
+BATCH = 5
+
+
+def bench(name: str, fn, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_batch = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{name:>22}: {per_batch:.1f}us per batch of {BATCH}")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    settings.encryption_key = Fernet.generate_key().decode()
+    ciphertexts = [encrypt(f"sk-bench-{i:040d}") for i in range(BATCH)]
+
+    def uncached() -> None:
+        # What every decrypt() did before the cipher was cached
+        for c in ciphertexts:
+            Fernet(settings.encryption_key.encode()).decrypt(c.encode()).decode()
+
+    bench("new Fernet per call", uncached, iterations)
+    bench("cached decrypt()", lambda: [decrypt(c) for c in ciphertexts], iterations)
+    bench("decrypt_many()", lambda: decrypt_many(ciphertexts), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-"""Fetch all users from Supabase and add them to Resend General audience."""
+"""Fetch all users from Supabase and add them to Resend General audience.
+
+Needs only RESEND_API_KEY and SUPABASE_SERVICE_ROLE_KEY (SUPABASE_URL optional).
+"""
 
 import os
-import requests
 import resend
 
+from script_users import fetch_all_users
+
 RESEND_API_KEY = os.environ["RESEND_API_KEY"]
 AUDIENCE_ID = "4cd8abe1-a7ff-4ad8-b45b-ab6b88900efb"
 
@@ -14,23 +18,12 @@ SUPABASE_SERVICE_KEY = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
 def main():
     resend.api_key = RESEND_API_KEY
 
-    # Fetch users from Supabase admin API
+    # Every page of the Supabase admin API, not just the first
     print("Fetching users from Supabase...")
-    resp = requests.get(
-        f"{SUPABASE_URL}/auth/v1/admin/users",
-        headers={
-            "apikey": SUPABASE_SERVICE_KEY,
-            "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-        },
-        params={"per_page": 100},
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    users = data.get("users", data) if isinstance(data, dict) else data
-    print(f"Found {len(users)} users")
-
     added = 0
     skipped = 0
+    users = fetch_all_users(SUPABASE_URL, SUPABASE_SERVICE_KEY, per_page=100)
+    print(f"{len(users)} users\n")
     for user in users:
         email = user.get("email", "")
         metadata = user.get("user_metadata", {}) or {}
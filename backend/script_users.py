@@ -0,0 +1,36 @@
+"""Auth user listing shared by the one-off email scripts (send_to_all.py, fix_audience.py).
+
+Talks to the Supabase admin API directly with plain requests, so the
+scripts keep needing only their own env vars, not the app settings.
+"""
+
+import requests
+
+
+def fetch_all_users(supabase_url: str, service_key: str, per_page: int = 500) -> list[dict]:
+    """Every auth user, loaded before the caller starts acting on any of them.
+
+    The admin API only pages by page number, so users signing up while we
+    read shift later pages and can show up twice; duplicates are dropped
+    by id. Reading everything up front keeps that window to the few
+    seconds of paging rather than the length of a send loop.
+    """
+    users: dict[str, dict] = {}
+    page = 1
+    while True:
+        resp = requests.get(
+            f"{supabase_url}/auth/v1/admin/users",
+            headers={
+                "apikey": service_key,
+                "Authorization": f"Bearer {service_key}",
+            },
+            params={"page": page, "per_page": per_page},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        batch = data.get("users", []) if isinstance(data, dict) else data
+        for user in batch:
+            users.setdefault(user["id"], user)
+        if len(batch) < per_page:
+            return list(users.values())
+        page += 1
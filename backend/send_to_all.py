@@ -1,11 +1,15 @@
-"""Send announcement email to all production users."""
+"""Send announcement email to all production users.
+
+Needs only RESEND_API_KEY and SUPABASE_SERVICE_ROLE_KEY (SUPABASE_URL optional).
+"""
 
 import json
 import os
 import time
-import requests
 import resend
 
+from script_users import fetch_all_users
+
 RESEND_API_KEY = os.environ["RESEND_API_KEY"]
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://jqqnosjfmotusghzhjvg.supabase.co")
 SUPABASE_SERVICE_KEY = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
@@ -142,23 +146,12 @@ https://yourclaw.dev
 def main():
     resend.api_key = RESEND_API_KEY
 
-    # 1. Fetch all users from production Supabase
-    print("Fetching users from production Supabase...")
-    resp = requests.get(
-        f"{SUPABASE_URL}/auth/v1/admin/users",
-        headers={
-            "apikey": SUPABASE_SERVICE_KEY,
-            "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-        },
-        params={"page": 1, "per_page": 500},
-    )
-    resp.raise_for_status()
-    users = resp.json().get("users", [])
-    print(f"Found {len(users)} users\n")
-
-    # 2. Send to each user
+    # Load every user first: paging while sending would skip or repeat people who shift pages
+    print("Fetching users from production Supabase...\n")
     sent = 0
     failed = 0
+    users = fetch_all_users(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    print(f"{len(users)} users\n")
     for user in users:
         email = user.get("email", "")
         if not email or email == "dev@localhost":
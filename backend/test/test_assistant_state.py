@@ -0,0 +1,66 @@
+"""transition_assistant (migration 007) through app.services.assistant_state."""
+
+import asyncio
+
+from app.services.assistant_state import transition
+
+
+async def test_create_then_compare_and_set(pg, make_user):
+    user_id = await make_user()
+
+    created = await transition(user_id, "PROVISIONING", ["NONE"], model="openai/gpt-5", claw_id="claw-1", create=True)
+    assert created.applied
+    assert created.previous is None
+    assert created.assistant["status"] == "PROVISIONING"
+    assert created.assistant["claw_id"] == "claw-1"
+
+    # Wrong claw_id: refused, row unchanged
+    stale = await transition(user_id, "READY", ["PROVISIONING"], expected_claw_id="claw-0")
+    assert not stale.applied
+    assert stale.assistant["status"] == "PROVISIONING"
+
+    ready = await transition(user_id, "READY", ["PROVISIONING"], expected_claw_id="claw-1")
+    assert ready.applied
+    assert ready.previous["status"] == "PROVISIONING"
+    assert ready.assistant["model"] == "openai/gpt-5"
+
+    reset = await transition(user_id, "NONE", clear_claw_id=True)
+    assert reset.applied
+    assert reset.previous["claw_id"] == "claw-1"
+    assert reset.assistant["claw_id"] is None
+
+
+async def test_missing_row_without_create(pg, make_user):
+    user_id = await make_user()
+
+    result = await transition(user_id, "READY", ["PROVISIONING"])
+    assert not result.applied
+    assert result.assistant is None
+
+
+async def test_concurrent_claims_apply_once(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "READY", None, claw_id="claw-0", create=True)
+
+    results = await asyncio.gather(*(
+        transition(user_id, "PROVISIONING", ["NONE", "READY", "ERROR"], claw_id=f"claw-{i}", create=True)
+        for i in range(1, 9)
+    ))
+
+    winners = [r for r in results if r.applied]
+    assert len(winners) == 1
+    winner_claw = winners[0].assistant["claw_id"]
+    for loser in (r for r in results if not r.applied):
+        assert loser.assistant["status"] == "PROVISIONING"
+        assert loser.assistant["claw_id"] == winner_claw
+
+
+async def test_concurrent_creates_insert_one_row(pg, make_user):
+    user_id = await make_user()
+
+    results = await asyncio.gather(*(
+        transition(user_id, "PROVISIONING", ["NONE"], claw_id=f"claw-{i}", create=True) for i in range(8)
+    ))
+
+    assert sum(r.applied for r in results) == 1
+    assert len(await pg.select("assistants", filters={"user_id": user_id})) == 1
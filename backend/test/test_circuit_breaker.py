@@ -0,0 +1,84 @@
+"""CircuitBreaker state machine, on a fake clock."""
+
+import pytest
+
+from app import circuit_breaker
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    defaults = dict(window=60, min_calls=4, failure_rate=0.5, slow_rate=0.5, open_seconds=30)
+    return CircuitBreaker(**{**defaults, **kwargs})
+
+
+def test_opens_on_failure_rate_after_min_calls(clock):
+    breaker = _breaker()
+    for failed in (True, True, False):
+        breaker.record(failed)
+    assert breaker.state == CLOSED  # 3 calls < min_calls
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+
+def test_opens_on_slow_rate(clock):
+    breaker = _breaker()
+    for slow in (True, True, False, False):
+        breaker.record(False, slow=slow)
+    assert breaker.state == OPEN
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record(True)
+    clock[0] += 61
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_trial_success_closes(clock):
+    breaker = _breaker(half_open_calls=1)
+    for _ in range(4):
+        breaker.record(True)
+    clock[0] += 30
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one trial in flight
+
+    breaker.record(False)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_trial_failure_reopens(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(True)
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record(False, slow=True)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    assert breaker.retry_after() == 30
+
+
+def test_outcomes_of_calls_started_before_opening_are_ignored(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.stats()["window_calls"] == 0
@@ -0,0 +1,93 @@
+"""PostgresClient round trips against a real database (see conftest.py)."""
+
+import asyncio
+
+import pytest
+
+
+async def test_crud_round_trips(pg, make_user):
+    user_id = await make_user()
+
+    row = await pg.insert("assistants", {"user_id": user_id, "status": "READY", "model": "openai/gpt-5"})
+    assert row["user_id"] == user_id
+    assert isinstance(row["id"], str) and isinstance(row["created_at"], str)
+
+    assert await pg.insert("api_keys", {"user_id": user_id, "encrypted_key": "x"}, returning="minimal") == {}
+
+    selected = await pg.select("assistants", columns="status,model", filters={"user_id": user_id}, single=True)
+    assert selected == {"status": "READY", "model": "openai/gpt-5"}
+    assert await pg.select("assistants", filters={"user_id": user_id, "status": "ERROR"}, single=True) is None
+
+    updated = await pg.update("assistants", {"status": "ERROR"}, {"user_id": user_id})
+    assert [r["status"] for r in updated] == ["ERROR"]
+
+    upserted = await pg.upsert(
+        "user_phones", {"user_id": user_id, "phone_e164": "+15550001", "channel": "TELEGRAM"}, on_conflict="user_id",
+    )
+    upserted_again = await pg.upsert(
+        "user_phones", {"user_id": user_id, "phone_e164": "+15550002", "channel": "TELEGRAM"}, on_conflict="user_id",
+    )
+    assert upserted_again["id"] == upserted["id"]
+    assert upserted_again["phone_e164"] == "+15550002"
+
+    deleted = await pg.delete("api_keys", {"user_id": user_id})
+    assert len(deleted) == 1
+    assert await pg.select("api_keys", filters={"user_id": user_id}) == []
+
+
+async def test_rpc_returns_json(pg, make_user):
+    user_id = await make_user(email="rpc@example.com")
+
+    profile = await pg.rpc("get_user_profile", {"p_user_id": user_id})
+    assert profile["user_exists"] is True
+    assert profile["email"] == "rpc@example.com"
+
+    result = await pg.rpc(
+        "transition_assistant",
+        {"p_user_id": user_id, "p_to_status": "PROVISIONING", "p_claw_id": "claw-1", "p_create": True},
+    )
+    assert result["applied"] is True
+    assert result["assistant"]["claw_id"] == "claw-1"
+
+
+async def test_bulk_writes_and_iter_rows(pg, make_user):
+    user_ids = [await make_user() for _ in range(5)]
+
+    result = await pg.insert_many(
+        "assistants", [{"user_id": u, "status": "READY"} for u in user_ids], chunk_size=2, returning="minimal",
+    )
+    assert result.ok and result.written == 5
+
+    result = await pg.update_many("assistants", {"status": "ERROR"}, "user_id", user_ids[:3], returning="minimal")
+    assert result.written == 3
+
+    rows = [r async for r in pg.iter_rows("assistants", columns="user_id,status", page_size=2)]
+    assert sorted(r["user_id"] for r in rows) == sorted(user_ids)
+    assert sum(r["status"] == "ERROR" for r in rows) == 3
+
+
+async def test_transaction_rolls_back(pg, make_user):
+    user_id = await make_user()
+
+    with pytest.raises(RuntimeError):
+        async with pg.transaction() as tx:
+            await tx.insert("assistants", {"user_id": user_id, "status": "READY"})
+            raise RuntimeError("abort")
+
+    assert await pg.select("assistants", filters={"user_id": user_id}) == []
+
+
+async def test_auth_users(pg, make_user):
+    user_id = await make_user(email="ada@example.com", name="Ada Lovelace")
+
+    user = await pg.get_auth_user(user_id)
+    assert user["email"] == "ada@example.com"
+    assert user["user_metadata"] == {"name": "Ada Lovelace"}
+    assert await pg.get_auth_user("00000000-0000-0000-0000-000000000000") is None
+
+
+async def test_statements_run_under_deadline(pg):
+    with pytest.raises(asyncio.TimeoutError):
+        await pg._fetch("SELECT pg_sleep(2)", [], deadline=0.1)
+    with pytest.raises(asyncio.TimeoutError):
+        await pg._execute("SELECT pg_sleep(2)", [], deadline=0.1)
@@ -0,0 +1,124 @@
+"""Idempotency-Key handling: the in-process runner and the durable job record (migration 013)."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.cache import TTLCache
+from app.routers import assistants
+from app.schemas import AssistantCreateInput, AssistantUpdateInput
+from app.services import idempotency, provisioning
+from app.services.assistant_state import transition
+from app.user_context import UserContext
+
+
+@pytest.fixture(autouse=True)
+def fresh_runner(monkeypatch):
+    monkeypatch.setattr(idempotency, "_results", TTLCache(100))
+    monkeypatch.setattr(idempotency, "_inflight", {})
+
+
+def _counting_handler(result="ok", fail: bool = False):
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if fail:
+            raise RuntimeError("boom")
+        return result
+
+    return handler, calls
+
+
+async def test_concurrent_duplicates_share_one_run():
+    handler, calls = _counting_handler()
+
+    results = await asyncio.gather(*(idempotency.run("create", "u", "key-1", handler, "fp") for _ in range(5)))
+
+    assert results == ["ok"] * 5
+    assert len(calls) == 1
+
+
+async def test_success_is_replayed_and_errors_are_not():
+    handler, calls = _counting_handler()
+    await idempotency.run("create", "u", "key-1", handler, "fp")
+    assert await idempotency.run("create", "u", "key-1", handler, "fp") == "ok"
+    assert len(calls) == 1
+
+    failing, failed_calls = _counting_handler(fail=True)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await idempotency.run("create", "u", "key-2", failing, "fp")
+    assert len(failed_calls) == 2
+
+
+async def test_no_key_always_runs():
+    handler, calls = _counting_handler()
+    await idempotency.run("create", "u", None, handler)
+    await idempotency.run("create", "u", None, handler)
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("scope,fingerprint", [("update", "fp"), ("create", "other-body")])
+async def test_key_reused_for_another_request(scope, fingerprint):
+    handler, calls = _counting_handler()
+    await idempotency.run("create", "u", "key-1", handler, "fp")
+
+    with pytest.raises(idempotency.KeyReused):
+        await idempotency.run(scope, "u", "key-1", handler, fingerprint)
+    assert len(calls) == 1
+
+
+def test_fingerprint_follows_the_body():
+    a = idempotency.fingerprint(AssistantUpdateInput(model="openai/gpt-5"))
+    assert a == idempotency.fingerprint(AssistantUpdateInput(model="openai/gpt-5"))
+    assert a != idempotency.fingerprint(AssistantUpdateInput(model="anthropic/claude-sonnet-4-5"))
+
+
+async def test_find_job_checks_endpoint_and_body(pg, make_user):
+    user_id = await make_user()
+    await provisioning.enqueue(
+        user_id, "claw-1", "openai/gpt-5",
+        idempotency_key="key-1", idempotency_scope="create_assistant", request_fingerprint="fp",
+    )
+
+    job = await provisioning.find_job(user_id, "key-1", "create_assistant", "fp")
+    assert job["claw_id"] == "claw-1"
+    with pytest.raises(idempotency.KeyReused):
+        await provisioning.find_job(user_id, "key-1", "update_assistant", "fp")
+    with pytest.raises(idempotency.KeyReused):
+        await provisioning.find_job(user_id, "key-1", "create_assistant", "other")
+
+
+async def test_patch_with_a_post_key_is_422(pg, make_user):
+    user_id = await make_user()
+    body = AssistantCreateInput(model="openai/gpt-5")
+    await provisioning.enqueue(
+        user_id, "claw-1", "openai/gpt-5", idempotency_key="key-1",
+        idempotency_scope="create_assistant", request_fingerprint=idempotency.fingerprint(body),
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await assistants.update_assistant(
+            AssistantUpdateInput(model="openai/gpt-5"), UserContext(user_id), idempotency_key="key-1",
+        )
+    assert exc.value.status_code == 422
+
+
+async def test_losing_the_key_race_undoes_the_claim(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "READY", None, model="openai/gpt-5", claw_id="claw-1", create=True)
+    await provisioning.enqueue(user_id, "claw-1", "openai/gpt-5", idempotency_key="key-1")
+
+    # A second request with the same key claims the assistant, then can't queue
+    claimed = await transition(user_id, "PROVISIONING", ["READY"], model="openai/gpt-5-mini", claw_id="claw-2")
+    with pytest.raises(Exception):
+        await provisioning.enqueue(user_id, "claw-2", "openai/gpt-5-mini", idempotency_key="key-1")
+
+    assert await assistants._lost_key_race(user_id, "key-1", "claw-2", claimed.previous)
+
+    row = await pg.select("assistants", filters={"user_id": user_id}, single=True)
+    assert (row["status"], row["claw_id"], row["model"]) == ("READY", "claw-1", "openai/gpt-5")
+    assert not await assistants._lost_key_race(user_id, "key-2", "claw-1", claimed.previous)
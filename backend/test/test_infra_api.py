@@ -0,0 +1,88 @@
+"""Load shedding in front of the infra API: per-pool concurrency slots and the breaker."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.circuit_breaker import OPEN, CircuitBreaker
+from app.config import settings
+from app.services import infra_api
+
+
+@pytest.fixture
+async def infra(monkeypatch):
+    """Point infra_api at a mock transport with one slot per pool.
+
+    Set `.status` / `.delay` to shape responses; `.requests` records what was sent.
+    """
+    api = SimpleNamespace(status=200, delay=0.0, requests=[])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        api.requests.append(request)
+        await asyncio.sleep(api.delay)
+        return httpx.Response(api.status, json={"ready": True})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "mock_containers", False)
+    monkeypatch.setattr(settings, "infra_api_queue_timeout", 0.05)
+    monkeypatch.setattr(infra_api, "_client", client)
+    monkeypatch.setattr(
+        infra_api, "_breaker",
+        CircuitBreaker(window=60, min_calls=3, failure_rate=0.5, slow_rate=1.0, open_seconds=30),
+    )
+    monkeypatch.setattr(infra_api, "_slots", {"provision": asyncio.Semaphore(1), "other": asyncio.Semaphore(1)})
+    yield api
+    await client.aclose()
+
+
+async def test_calls_beyond_the_slot_limit_are_shed(infra):
+    infra.delay = 0.2
+
+    results = await asyncio.gather(
+        infra_api.get_status("user-1", "claw-1"),
+        infra_api.get_status("user-1", "claw-2"),
+        return_exceptions=True,
+    )
+
+    assert sum(r == {"ready": True} for r in results) == 1
+    (shed,) = [r for r in results if isinstance(r, infra_api.InfraUnavailable)]
+    assert shed.reason == "overloaded"
+    assert len(infra.requests) == 1
+
+
+async def test_provisioning_does_not_take_status_slots(infra):
+    infra.delay = 0.2
+
+    provision, status = await asyncio.gather(
+        infra_api._request("provision", "POST", "/provision"),
+        infra_api.get_status("user-1", "claw-1"),
+    )
+
+    assert provision.status_code == 200
+    assert status == {"ready": True}
+
+
+async def test_server_errors_open_the_breaker(infra):
+    infra.status = 503
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await infra_api.get_status("user-1", "claw-1")
+    assert infra_api._breaker.state == OPEN
+
+    with pytest.raises(infra_api.InfraUnavailable) as exc:
+        await infra_api.get_status("user-1", "claw-1")
+
+    assert exc.value.reason == "circuit open"
+    assert exc.value.retry_after > 0
+    assert len(infra.requests) == 3  # refused without sending
+
+
+async def test_client_errors_do_not_count_as_failures(infra):
+    infra.status = 404
+    for _ in range(5):
+        with pytest.raises(httpx.HTTPStatusError):
+            await infra_api.get_status("user-1", "claw-1")
+
+    assert infra_api._breaker.state != OPEN
@@ -0,0 +1,101 @@
+"""Readiness pushed by the infra API: POST /webhooks/infra -> record_claw_readiness (migrations 009, 016)."""
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.webhooks import infra_webhook
+from app.schemas import ClawReadinessBatch
+from app.services.assistant_state import transition
+from app.services.infra_api import infra_user_id
+
+AUTH = "Bearer infra-key"  # YOURCLAW_API_KEY in conftest.py
+
+
+def _batch(user_id: str, *events: tuple[str, bool]) -> ClawReadinessBatch:
+    return ClawReadinessBatch.model_validate(
+        {"events": [
+            {"user_id": infra_user_id(user_id), "claw_id": claw_id, "ready": ready} for claw_id, ready in events
+        ]}
+    )
+
+
+async def _assistant(pg, user_id: str) -> dict:
+    return await pg.select("assistants", filters={"user_id": user_id}, single=True)
+
+
+async def test_rejects_wrong_key():
+    with pytest.raises(HTTPException) as exc:
+        await infra_webhook(_batch(str(uuid.uuid4()), ("claw-1", True)), authorization="Bearer nope")
+    assert exc.value.status_code == 401
+
+
+async def test_ready_report_completes_provisioning(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+
+    assert await infra_webhook(_batch(user_id, ("claw-1", True)), authorization=AUTH) == {"status": "ok", "updated": 1}
+
+    row = await _assistant(pg, user_id)
+    assert row["status"] == "READY"
+    assert row["pod_ready"] is True
+
+
+async def test_not_ready_report_keeps_status(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "READY", None, claw_id="claw-1", create=True)
+
+    await infra_webhook(_batch(user_id, ("claw-1", False)), authorization=AUTH)
+
+    row = await _assistant(pg, user_id)
+    assert row["status"] == "READY"
+    assert row["pod_ready"] is False
+
+
+async def test_last_report_per_claw_wins(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+
+    await infra_webhook(_batch(user_id, ("claw-1", True), ("claw-1", False)), authorization=AUTH)
+
+    row = await _assistant(pg, user_id)
+    assert row["status"] == "PROVISIONING"
+    assert row["pod_ready"] is False
+
+
+async def test_reports_for_replaced_claws_are_ignored(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "PROVISIONING", ["NONE"], claw_id="claw-2", create=True)
+
+    result = await infra_webhook(_batch(user_id, ("claw-1", True)), authorization=AUTH)
+
+    assert result["updated"] == 0
+    assert (await _assistant(pg, user_id))["status"] == "PROVISIONING"
+
+
+async def test_new_claw_id_resets_pod_ready(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "READY", None, claw_id="claw-1", create=True)
+    await infra_webhook(_batch(user_id, ("claw-1", True)), authorization=AUTH)
+
+    await transition(user_id, "PROVISIONING", ["READY"], claw_id="claw-2")
+
+    assert (await _assistant(pg, user_id))["pod_ready"] is None
+
+
+async def test_reports_only_touch_the_reporting_users_claw(pg, make_user):
+    owner, other = await make_user(), await make_user()
+    await transition(owner, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+    await transition(other, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+
+    assert (await infra_webhook(_batch(owner, ("claw-1", True)), authorization=AUTH))["updated"] == 1
+
+    assert (await _assistant(pg, owner))["status"] == "READY"
+    row = await _assistant(pg, other)
+    assert (row["status"], row["pod_ready"]) == ("PROVISIONING", None)
+
+
+async def test_sql_infra_user_id_matches_python(pg):
+    for user_id in [str(uuid.uuid4()) for _ in range(20)]:
+        assert await pg.rpc("infra_user_id", {"p_user_id": user_id}) == infra_user_id(user_id)
@@ -0,0 +1,91 @@
+"""Profile cache: invalidation from newly verified access tokens, and batch prefetch."""
+
+import time
+
+import jwt
+
+from app import auth
+from app.cache import TTLCache
+from app.config import settings
+from app.services import user_profiles
+
+USER_ID = "6f1c1f64-0f5e-4c55-9a3e-1b1f9c1f0001"
+
+
+def _token(email: str, name: str) -> str:
+    claims = {
+        "sub": USER_ID,
+        "email": email,
+        "user_metadata": {"name": name},
+        "aud": settings.supabase_jwt_audience,
+        "iss": auth._issuer(),
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, settings.supabase_jwt_secret, algorithm="HS256")
+
+
+async def test_new_token_with_changed_email_drops_cached_profile(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_jwt_secret", "test-secret-" + "x" * 32)
+    user = {"id": USER_ID, "email": "old@example.com", "user_metadata": {"name": "Ada Lovelace"}}
+    fetches = []
+
+    async def get_auth_user(user_id, deadline=None):
+        fetches.append(user_id)
+        return dict(user)
+
+    monkeypatch.setattr(user_profiles.db, "get_auth_user", get_auth_user)
+    user_profiles.invalidate(USER_ID)
+
+    assert (await user_profiles.get_profile(USER_ID)).email == "old@example.com"
+    await user_profiles.get_profile(USER_ID)
+    assert len(fetches) == 1
+
+    # Same values: the cached profile stays
+    await auth._verify(_token("old@example.com", "Ada Lovelace"))
+    await user_profiles.get_profile(USER_ID)
+    assert len(fetches) == 1
+
+    # Email changed in Supabase Auth: the next token shows it
+    user["email"] = "new@example.com"
+    await auth._verify(_token("new@example.com", "Ada Lovelace"))
+    assert (await user_profiles.get_profile(USER_ID)).email == "new@example.com"
+    assert len(fetches) == 2
+
+
+async def test_token_checks_do_not_count_as_lookups(monkeypatch):
+    monkeypatch.setattr(user_profiles, "_cache", TTLCache(10))
+
+    async def get_auth_user(user_id, deadline=None):
+        return {"id": user_id, "email": "ada@example.com", "user_metadata": {}}
+
+    monkeypatch.setattr(user_profiles.db, "get_auth_user", get_auth_user)
+    await user_profiles.get_profile(USER_ID)
+    before = user_profiles.stats()
+
+    user_profiles.refresh_from_token({"sub": USER_ID, "email": "ada@example.com"})
+    user_profiles.refresh_from_token({"sub": "someone-else", "email": "x@example.com"})
+
+    assert user_profiles.stats() == before
+
+
+async def test_prefetch_loads_each_user_once(monkeypatch):
+    monkeypatch.setattr(user_profiles, "_cache", TTLCache(10))
+    fetches = []
+
+    async def get_auth_user(user_id, deadline=None):
+        fetches.append(user_id)
+        if user_id == "broken":
+            raise RuntimeError("admin API down")
+        if user_id == "gone":
+            return None
+        return {"id": user_id, "email": f"{user_id}@example.com", "user_metadata": {}}
+
+    monkeypatch.setattr(user_profiles.db, "get_auth_user", get_auth_user)
+
+    profiles = await user_profiles.prefetch(["a", "b", "a", "gone", "broken"], concurrency=2)
+
+    assert {u: p.email for u, p in profiles.items()} == {"a": "a@example.com", "b": "b@example.com"}
+    assert sorted(fetches) == ["a", "b", "broken", "gone"]
+    # Cached: no second fetch
+    assert (await user_profiles.get_profile("b")).email == "b@example.com"
+    assert len(fetches) == 4
@@ -0,0 +1,221 @@
+"""Provisioning job leasing (migration 008) and app.worker's bookkeeping."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app import worker
+from app.config import settings
+from app.routers.webhooks import infra_webhook
+from app.schemas import ClawReadinessBatch
+from app.services import provisioning, reconciler
+from app.services.assistant_state import transition
+from app.services.encryption import encrypt
+from app.services.infra_api import infra_user_id
+
+
+async def _enqueue(pg, user_id: str, claw_id: str, **fields) -> dict:
+    return await pg.insert(
+        "provisioning_jobs", {"user_id": user_id, "claw_id": claw_id, "model": "openai/gpt-5", **fields},
+    )
+
+
+async def _claim(
+    pg, limit: int = 1, lease: int = 300, worker_id: str = worker.WORKER_ID, max_attempts: int | None = None,
+) -> list[dict]:
+    return await pg.rpc(
+        "claim_provisioning_jobs",
+        {"p_worker": worker_id, "p_limit": limit, "p_lease_seconds": lease, "p_max_attempts": max_attempts},
+    )
+
+
+async def test_concurrent_workers_never_share_a_job(pg, make_user):
+    for i in range(10):
+        await _enqueue(pg, await make_user(), f"claw-{i}")
+
+    batches = await asyncio.gather(*(_claim(pg, limit=3, worker_id=f"w{n}") for n in range(6)))
+
+    claimed = [job["id"] for batch in batches for job in batch]
+    assert len(claimed) == len(set(claimed))
+    assert all(job["attempts"] == 1 and job["status"] == "RUNNING" for batch in batches for job in batch)
+
+
+async def test_expired_lease_is_claimed_again(pg, make_user):
+    job = await _enqueue(pg, await make_user(), "claw-1")
+
+    (first,) = await _claim(pg, worker_id="dead-worker")
+    assert first["id"] == job["id"]
+    assert await _claim(pg) == []
+
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    await pg.update("provisioning_jobs", {"locked_until": past}, {"id": job["id"]})
+
+    (again,) = await _claim(pg)
+    assert again["id"] == job["id"]
+    assert again["attempts"] == 2
+    assert again["locked_by"] == worker.WORKER_ID
+
+
+async def test_expired_lease_on_the_last_attempt_fails_the_job(pg, make_user):
+    user_id = await make_user()
+    await transition(user_id, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+    job = await _enqueue(pg, user_id, "claw-1")
+
+    await _claim(pg, worker_id="dead-worker", max_attempts=1)
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    await pg.update("provisioning_jobs", {"locked_until": past}, {"id": job["id"]})
+
+    assert await _claim(pg, max_attempts=1) == []
+
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert (row["status"], row["attempts"], row["locked_by"]) == ("FAILED", 1, None)
+    assistant = await pg.select("assistants", filters={"user_id": user_id}, single=True)
+    assert assistant["status"] == "ERROR"
+
+
+async def test_backoff_delays_claim(pg, make_user):
+    later = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+    await _enqueue(pg, await make_user(), "claw-1", run_after=later)
+
+    assert await _claim(pg) == []
+
+
+async def test_successful_job_completes_and_releases_lease(pg, make_user, monkeypatch):
+    user_id = await make_user()
+    await _enqueue(pg, user_id, "claw-1")
+
+    async def run_job(job, timeline):
+        with timeline.span("infra_provision"):
+            pass
+
+    monkeypatch.setattr(provisioning, "run_job", run_job)
+    (job,) = await _claim(pg)
+    await worker._run(job)
+
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "COMPLETED"
+    assert row["locked_by"] is None and row["locked_until"] is None
+    assert [s["name"] for s in row["timeline"]["steps"]] == ["queue_wait", "infra_provision"]
+
+
+async def test_lease_is_renewed_while_the_job_runs(pg, make_user, monkeypatch):
+    await _enqueue(pg, await make_user(), "claw-1")
+    monkeypatch.setattr(settings, "provisioning_lease_seconds", 1)
+    (job,) = await _claim(pg, lease=1)
+    seen = []
+
+    async def run_job(job, timeline):
+        for _ in range(3):
+            await asyncio.sleep(0.5)
+            row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+            seen.append((datetime.now(timezone.utc), datetime.fromisoformat(row["locked_until"])))
+
+    monkeypatch.setattr(provisioning, "run_job", run_job)
+    await worker._run(job)
+
+    # Never expired, although the job outlived its original 1s lease
+    assert all(locked_until > at for at, locked_until in seen)
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "COMPLETED"
+
+
+async def test_failed_attempt_is_retried_then_marks_assistant_error(pg, make_user, monkeypatch):
+    user_id = await make_user()
+    await transition(user_id, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True)
+    await _enqueue(pg, user_id, "claw-1")
+
+    async def run_job(job, timeline):
+        raise RuntimeError("infra API down")
+
+    monkeypatch.setattr(provisioning, "run_job", run_job)
+    monkeypatch.setattr(settings, "provisioning_max_attempts", 2)
+
+    (job,) = await _claim(pg)
+    await worker._run(job)
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "PENDING"
+    assert row["last_error"] == "infra API down"
+    assert datetime.fromisoformat(row["run_after"]) > datetime.now(timezone.utc)
+
+    await pg.update("provisioning_jobs", {"run_after": datetime.now(timezone.utc).isoformat()}, {"id": job["id"]})
+    (job,) = await _claim(pg)
+    await worker._run(job)
+
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "FAILED"
+    assistant = await pg.select("assistants", filters={"user_id": user_id}, single=True)
+    assert assistant["status"] == "ERROR"
+
+
+async def test_superseded_job_is_canceled(pg, make_user, monkeypatch):
+    user_id = await make_user()
+    await _enqueue(pg, user_id, "claw-1")
+
+    async def run_job(job, timeline):
+        raise provisioning.JobSuperseded("assistant deleted")
+
+    monkeypatch.setattr(provisioning, "run_job", run_job)
+    (job,) = await _claim(pg)
+    await worker._run(job)
+
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "CANCELED"
+    assert row["attempts"] == 1
+
+
+async def test_reconfigure_survives_readiness_reports_before_the_worker(pg, make_user, monkeypatch):
+    user_id = await make_user()
+    await pg.insert("api_keys", {"user_id": user_id, "provider": "OPENAI", "encrypted_key": encrypt("sk-test")})
+    await transition(user_id, "READY", None, model="openai/gpt-5", claw_id="claw-1", create=True)
+
+    # What PATCH /assistants does for a model change
+    job_id = str(uuid.uuid4())
+    await transition(
+        user_id, "PROVISIONING", ["READY"], expected_claw_id="claw-1", model="openai/gpt-5-mini",
+        pending_job_id=job_id,
+    )
+    await provisioning.enqueue(user_id, "claw-1", "openai/gpt-5-mini", reconfigure=True, job_id=job_id)
+
+    # The old pod is still up and reports in, by webhook and reconciler, before the job runs
+    async def get_statuses(claws):
+        return [{"user_id": u, "claw_id": c, "ready": True} for u, c in claws]
+
+    monkeypatch.setattr(reconciler.infra_api, "get_statuses", get_statuses)
+    event = {"user_id": infra_user_id(user_id), "claw_id": "claw-1", "ready": True}
+    batch = ClawReadinessBatch.model_validate({"events": [event]})
+    await infra_webhook(batch, authorization="Bearer infra-key")
+    await reconciler.reconcile_once()
+
+    row = await pg.select("assistants", filters={"user_id": user_id}, single=True)
+    assert row["status"] == "PROVISIONING"
+    assert row["pod_ready"] is True
+
+    applied = []
+
+    async def update_config(infra_user, claw_id, **config):
+        applied.append((claw_id, config["model"]))
+        return {"restarted": True}
+
+    monkeypatch.setattr(provisioning.infra_api, "update_config", update_config)
+    (job,) = await _claim(pg)
+    assert job["id"] == job_id
+    await worker._run(job)
+
+    assert applied == [("claw-1", "openai/gpt-5-mini")]
+    assert (await pg.select("provisioning_jobs", filters={"id": job_id}, single=True))["status"] == "COMPLETED"
+    row = await pg.select("assistants", filters={"user_id": user_id}, single=True)
+    assert (row["status"], row["model"], row["pending_job_id"]) == ("READY", "openai/gpt-5-mini", None)
+
+
+async def test_job_not_owning_the_assistant_is_superseded(pg, make_user):
+    user_id = await make_user()
+    await transition(
+        user_id, "PROVISIONING", ["NONE"], claw_id="claw-1", create=True, pending_job_id=str(uuid.uuid4()),
+    )
+    await _enqueue(pg, user_id, "claw-1", reconfigure=True)
+
+    (job,) = await _claim(pg)
+    await worker._run(job)
+
+    row = await pg.select("provisioning_jobs", filters={"id": job["id"]}, single=True)
+    assert row["status"] == "CANCELED"
@@ -0,0 +1,37 @@
+-- Migration 006: Single-round-trip dashboard profile
+-- GET /users/me used to read user_phones, subscriptions, assistants and the
+-- auth admin API one after another. This function returns all of it (including
+-- the auth email) in one PostgREST call: POST /rest/v1/rpc/get_user_profile
+
+CREATE OR REPLACE FUNCTION get_user_profile(p_user_id UUID)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT json_build_object(
+    'user_exists', EXISTS (SELECT 1 FROM auth.users WHERE id = p_user_id),
+    'email', (SELECT email FROM auth.users WHERE id = p_user_id),
+    'phone', (
+      SELECT json_build_object(
+        'phone_e164', phone_e164,
+        'channel', channel,
+        'telegram_username', telegram_username
+      )
+      FROM user_phones WHERE user_id = p_user_id
+    ),
+    'subscription', (
+      SELECT json_build_object('status', status)
+      FROM subscriptions WHERE user_id = p_user_id
+    ),
+    'assistant', (
+      SELECT json_build_object('status', status)
+      FROM assistants WHERE user_id = p_user_id
+    )
+  );
+$$;
+
+-- Reads auth.users, so only the backend (service role) may call it
+REVOKE ALL ON FUNCTION get_user_profile(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_user_profile(UUID) TO service_role;
@@ -0,0 +1,74 @@
+-- Migration 007: Atomic assistant state transitions
+-- Replaces select-then-update chains in the backend with one compare-and-set
+-- call: POST /rest/v1/rpc/transition_assistant
+--
+-- The assistant row is locked, checked against the expected status (and
+-- optionally claw_id), and updated in the same statement, so two concurrent
+-- requests can never both move an assistant into PROVISIONING.
+--
+-- Returns: {"applied": bool, "previous": <row before> | null, "assistant": <row now> | null}
+
+CREATE OR REPLACE FUNCTION transition_assistant(
+  p_user_id UUID,
+  p_to_status TEXT,
+  p_from_status TEXT[] DEFAULT NULL,      -- allowed current statuses (NULL = any)
+  p_expected_claw_id TEXT DEFAULT NULL,   -- only apply if claw_id still matches
+  p_model TEXT DEFAULT NULL,              -- new model (NULL = unchanged)
+  p_claw_id TEXT DEFAULT NULL,            -- new claw_id (NULL = unchanged)
+  p_clear_claw_id BOOLEAN DEFAULT FALSE,  -- set claw_id to NULL
+  p_create BOOLEAN DEFAULT FALSE          -- insert the row if the user has none
+)
+RETURNS JSON
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_prev assistants%ROWTYPE;
+  v_row assistants%ROWTYPE;
+BEGIN
+  SELECT * INTO v_prev FROM assistants WHERE user_id = p_user_id FOR UPDATE;
+
+  IF NOT FOUND THEN
+    IF NOT p_create OR (p_from_status IS NOT NULL AND NOT 'NONE' = ANY(p_from_status)) THEN
+      RETURN json_build_object('applied', false, 'previous', NULL, 'assistant', NULL);
+    END IF;
+
+    -- A concurrent creator wins the unique(user_id) race; we report not applied
+    IF p_model IS NULL THEN
+      INSERT INTO assistants (user_id, status, claw_id)
+      VALUES (p_user_id, p_to_status, p_claw_id)
+      ON CONFLICT (user_id) DO NOTHING
+      RETURNING * INTO v_row;
+    ELSE
+      INSERT INTO assistants (user_id, status, model, claw_id)
+      VALUES (p_user_id, p_to_status, p_model, p_claw_id)
+      ON CONFLICT (user_id) DO NOTHING
+      RETURNING * INTO v_row;
+    END IF;
+
+    IF NOT FOUND THEN
+      SELECT * INTO v_row FROM assistants WHERE user_id = p_user_id;
+      RETURN json_build_object('applied', false, 'previous', NULL, 'assistant', row_to_json(v_row));
+    END IF;
+    RETURN json_build_object('applied', true, 'previous', NULL, 'assistant', row_to_json(v_row));
+  END IF;
+
+  IF (p_from_status IS NOT NULL AND NOT v_prev.status = ANY(p_from_status))
+     OR (p_expected_claw_id IS NOT NULL AND v_prev.claw_id IS DISTINCT FROM p_expected_claw_id) THEN
+    RETURN json_build_object('applied', false, 'previous', row_to_json(v_prev), 'assistant', row_to_json(v_prev));
+  END IF;
+
+  UPDATE assistants
+  SET status = p_to_status,
+      model = COALESCE(p_model, model),
+      claw_id = CASE WHEN p_clear_claw_id THEN NULL ELSE COALESCE(p_claw_id, claw_id) END,
+      updated_at = now()
+  WHERE id = v_prev.id
+  RETURNING * INTO v_row;
+
+  RETURN json_build_object('applied', true, 'previous', row_to_json(v_prev), 'assistant', row_to_json(v_row));
+END;
+$$;
+
+REVOKE ALL ON FUNCTION transition_assistant(UUID, TEXT, TEXT[], TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION transition_assistant(UUID, TEXT, TEXT[], TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN) TO service_role;
@@ -0,0 +1,61 @@
+-- Migration 008: Provisioning job queue for app.worker
+-- The API enqueues a row per provision and answers 202; the worker claims
+-- rows with a lease (FOR UPDATE SKIP LOCKED), calls the infra API and moves
+-- the assistant to READY/ERROR.
+--
+-- A job provisions claw_id with the user's current keys and channel
+-- settings and, first, deprovisions previous_claw_id if set.
+
+ALTER TABLE provisioning_jobs
+  ADD COLUMN claw_id TEXT,
+  ADD COLUMN model TEXT,
+  ADD COLUMN channel TEXT,                           -- NULL = use user_phones.channel
+  ADD COLUMN previous_claw_id TEXT,
+  ADD COLUMN run_after TIMESTAMPTZ NOT NULL DEFAULT now(),  -- retry backoff
+  ADD COLUMN locked_by TEXT,                         -- worker holding the lease
+  ADD COLUMN locked_until TIMESTAMPTZ;
+
+-- CANCELED: superseded before it ran (assistant deleted or re-provisioned)
+ALTER TABLE provisioning_jobs DROP CONSTRAINT provisioning_jobs_status_check;
+ALTER TABLE provisioning_jobs ADD CONSTRAINT provisioning_jobs_status_check
+  CHECK (status IN ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELED'));
+
+CREATE INDEX idx_provisioning_jobs_claimable ON provisioning_jobs(run_after)
+  WHERE status IN ('PENDING', 'RUNNING');
+
+-- Claim up to p_limit runnable jobs for p_worker: PENDING jobs whose backoff
+-- has passed, plus RUNNING jobs whose lease expired (their worker died).
+-- Concurrent workers skip each other's locked rows instead of blocking.
+--
+-- Returns: JSON array of the claimed job rows (attempts already incremented)
+CREATE OR REPLACE FUNCTION claim_provisioning_jobs(
+  p_worker TEXT,
+  p_limit INTEGER DEFAULT 1,
+  p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS JSON
+LANGUAGE sql
+SET search_path = public
+AS $$
+  WITH claimed AS (
+    UPDATE provisioning_jobs j
+    SET status = 'RUNNING',
+        attempts = j.attempts + 1,
+        locked_by = p_worker,
+        locked_until = now() + make_interval(secs => p_lease_seconds),
+        updated_at = now()
+    WHERE j.id IN (
+      SELECT id FROM provisioning_jobs
+      WHERE (status = 'PENDING' AND run_after <= now())
+         OR (status = 'RUNNING' AND locked_until < now())
+      ORDER BY run_after
+      LIMIT p_limit
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*
+  )
+  SELECT COALESCE(json_agg(claimed), '[]'::json) FROM claimed;
+$$;
+
+REVOKE ALL ON FUNCTION claim_provisioning_jobs(TEXT, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_provisioning_jobs(TEXT, INTEGER, INTEGER) TO service_role;
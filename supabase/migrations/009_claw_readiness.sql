@@ -0,0 +1,62 @@
+-- Migration 009: Pod readiness pushed by the infra API
+-- backend-infra watches claw pods and POSTs readiness changes to
+-- /api/v1/webhooks/infra, which records them here. GET /assistants reads
+-- pod_ready instead of asking the infra API on every poll.
+
+ALTER TABLE assistants
+  ADD COLUMN pod_ready BOOLEAN,            -- NULL = no report yet for this claw_id
+  ADD COLUMN pod_status_at TIMESTAMPTZ;
+
+CREATE INDEX idx_assistants_claw_id ON assistants(claw_id);
+
+-- A new claw_id starts with no readiness report
+CREATE OR REPLACE FUNCTION reset_pod_ready()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.claw_id IS DISTINCT FROM OLD.claw_id THEN
+    NEW.pod_ready := NULL;
+    NEW.pod_status_at := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER assistants_reset_pod_ready
+  BEFORE UPDATE OF claw_id ON assistants
+  FOR EACH ROW EXECUTE FUNCTION reset_pod_ready();
+
+-- Apply a batch of readiness reports: [{"claw_id": "...", "ready": true}, ...]
+-- The last report per claw_id wins. A ready report also completes a
+-- PROVISIONING assistant (PROVISIONING -> READY).
+-- claw_id is unique across users (the infra API selects pods by it alone).
+--
+-- Returns: JSON array of the affected user_ids
+CREATE OR REPLACE FUNCTION record_claw_readiness(p_events JSON)
+RETURNS JSON
+LANGUAGE sql
+SET search_path = public
+AS $$
+  WITH latest AS (
+    SELECT DISTINCT ON (e->>'claw_id')
+      e->>'claw_id' AS claw_id,
+      (e->>'ready')::boolean AS ready
+    FROM json_array_elements(p_events) WITH ORDINALITY AS t(e, n)
+    ORDER BY e->>'claw_id', n DESC
+  ),
+  updated AS (
+    UPDATE assistants a
+    SET pod_ready = latest.ready,
+        pod_status_at = now(),
+        status = CASE WHEN latest.ready AND a.status = 'PROVISIONING' THEN 'READY' ELSE a.status END,
+        updated_at = CASE WHEN latest.ready AND a.status = 'PROVISIONING' THEN now() ELSE a.updated_at END
+    FROM latest
+    WHERE a.claw_id = latest.claw_id
+    RETURNING a.user_id
+  )
+  SELECT COALESCE(json_agg(user_id), '[]'::json) FROM updated;
+$$;
+
+REVOKE ALL ON FUNCTION record_claw_readiness(JSON) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_claw_readiness(JSON) TO service_role;
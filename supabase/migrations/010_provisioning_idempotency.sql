@@ -0,0 +1,9 @@
+-- Migration 010: Idempotency keys for POST/PATCH /assistants
+-- A client retry carrying the same Idempotency-Key finds the job its first
+-- attempt queued and gets the same answer, instead of provisioning again.
+
+ALTER TABLE provisioning_jobs ADD COLUMN idempotency_key TEXT;
+
+CREATE UNIQUE INDEX idx_provisioning_jobs_idempotency_key
+  ON provisioning_jobs(user_id, idempotency_key)
+  WHERE idempotency_key IS NOT NULL;
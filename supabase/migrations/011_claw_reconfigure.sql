@@ -0,0 +1,8 @@
+-- Migration 011: In-place reconfiguration jobs
+-- A model or API key change on an existing claw no longer provisions a new
+-- claw_id. The job reconfigures claw_id through the infra API
+-- (PATCH /claws/{user}/{claw}/config: new ConfigMap/Secret, one pod
+-- restart) and keeps its volume, Service and network policy.
+
+ALTER TABLE provisioning_jobs
+  ADD COLUMN reconfigure BOOLEAN NOT NULL DEFAULT false;
@@ -0,0 +1,41 @@
+-- Migration 012: Provisioning timelines
+-- Each job records where its time went: the API's steps (loading the user,
+-- claiming the assistant), then the worker's (queue wait, secrets, infra
+-- API call, READY write). See backend/app/timeline.py.
+--
+-- timeline: {"started_at": <epoch s>, "steps": [{"name", "start", "ms"}, ...]}
+
+ALTER TABLE provisioning_jobs ADD COLUMN timeline JSONB;
+
+-- Per-step duration percentiles (ms) over jobs completed in the last
+-- p_hours hours. A retried job contributes one sample per attempt.
+--
+-- Returns: {"<step>": {"count", "p50", "p90", "p99", "max"}, ...}
+CREATE OR REPLACE FUNCTION provisioning_step_percentiles(p_hours INTEGER DEFAULT 24)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH steps AS (
+    SELECT s->>'name' AS name, (s->>'ms')::float AS ms
+    FROM provisioning_jobs j, jsonb_array_elements(j.timeline->'steps') AS s
+    WHERE j.status = 'COMPLETED'
+      AND j.updated_at > now() - make_interval(hours => p_hours)
+  )
+  SELECT COALESCE(json_object_agg(name, stats), '{}'::json)
+  FROM (
+    SELECT name, json_build_object(
+      'count', count(*),
+      'p50', percentile_cont(0.5) WITHIN GROUP (ORDER BY ms),
+      'p90', percentile_cont(0.9) WITHIN GROUP (ORDER BY ms),
+      'p99', percentile_cont(0.99) WITHIN GROUP (ORDER BY ms),
+      'max', max(ms)
+    ) AS stats
+    FROM steps
+    GROUP BY name
+  ) per_step;
+$$;
+
+REVOKE ALL ON FUNCTION provisioning_step_percentiles(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION provisioning_step_percentiles(INTEGER) TO service_role;
@@ -0,0 +1,12 @@
+-- Migration 013: Bind Idempotency-Keys to the request that first used them
+-- Until now a key only identified (user, key), so a PATCH /assistants retry
+-- carrying a key first used by POST got the POST's job back, and a reused
+-- key with a new body silently replayed the old one. Jobs now record which
+-- endpoint queued them and a hash of the request body; the backend answers
+-- 422 when a key comes back with either one different.
+--
+-- Jobs queued before this migration have NULLs here and still replay.
+
+ALTER TABLE provisioning_jobs
+  ADD COLUMN idempotency_scope TEXT,     -- e.g. create_assistant, update_assistant
+  ADD COLUMN request_fingerprint TEXT;   -- app.services.idempotency.fingerprint(body)
@@ -0,0 +1,116 @@
+-- Migration 014: Mark assistants with a reconfiguration in flight
+-- A reconfigure job keeps the claw_id, so the running pod's readiness
+-- reports (webhook or reconciler) still match the row while the job waits
+-- in the queue. record_claw_readiness used to complete such a row
+-- (PROVISIONING -> READY) before the worker ran, and the worker then
+-- dropped the job as superseded: the new config was never applied.
+--
+-- pending_job_id holds the provisioning_jobs.id that owns the current
+-- PROVISIONING state. Readiness reports no longer complete a row that has
+-- one; only that job's worker does.
+
+ALTER TABLE assistants ADD COLUMN pending_job_id UUID;
+
+-- transition_assistant gains p_pending_job_id. Every applied transition
+-- sets it, so any transition that doesn't pass one clears the marker.
+DROP FUNCTION transition_assistant(UUID, TEXT, TEXT[], TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN);
+
+CREATE FUNCTION transition_assistant(
+  p_user_id UUID,
+  p_to_status TEXT,
+  p_from_status TEXT[] DEFAULT NULL,      -- allowed current statuses (NULL = any)
+  p_expected_claw_id TEXT DEFAULT NULL,   -- only apply if claw_id still matches
+  p_model TEXT DEFAULT NULL,              -- new model (NULL = unchanged)
+  p_claw_id TEXT DEFAULT NULL,            -- new claw_id (NULL = unchanged)
+  p_clear_claw_id BOOLEAN DEFAULT FALSE,  -- set claw_id to NULL
+  p_create BOOLEAN DEFAULT FALSE,         -- insert the row if the user has none
+  p_pending_job_id UUID DEFAULT NULL      -- job that owns this state (NULL = none)
+)
+RETURNS JSON
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_prev assistants%ROWTYPE;
+  v_row assistants%ROWTYPE;
+BEGIN
+  SELECT * INTO v_prev FROM assistants WHERE user_id = p_user_id FOR UPDATE;
+
+  IF NOT FOUND THEN
+    IF NOT p_create OR (p_from_status IS NOT NULL AND NOT 'NONE' = ANY(p_from_status)) THEN
+      RETURN json_build_object('applied', false, 'previous', NULL, 'assistant', NULL);
+    END IF;
+
+    -- A concurrent creator wins the unique(user_id) race; we report not applied
+    IF p_model IS NULL THEN
+      INSERT INTO assistants (user_id, status, claw_id, pending_job_id)
+      VALUES (p_user_id, p_to_status, p_claw_id, p_pending_job_id)
+      ON CONFLICT (user_id) DO NOTHING
+      RETURNING * INTO v_row;
+    ELSE
+      INSERT INTO assistants (user_id, status, model, claw_id, pending_job_id)
+      VALUES (p_user_id, p_to_status, p_model, p_claw_id, p_pending_job_id)
+      ON CONFLICT (user_id) DO NOTHING
+      RETURNING * INTO v_row;
+    END IF;
+
+    IF NOT FOUND THEN
+      SELECT * INTO v_row FROM assistants WHERE user_id = p_user_id;
+      RETURN json_build_object('applied', false, 'previous', NULL, 'assistant', row_to_json(v_row));
+    END IF;
+    RETURN json_build_object('applied', true, 'previous', NULL, 'assistant', row_to_json(v_row));
+  END IF;
+
+  IF (p_from_status IS NOT NULL AND NOT v_prev.status = ANY(p_from_status))
+     OR (p_expected_claw_id IS NOT NULL AND v_prev.claw_id IS DISTINCT FROM p_expected_claw_id) THEN
+    RETURN json_build_object('applied', false, 'previous', row_to_json(v_prev), 'assistant', row_to_json(v_prev));
+  END IF;
+
+  UPDATE assistants
+  SET status = p_to_status,
+      model = COALESCE(p_model, model),
+      claw_id = CASE WHEN p_clear_claw_id THEN NULL ELSE COALESCE(p_claw_id, claw_id) END,
+      pending_job_id = p_pending_job_id,
+      updated_at = now()
+  WHERE id = v_prev.id
+  RETURNING * INTO v_row;
+
+  RETURN json_build_object('applied', true, 'previous', row_to_json(v_prev), 'assistant', row_to_json(v_row));
+END;
+$$;
+
+REVOKE ALL ON FUNCTION transition_assistant(UUID, TEXT, TEXT[], TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION transition_assistant(UUID, TEXT, TEXT[], TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN, UUID) TO service_role;
+
+-- Same as migration 009, except that a ready report leaves an assistant
+-- with a pending job in PROVISIONING (pod_ready is still recorded)
+CREATE OR REPLACE FUNCTION record_claw_readiness(p_events JSON)
+RETURNS JSON
+LANGUAGE sql
+SET search_path = public
+AS $$
+  WITH latest AS (
+    SELECT DISTINCT ON (e->>'claw_id')
+      e->>'claw_id' AS claw_id,
+      (e->>'ready')::boolean AS ready
+    FROM json_array_elements(p_events) WITH ORDINALITY AS t(e, n)
+    ORDER BY e->>'claw_id', n DESC
+  ),
+  updated AS (
+    UPDATE assistants a
+    SET pod_ready = latest.ready,
+        pod_status_at = now(),
+        status = CASE
+          WHEN latest.ready AND a.status = 'PROVISIONING' AND a.pending_job_id IS NULL THEN 'READY'
+          ELSE a.status
+        END,
+        updated_at = CASE
+          WHEN latest.ready AND a.status = 'PROVISIONING' AND a.pending_job_id IS NULL THEN now()
+          ELSE a.updated_at
+        END
+    FROM latest
+    WHERE a.claw_id = latest.claw_id
+    RETURNING a.user_id
+  )
+  SELECT COALESCE(json_agg(user_id), '[]'::json) FROM updated;
+$$;
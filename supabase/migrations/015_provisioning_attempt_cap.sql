@@ -0,0 +1,70 @@
+-- Migration 015: Stop reclaiming provisioning jobs that keep losing their lease
+-- claim_provisioning_jobs (migration 008) took back every RUNNING job whose
+-- lease expired and counted another attempt, with no cap: a job that
+-- crashes or hangs its worker every time was retried forever and its
+-- assistant stayed PROVISIONING. The worker's own max-attempts check only
+-- runs when an attempt ends in an exception, which a dead worker never does.
+--
+-- claim_provisioning_jobs gains p_max_attempts. An expired job that has
+-- already used that many attempts is marked FAILED instead of being claimed,
+-- and its assistant goes to ERROR unless another job owns it by now (same
+-- as provisioning.fail_assistant).
+
+DROP FUNCTION claim_provisioning_jobs(TEXT, INTEGER, INTEGER);
+
+CREATE FUNCTION claim_provisioning_jobs(
+  p_worker TEXT,
+  p_limit INTEGER DEFAULT 1,
+  p_lease_seconds INTEGER DEFAULT 300,
+  p_max_attempts INTEGER DEFAULT NULL   -- NULL = reclaim expired jobs forever
+)
+RETURNS JSON
+LANGUAGE sql
+SET search_path = public
+AS $$
+  WITH exhausted AS (
+    UPDATE provisioning_jobs j
+    SET status = 'FAILED',
+        last_error = 'Lease expired on attempt ' || j.attempts || ' of ' || p_max_attempts,
+        locked_by = NULL,
+        locked_until = NULL,
+        updated_at = now()
+    WHERE j.status = 'RUNNING'
+      AND j.locked_until < now()
+      AND j.attempts >= p_max_attempts
+    RETURNING j.id, j.user_id, j.claw_id
+  ),
+  errored AS (
+    UPDATE assistants a
+    SET status = 'ERROR',
+        pending_job_id = NULL,
+        updated_at = now()
+    FROM exhausted
+    WHERE a.user_id = exhausted.user_id
+      AND a.status = 'PROVISIONING'
+      AND a.claw_id IS NOT DISTINCT FROM exhausted.claw_id
+      AND (a.pending_job_id IS NULL OR a.pending_job_id = exhausted.id)
+  ),
+  claimed AS (
+    UPDATE provisioning_jobs j
+    SET status = 'RUNNING',
+        attempts = j.attempts + 1,
+        locked_by = p_worker,
+        locked_until = now() + make_interval(secs => p_lease_seconds),
+        updated_at = now()
+    WHERE j.id IN (
+      SELECT id FROM provisioning_jobs
+      WHERE (status = 'PENDING' AND run_after <= now())
+         OR (status = 'RUNNING' AND locked_until < now()
+             AND (p_max_attempts IS NULL OR attempts < p_max_attempts))
+      ORDER BY run_after
+      LIMIT p_limit
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*
+  )
+  SELECT COALESCE(json_agg(claimed), '[]'::json) FROM claimed;
+$$;
+
+REVOKE ALL ON FUNCTION claim_provisioning_jobs(TEXT, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_provisioning_jobs(TEXT, INTEGER, INTEGER, INTEGER) TO service_role;
@@ -0,0 +1,62 @@
+-- Migration 016: Match readiness reports on the user as well as the claw_id
+-- claw_ids are 7 random digits and idx_assistants_claw_id is not unique, so
+-- two users can end up with the same claw_id. record_claw_readiness matched
+-- on claw_id alone and applied one user's pod report to both assistants
+-- (possibly completing the other one's provisioning).
+--
+-- Reports carry the infra user id (app.services.infra_api.infra_user_id, a
+-- hash of the Supabase user id); infra_user_id() below computes the same
+-- value so rows found by claw_id can be checked against it.
+
+-- Must stay in sync with app.services.infra_api.infra_user_id
+CREATE OR REPLACE FUNCTION infra_user_id(p_user_id UUID)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT 'user-' || (
+    ('x' || substr(encode(sha256(convert_to(p_user_id::text, 'UTF8')), 'hex'), 1, 10))::bit(40)::bigint
+    % 100000000
+  )::text;
+$$;
+
+-- Apply a batch of readiness reports:
+-- [{"user_id": "user-123", "claw_id": "...", "ready": true}, ...]
+-- Same as migration 014 otherwise: the last report per claw wins, and a
+-- ready report completes a PROVISIONING assistant with no pending job.
+CREATE OR REPLACE FUNCTION record_claw_readiness(p_events JSON)
+RETURNS JSON
+LANGUAGE sql
+SET search_path = public
+AS $$
+  WITH latest AS (
+    SELECT DISTINCT ON (e->>'user_id', e->>'claw_id')
+      e->>'user_id' AS infra_user_id,
+      e->>'claw_id' AS claw_id,
+      (e->>'ready')::boolean AS ready
+    FROM json_array_elements(p_events) WITH ORDINALITY AS t(e, n)
+    ORDER BY e->>'user_id', e->>'claw_id', n DESC
+  ),
+  updated AS (
+    UPDATE assistants a
+    SET pod_ready = latest.ready,
+        pod_status_at = now(),
+        status = CASE
+          WHEN latest.ready AND a.status = 'PROVISIONING' AND a.pending_job_id IS NULL THEN 'READY'
+          ELSE a.status
+        END,
+        updated_at = CASE
+          WHEN latest.ready AND a.status = 'PROVISIONING' AND a.pending_job_id IS NULL THEN now()
+          ELSE a.updated_at
+        END
+    FROM latest
+    WHERE a.claw_id = latest.claw_id
+      AND infra_user_id(a.user_id) = latest.infra_user_id
+    RETURNING a.user_id
+  )
+  SELECT COALESCE(json_agg(user_id), '[]'::json) FROM updated;
+$$;
+
+REVOKE ALL ON FUNCTION infra_user_id(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION infra_user_id(UUID) TO service_role;